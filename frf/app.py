@@ -50,43 +50,87 @@ False
 this should already be done for you.
 """
 
+import collections
 import importlib
 import logging
 import logging.config
+import os
+import time
 
 import falcon
 
-from frf import exceptions
-from frf.urls import IncludeURLs, URL_REGISTRY
-from frf.utils.importing import import_class
-
-from . import cache, conf, db
+from frf import cache, conf, db, exceptions
+from frf.asgi import ASGIApp
+from frf.urls import compile_routes, RouteError
+from frf.utils import json as json_codec
+from frf.utils.importing import import_class, ImportProfiler
 
 logger = logging.getLogger(__name__)
 
 api = None
 
+#: The ASGI application, see :mod:`frf.asgi`.
+asgi = None
+
+#: The compiled :class:`frf.urls.Route` tuples, see ``manage.py routes``.
+routes = []
+
+#: The :class:`StartupProfile` of ``init``, when imports are profiled.
+startup_profile = None
 
-def _flatten_urls(url_list, urls):
-    for url in url_list:
-        if isinstance(url, IncludeURLs):
-            _flatten_urls(url, urls)
-        elif isinstance(url[1], IncludeURLs):
-            _flatten_urls(url[1].get_list(
-                base_url=url[0]), urls)
-        else:
-            urls.append(url)
+
+class StartupProfile(object):
+    """The timings of :func:`init`.
+
+    Enabled with the ``FRF_PROFILE_IMPORTS`` environment variable, which
+    also profiles the imports of the settings module, or the
+    ``PROFILE_IMPORTS`` setting.
+
+    Attributes:
+        phases (OrderedDict): Seconds spent in each phase of ``init``.
+        imports (ImportProfiler): The modules imported during ``init``.
+    """
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+        self.imports = ImportProfiler()
+        self._last = time.perf_counter()
+
+    def mark(self, name):
+        """End the phase ``name``, which started at the previous mark."""
+        now = time.perf_counter()
+        self.phases[name] = now - self._last
+        self._last = now
+
+    def format(self, limit=30):
+        phases = ', '.join(
+            '{} {:.1f}ms'.format(name, duration * 1000)
+            for name, duration in self.phases.items())
+
+        return 'Startup: {}\nImports: {:.1f}ms\n{}'.format(
+            phases, self.imports.total * 1000, self.imports.format(limit))
 
 
 def _add_urls(app, url_list):
-    urls = []
-    _flatten_urls(url_list, urls)
+    """Compile the url patterns and add them to ``app``.
+
+    Viewsets are bound (see :meth:`frf.viewsets.BasicViewSet.bind_actions`)
+    once each.
+    """
+    compiled = compile_routes(url_list)
+    bound = set()
 
-    urls += URL_REGISTRY
+    for route in compiled:
+        try:
+            app.add_route(route.uri_template, route.resource)
+        except ValueError as e:
+            raise RouteError('{}: {}'.format(route.uri_template, e)) from e
+
+        bind_actions = getattr(route.resource, 'bind_actions', None)
+        if bind_actions is not None and id(route.resource) not in bound:
+            bind_actions()
+            bound.add(id(route.resource))
 
-    for url in urls:
-        if url:
-            app.add_route(url[0], url[1])
+    return compiled
 
 
 def init(project_name, settings_file, base_dir, main_app=None):
@@ -99,7 +143,12 @@ def init(project_name, settings_file, base_dir, main_app=None):
         main_app (str): The main app name.  If you do not pass this, the
             basename of ``base_dir`` will be used.
     """
-    global api
+    global api, asgi, routes, startup_profile
+
+    profile = None
+    if os.getenv('FRF_PROFILE_IMPORTS'):
+        profile = StartupProfile()
+        profile.imports.start()
 
     if not main_app:
         main_app = project_name
@@ -109,6 +158,13 @@ def init(project_name, settings_file, base_dir, main_app=None):
     conf['PROJECT_NAME'] = project_name
     conf['MAIN_APP'] = main_app
 
+    if profile is None and conf.get('PROFILE_IMPORTS', False):
+        profile = StartupProfile()
+        profile.imports.start()
+
+    mark = profile.mark if profile is not None else lambda name: None
+    mark('settings')
+
     # set up logging
     if 'LOGGING' in conf:
         logging.config.dictConfig(conf.get('LOGGING'))
@@ -122,18 +178,27 @@ def init(project_name, settings_file, base_dir, main_app=None):
         cls = import_class(cls_name)
         middleware.append(cls())
 
+    mark('middleware')
+
     # set up the database
     if conf.get('SQLALCHEMY_CONNECTION_URI'):
         db.init(
             conf.get('SQLALCHEMY_CONNECTION_URI', 'sqlite:///:memory:'),
             echo=conf.get('SQLALCHEMY_ECHO', False),
             scopefunc=conf.get('SQLALCHEMY_SESSION_SCOPEFUNC', None),
-            )
+            **db.get_engine_options())
+
+    mark('database')
 
     # set up the cache
     cache.init(conf.get(
         'CACHE', {'engine': 'frf.cache.engines.dummy.DummyCacheEngine'}))
 
+    mark('cache')
+
+    # pick the JSON library
+    json_codec.set_backend(conf.get('JSON_BACKEND', 'auto'))
+
     # call app ``init_app`` functions
     for app_name in conf.get('INSTALLED_APPS', []):
         try:
@@ -149,22 +214,37 @@ def init(project_name, settings_file, base_dir, main_app=None):
         if callable(init_app_func):
             init_app_func()
 
+    mark('apps')
+
     api = falcon.API(middleware=middleware)
     api.set_error_serializer(exceptions.error_serializer)
+    asgi = ASGIApp(api)
 
     url_module_name = '{}.urls'.format(main_app)
     try:
         url_module = importlib.import_module(url_module_name)
         app_patterns = getattr(url_module, 'urlpatterns', None)
         if app_patterns:
-            _add_urls(api, app_patterns)
+            routes = _add_urls(api, app_patterns)
         else:
             if app_patterns is None:
                 logger.warning(
                     'Could not find urlpatterns in base url module: {}'.format(
                         url_module_name))
     except ImportError as e:
+        # only a missing url module is tolerated, not errors importing
+        # the modules it uses
+        if getattr(e, 'name', None) not in (url_module_name, None) and \
+                not url_module_name.startswith(e.name + '.'):
+            raise
+
         logger.warning(
             'Base url module {} could not be imported.'.format(
                 url_module_name))
         logger.error(e)
+
+    if profile is not None:
+        mark('urls')
+        profile.imports.stop()
+        startup_profile = profile
+        logger.warning(profile.format())
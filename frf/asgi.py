@@ -0,0 +1,209 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""ASGI entry point.
+
+:func:`frf.app.init` sets ``frf.app.asgi`` to an :class:`ASGIApp` wrapping
+the Falcon API, which can be served by an ASGI server, for example:
+
+.. code-block:: text
+
+    $ uvicorn yourproject:app.asgi
+    $ gunicorn -k uvicorn.workers.UvicornWorker yourproject:app.asgi
+
+Or with ``manage.py runserver --asgi``.
+
+Every request is passed to the Falcon API as a regular WSGI request, in a
+thread pool, so existing views keep working unchanged.  ``async``
+responders (see :class:`frf.views.AsyncView` and
+:class:`frf.viewsets.AsyncViewSetMixin`) are run on the server's event
+loop, so their I/O waits are interleaved with other requests'.
+"""
+
+import io
+import sys
+
+import falcon
+
+from frf import conf
+from frf.utils import aio
+
+
+def _environ(scope, body):
+    """Build a WSGI environment from an ASGI HTTP ``scope``."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+
+    env = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+
+        if name in env:
+            value = env[name] + ',' + value
+        env[name] = value
+
+    return env
+
+
+def _encode_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers]
+
+
+class ASGIApp(object):
+    """ASGI (version 3) application serving a Falcon API.
+
+    Args:
+        api (falcon.API): The API.
+        max_body_size (int): Larger request bodies get a ``413`` response.
+            Defaults to the ``MAX_BODY_SIZE`` setting, or 10MB.
+        executor (Executor): The thread pool requests run in.  Defaults
+            to the event loop's default executor.
+    """
+    DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024
+
+    def __init__(self, api, max_body_size=None, executor=None):
+        self.api = api
+        self.max_body_size = max_body_size or conf.get(
+            'MAX_BODY_SIZE', self.DEFAULT_MAX_BODY_SIZE)
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        if scope['type'] != 'http':
+            raise ValueError(
+                'Unsupported ASGI scope type: {}'.format(scope['type']))
+
+        body = await self.read_body(receive)
+        if body is None:
+            await self.send_response(
+                send, falcon.HTTP_413, [('content-length', '0')], [b''])
+            return
+
+        await aio.run_in_executor(
+            self.handle_wsgi, _environ(scope, body), send,
+            aio.get_event_loop(), executor=self.executor)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """Read the request body, or return ``None`` if it is too large."""
+        chunks = []
+        size = 0
+
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+
+        return b''.join(chunks)
+
+    async def send_response(self, send, status, headers, body):
+        await send({
+            'type': 'http.response.start',
+            'status': int(status[:3]),
+            'headers': _encode_headers(headers),
+        })
+
+        for chunk in body:
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True,
+            })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def handle_wsgi(self, env, send, loop):
+        """Run a WSGI request, in a worker thread.
+
+        ``async`` responders run on ``loop`` (see
+        :func:`frf.utils.aio.serving`).  The response body is iterated in the
+        same thread, so streamed responses are sent as they are produced.
+        """
+        def call(message):
+            aio.run_threadsafe(send(message), loop)
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+
+        with aio.serving(loop):
+            result = self.api(env, start_response)
+
+        try:
+            call({
+                'type': 'http.response.start',
+                'status': int(response['status'][:3]),
+                'headers': _encode_headers(response['headers']),
+            })
+
+            for chunk in result:
+                if chunk:
+                    call({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            call({'type': 'http.response.body', 'body': b''})
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
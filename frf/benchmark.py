@@ -0,0 +1,313 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""Micro benchmarks.
+
+Benchmarks are registered with the :func:`benchmark` decorator, in the
+modules listed in the ``BENCHMARK_MODULES`` setting (FRF's own benchmarks, in
+``frf.tests.benchmarks``, are always loaded), and run with ``manage.py
+benchmark``:
+
+.. code-block:: python
+
+    from frf.benchmark import benchmark
+
+    def setup(n):
+        return list(range(n))
+
+    @benchmark('sum', params=(10, 1000), setup=setup)
+    def bench_sum(items):
+        sum(items)
+
+The results are written as JSON, in a format that stays the same between
+runs so they can be saved and compared against with ``--baseline``:
+
+.. code-block:: text
+
+    {
+      "environment": {"python": "3.6.15", ...},
+      "format": 1,
+      "results": {
+        "sum[10]": {
+          "loops": 65536,
+          "max": 1.5e-07,
+          "mean": 1.4e-07,
+          "median": 1.4e-07,
+          "min": 1.3e-07,
+          "repeat": 5,
+          "stdev": 1e-08
+        },
+        ...
+      }
+    }
+
+All times are in seconds per call.
+"""
+
+import collections
+import fnmatch
+import importlib
+import platform
+import statistics
+import time
+
+from frf import conf
+from frf.utils import json
+
+#: Version of the JSON output.  Incremented when it changes in a way that
+#: makes older results not comparable.
+FORMAT_VERSION = 1
+
+DEFAULT_MODULES = ['frf.tests.benchmarks']
+
+registry = collections.OrderedDict()
+
+
+class Benchmark(object):
+    """A benchmarked function.
+
+    Args:
+        name (str): The name of the benchmark.
+        func (callable): The function to time.  It is passed the return
+            value of ``setup``.
+        params (tuple): Run the benchmark once for each of these values,
+            which are passed to ``setup``.  The name of each run is
+            ``name[param]``.
+        setup (callable): Called with the param, before timing starts.
+        teardown (callable): Called with the return value of ``setup``,
+            after timing ends.
+    """
+    def __init__(self, name, func, params=None, setup=None, teardown=None):
+        self.name = name
+        self.func = func
+        self.params = params
+        self.setup = setup
+        self.teardown = teardown
+
+    def cases(self):
+        """Yield ``(name, param)`` for each run of the benchmark."""
+        if self.params is None:
+            yield self.name, None
+            return
+
+        for param in self.params:
+            yield '{}[{}]'.format(self.name, param), param
+
+
+def benchmark(name, params=None, setup=None, teardown=None):
+    """Register the decorated function as a :class:`Benchmark`."""
+    def decorator(func):
+        registry[name] = Benchmark(
+            name, func, params=params, setup=setup, teardown=teardown)
+        return func
+    return decorator
+
+
+def load(modules=None):
+    """Import the benchmark modules, so their benchmarks are registered.
+
+    Args:
+        modules (list): Module names.  Defaults to FRF's benchmarks plus the
+            ``BENCHMARK_MODULES`` setting.
+
+    Returns:
+        OrderedDict: The registry.
+    """
+    if modules is None:
+        modules = DEFAULT_MODULES + conf.get('BENCHMARK_MODULES', [])
+
+    for module_name in modules:
+        importlib.import_module(module_name)
+
+    return registry
+
+
+def _time(func, arg, loops):
+    start = time.perf_counter()
+    for i in range(loops):
+        func(arg)
+    return time.perf_counter() - start
+
+
+def _calibrate(func, arg, min_time):
+    loops = 1
+    while True:
+        elapsed = _time(func, arg, loops)
+        if elapsed >= min_time:
+            return loops
+        loops *= 2 if elapsed * 10 >= min_time else 10
+
+
+def measure(func, arg=None, repeat=5, min_time=0.1):
+    """Time ``func(arg)``.
+
+    The number of calls per sample is picked so that each sample takes at
+    least ``min_time`` seconds, then ``repeat`` samples are taken.
+
+    Returns:
+        dict: The ``loops`` and ``repeat`` counts, and the ``min``, ``max``,
+            ``mean``, ``median`` and ``stdev`` seconds per call.
+    """
+    loops = _calibrate(func, arg, min_time)
+    samples = [_time(func, arg, loops) / loops for i in range(repeat)]
+
+    return {
+        'loops': loops,
+        'repeat': repeat,
+        'min': min(samples),
+        'max': max(samples),
+        'mean': statistics.mean(samples),
+        'median': statistics.median(samples),
+        'stdev': statistics.stdev(samples) if repeat > 1 else 0.0,
+    }
+
+
+def run(benchmarks=None, patterns=None, repeat=5, min_time=0.1,
+        callback=None):
+    """Run benchmarks.
+
+    Args:
+        benchmarks (iterable): The :class:`Benchmark` objects to run.
+            Defaults to everything that is registered.
+        patterns (list): Only run the cases whose name matches one of these
+            ``fnmatch`` patterns, like ``'serializer.*'``.
+        repeat (int): Number of samples per case.
+        min_time (float): Minimum duration of each sample, in seconds.
+        callback (callable): Called with ``(name, result)`` after each case.
+
+    Returns:
+        dict: The results, in the format described at the top of this module.
+    """
+    if benchmarks is None:
+        benchmarks = registry.values()
+
+    results = {}
+
+    for bench in benchmarks:
+        for name, param in bench.cases():
+            if patterns and not any(
+                    fnmatch.fnmatchcase(name, p) for p in patterns):
+                continue
+
+            arg = bench.setup(param) if bench.setup else param
+            try:
+                result = measure(
+                    bench.func, arg, repeat=repeat, min_time=min_time)
+            finally:
+                if bench.teardown:
+                    bench.teardown(arg)
+
+            results[name] = result
+            if callback is not None:
+                callback(name, result)
+
+    return {
+        'format': FORMAT_VERSION,
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def environment():
+    """Return the versions that affect the results."""
+    import falcon
+    import sqlalchemy
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'falcon': falcon.__version__,
+        'sqlalchemy': sqlalchemy.__version__,
+        'json_backend': json.get_backend().name,
+    }
+
+
+def dumps(report):
+    """Encode results as JSON, with sorted keys."""
+    return json.serialize(report, indent=2, sort_keys=True)
+
+
+def loads(data):
+    """Decode results written by :func:`dumps`.
+
+    Raises:
+        ValueError: If the results are in another format version.
+    """
+    report = json.deserialize(data)
+
+    if report.get('format') != FORMAT_VERSION:
+        raise ValueError(
+            'Unsupported benchmark format: {}'.format(report.get('format')))
+
+    return report
+
+
+def compare(baseline, report, threshold=0.1, stat='median'):
+    """Compare results against a baseline.
+
+    Args:
+        baseline (dict): Results from :func:`run` or :func:`loads`.
+        report (dict): Results from :func:`run`.
+        threshold (float): The relative change above which a case is
+            considered ``'slower'`` or ``'faster'``.
+        stat (str): The statistic to compare.
+
+    Returns:
+        list: One ``(name, baseline, current, change, status)`` tuple per
+            case that is in ``report``, sorted by name.  ``change`` is
+            relative (``0.25`` is 25% slower), and ``status`` is ``'slower'``,
+            ``'faster'``, ``'same'``, or ``'new'`` when the case isn't in the
+            baseline.
+    """
+    rows = []
+    base_results = baseline['results']
+
+    for name, result in sorted(report['results'].items()):
+        current = result[stat]
+
+        if name not in base_results:
+            rows.append((name, None, current, None, 'new'))
+            continue
+
+        base = base_results[name][stat]
+        change = (current - base) / base if base else 0.0
+
+        if change > threshold:
+            status = 'slower'
+        elif change < -threshold:
+            status = 'faster'
+        else:
+            status = 'same'
+
+        rows.append((name, base, current, change, status))
+
+    return rows
+
+
+def format_time(seconds):
+    """Format a duration with a unit that suits it, like ``'12.30 us'``."""
+    if seconds is None:
+        return '-'
+
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '{:.2f} {}'.format(seconds / scale, unit)
+
+    return '{:.2f} ns'.format(seconds / 1e-9)
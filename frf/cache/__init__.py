@@ -35,6 +35,9 @@ in your settings:
 
 If the ``default_timeout`` key is not provided, ``30`` seconds will be
 used.
+
+For a cache local to each process, use
+:class:`frf.cache.engines.memory.MemoryCacheEngine`.
 """
 
 import copy
@@ -150,6 +153,106 @@ def delete(key):
     _cache_engine.delete(key)
 
 
+def get_many(keys):
+    """Get several values from the store, in one round trip if the engine
+    supports it.
+
+    Args:
+        keys (list): The keys
+
+    Raises:
+        :class:`frf.cache.exceptions.CacheNotInitializedError`: If the cache
+            has not yet been initialized.
+
+    Returns:
+        dict: The values that were found, keyed by their key.  Missing keys
+            are not included.
+    """
+    if _cache_engine is None:
+        raise exceptions.CacheNotInitializedError()
+
+    return _cache_engine.get_many(keys)
+
+
+def set_many(mapping, timeout=None):
+    """Set several values, in one round trip if the engine supports it.
+
+    Args:
+        mapping (dict): The keys and values to set.
+        timeout (int): The expiration, in seconds.  If set to None, the
+            ``DEFAULT_CACHE_TIMEOUT`` setting will be used. If set to 0, the
+            values will not be set to expire.
+
+    Raises:
+        :class:`frf.cache.exceptions.CacheNotInitializedError`: If the cache
+            has not yet been initialized.
+    """
+    if _cache_engine is None:
+        raise exceptions.CacheNotInitializedError()
+
+    _cache_engine.set_many(mapping, timeout)
+
+
+def delete_many(keys):
+    """Delete several values from the store.
+
+    Args:
+        keys (list): The keys
+
+    Raises:
+        :class:`frf.cache.exceptions.CacheNotInitializedError`: If the cache
+            has not yet been initialized.
+    """
+    if _cache_engine is None:
+        raise exceptions.CacheNotInitializedError()
+
+    _cache_engine.delete_many(keys)
+
+
+def incr(key, delta=1):
+    """Increment an integer value.
+
+    If the key does not exist, it is set to ``delta``, with no expiration.
+
+    Args:
+        key (str): The key
+        delta (int): The amount to add.
+
+    Raises:
+        :class:`frf.cache.exceptions.CacheNotInitializedError`: If the cache
+            has not yet been initialized.
+
+    Returns:
+        int: The new value.
+    """
+    if _cache_engine is None:
+        raise exceptions.CacheNotInitializedError()
+
+    return _cache_engine.incr(key, delta)
+
+
+def decr(key, delta=1):
+    """Decrement an integer value.
+
+    If the key does not exist, it is set to ``-delta``, with no expiration.
+
+    Args:
+        key (str): The key
+        delta (int): The amount to subtract.
+
+    Raises:
+        :class:`frf.cache.exceptions.CacheNotInitializedError`: If the cache
+            has not yet been initialized.
+
+    Returns:
+        int: The new value.
+    """
+    if _cache_engine is None:
+        raise exceptions.CacheNotInitializedError()
+
+    return _cache_engine.decr(key, delta)
+
+
 def clear():
     """Clear all items in the cache.
 
@@ -164,3 +267,47 @@ def clear():
         raise exceptions.CacheNotInitializedError()
 
     _cache_engine.clear()
+
+
+def after_fork():
+    """Reset the cache engine in a newly forked process.
+
+    Called by :mod:`frf.server` in each worker, so workers don't share the
+    connections of the process that initialized the cache.  Does nothing if
+    the cache has not been initialized.
+    """
+    if _cache_engine is not None:
+        _cache_engine.after_fork()
+
+
+def aget(key, default=None):
+    """``async`` version of :func:`get`, for ``async`` views.
+
+    >>> value = await cache.aget('key')
+    """
+    return get_engine().aget(key, default)
+
+
+def aset(key, value, timeout=None):
+    """``async`` version of :func:`set`."""
+    return get_engine().aset(key, value, timeout)
+
+
+def adelete(key):
+    """``async`` version of :func:`delete`."""
+    return get_engine().adelete(key)
+
+
+def aget_many(keys):
+    """``async`` version of :func:`get_many`."""
+    return get_engine().aget_many(keys)
+
+
+def aset_many(mapping, timeout=None):
+    """``async`` version of :func:`set_many`."""
+    return get_engine().aset_many(mapping, timeout)
+
+
+def aincr(key, delta=1):
+    """``async`` version of :func:`incr`."""
+    return get_engine().aincr(key, delta)
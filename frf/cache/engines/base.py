@@ -18,7 +18,14 @@
 # above.
 
 
+from frf.utils import aio
+
+
 class CacheEngine(object):
+    #: Set to ``False`` in engines that don't do any I/O, so that their
+    #: ``async`` methods are called directly instead of in a thread.
+    blocking = True
+
     def get(self, key, default, encoding='utf8'):
         """Get a value from the store.
 
@@ -51,6 +58,121 @@ class CacheEngine(object):
         """
         raise NotImplementedError()
 
+    def get_many(self, keys):
+        """Get several values from the store.
+
+        Engines should override this if they can fetch the values in a single
+        round trip.
+
+        Args:
+            keys (list): The keys
+
+        Returns:
+            dict: The values that were found, keyed by their key.  Missing
+                keys are not included.
+        """
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set_many(self, mapping, timeout=None):
+        """Set several values.
+
+        Args:
+            mapping (dict): The keys and values to set.
+            timeout (int): The expiration, in seconds, same as for ``set``.
+        """
+        for key, value in mapping.items():
+            self.set(key, value, timeout)
+
+    def delete_many(self, keys):
+        """Delete several values from the store.
+
+        Args:
+            keys (list): The keys
+        """
+        for key in keys:
+            self.delete(key)
+
+    def incr(self, key, delta=1):
+        """Increment an integer value.
+
+        If the key does not exist, it is set to ``delta``, with no expiration.
+
+        Args:
+            key (str): The key
+            delta (int): The amount to add.
+
+        Returns:
+            int: The new value.
+        """
+        raise NotImplementedError()
+
+    def decr(self, key, delta=1):
+        """Decrement an integer value.
+
+        Args:
+            key (str): The key
+            delta (int): The amount to subtract.
+
+        Returns:
+            int: The new value.
+        """
+        return self.incr(key, -delta)
+
     def clear(self):
         """Clear all items in the cache."""
         raise NotImplementedError()
+
+    def after_fork(self):
+        """Reset the engine's state in a newly forked process.
+
+        Called in each server worker after the fork, see
+        :func:`frf.cache.after_fork`.
+        """
+
+    def _call_async(self, method, *args):
+        if self.blocking:
+            return aio.run_in_executor(method, *args)
+
+        return aio.call_now(method, *args)
+
+    def aget(self, key, default=None):
+        """``async`` version of :meth:`get`.
+
+        The ``async`` methods run the blocking methods in the event loop's
+        default executor, so they can be used from ``async`` views without
+        blocking the loop.
+        """
+        return self._call_async(self.get, key, default)
+
+    def aset(self, key, value, timeout=None):
+        """``async`` version of :meth:`set`."""
+        return self._call_async(self.set, key, value, timeout)
+
+    def adelete(self, key):
+        """``async`` version of :meth:`delete`."""
+        return self._call_async(self.delete, key)
+
+    def aget_many(self, keys):
+        """``async`` version of :meth:`get_many`."""
+        return self._call_async(self.get_many, keys)
+
+    def aset_many(self, mapping, timeout=None):
+        """``async`` version of :meth:`set_many`."""
+        return self._call_async(self.set_many, mapping, timeout)
+
+    def adelete_many(self, keys):
+        """``async`` version of :meth:`delete_many`."""
+        return self._call_async(self.delete_many, keys)
+
+    def aincr(self, key, delta=1):
+        """``async`` version of :meth:`incr`."""
+        return self._call_async(self.incr, key, delta)
+
+    def adecr(self, key, delta=1):
+        """``async`` version of :meth:`decr`."""
+        return self._call_async(self.decr, key, delta)
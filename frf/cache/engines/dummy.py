@@ -47,6 +47,8 @@ class DummyItem(object):
 
 
 class DummyCacheEngine(CacheEngine):
+    blocking = False
+
     def __init__(self, **kwargs):
         self.default_timeout = kwargs.pop('default_timeout')
         self.items = {}
@@ -67,9 +69,38 @@ class DummyCacheEngine(CacheEngine):
 
         self.items[key] = DummyItem(value, timeout)
 
+    def get_many(self, keys):
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set_many(self, mapping, timeout=None):
+        if timeout is None:
+            timeout = self.default_timeout
+
+        for key, value in mapping.items():
+            self.items[key] = DummyItem(value, timeout)
+
     def delete(self, key):
         if key in self.items:
             del self.items[key]
 
+    def delete_many(self, keys):
+        for key in keys:
+            self.items.pop(key, None)
+
+    def incr(self, key, delta=1):
+        item = self.items.get(key)
+
+        if item is None or item.is_expired:
+            self.items[key] = DummyItem(delta)
+            return delta
+
+        item.value = int(item.value) + delta
+        return item.value
+
     def clear(self):
         self.items = {}
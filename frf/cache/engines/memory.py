@@ -0,0 +1,215 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""In-process LRU cache engine.
+
+Example configuration:
+
+.. code-block:: text
+
+    CACHE = {
+        'engine': 'frf.cache.engines.memory.MemoryCacheEngine',
+        'max_entries': 10000,
+        'max_bytes': 64 * 1024 * 1024,
+        'sweep_interval': 60,
+        'default_timeout': 30,
+    }
+
+Each process has its own cache, so with several gunicorn workers, values set
+in one worker are not seen by the others.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+from .base import CacheEngine
+
+
+class MemoryCacheEngine(CacheEngine):
+    """A thread safe, size bounded, least recently used cache.
+
+    Args:
+        max_entries (int): The maximum number of items to keep.  When it is
+            reached, the least recently used items are evicted.  ``None``
+            means no limit.
+        max_bytes (int): The maximum approximate size of the stored values,
+            as measured by ``sys.getsizeof``.  ``None`` means no limit.
+            Larger values aren't stored, rather than evicting everything.
+        sweep_interval (int): Expired items are removed when they are read,
+            and in addition, all expired items are swept at most every
+            ``sweep_interval`` seconds during a ``set``.  Set to ``0`` to
+            disable the periodic sweep.
+        default_timeout (int): The expiration, in seconds, used when ``set``
+            is called without a timeout.
+    """
+    blocking = False
+
+    def __init__(self, **kwargs):
+        self.default_timeout = kwargs.pop('default_timeout')
+        self.max_entries = kwargs.pop('max_entries', 1000)
+        self.max_bytes = kwargs.pop('max_bytes', None)
+        self.sweep_interval = kwargs.pop('sweep_interval', 60)
+
+        self.lock = threading.RLock()
+        self.clear()
+
+    def _now(self):
+        return time.monotonic()
+
+    def _remove(self, key):
+        value, expiration, size = self.items.pop(key)
+        self.size -= size
+
+    def _expire(self, now):
+        expired = [key for key, (value, expiration, size) in self.items.items()
+                   if expiration is not None and expiration <= now]
+
+        for key in expired:
+            self._remove(key)
+
+        self.expirations += len(expired)
+        self.next_sweep = now + self.sweep_interval
+
+    def _evict(self):
+        while self.items and (
+                (self.max_entries is not None and
+                 len(self.items) > self.max_entries) or
+                (self.max_bytes is not None and
+                 self.size > self.max_bytes)):
+            key, (value, expiration, size) = self.items.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self.lock:
+            item = self.items.get(key)
+
+            if item is not None:
+                expiration = item[1]
+                if expiration is not None and expiration <= self._now():
+                    self._remove(key)
+                    self.expirations += 1
+                else:
+                    self.items.move_to_end(key)
+                    self.hits += 1
+                    return item[0]
+
+            self.misses += 1
+            return default
+
+    def get_many(self, keys):
+        values = {}
+        with self.lock:
+            for key in keys:
+                value = self.get(key)
+                if value is not None:
+                    values[key] = value
+        return values
+
+    def _store(self, key, value, expiration):
+        size = sys.getsizeof(value)
+
+        if key in self.items:
+            self._remove(key)
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        self.items[key] = (value, expiration, size)
+        self.size += size
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, mapping, timeout=None):
+        if timeout is None:
+            timeout = self.default_timeout
+
+        now = self._now()
+        expiration = now + timeout if timeout else None
+
+        with self.lock:
+            if self.sweep_interval and now >= self.next_sweep:
+                self._expire(now)
+
+            for key, value in mapping.items():
+                self._store(key, value, expiration)
+
+            self._evict()
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.items:
+                self._remove(key)
+
+    def delete_many(self, keys):
+        with self.lock:
+            for key in keys:
+                if key in self.items:
+                    self._remove(key)
+
+    def incr(self, key, delta=1):
+        with self.lock:
+            item = self.items.get(key)
+
+            if item is None or (
+                    item[1] is not None and item[1] <= self._now()):
+                value, expiration = delta, None
+            else:
+                value, expiration = int(item[0]) + delta, item[1]
+
+            self._store(key, value, expiration)
+            self._evict()
+
+            return value
+
+    def clear(self):
+        with self.lock:
+            self.items = collections.OrderedDict()
+            self.size = 0
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.next_sweep = self._now() + self.sweep_interval
+
+    def after_fork(self):
+        # the lock may have been held by another thread of the parent
+        self.lock = threading.RLock()
+
+    def stats(self):
+        """Return the cache counters.
+
+        Returns:
+            dict: The ``hits``, ``misses``, ``evictions`` (items removed to
+                respect the size bounds), ``expirations``, the current number
+                of ``entries`` and their approximate size in ``bytes``.
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self.items),
+                'bytes': self.size,
+            }
@@ -48,14 +48,55 @@ class RedisCacheEngine(CacheEngine):
         if timeout is None:
             timeout = self.default_timeout
 
-        self.connection.set(self._get_key(key), value)
+        self.connection.set(self._get_key(key), value, ex=timeout or None)
 
-        if timeout:
-            self.connection.expire(key, timeout)
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        values = {}
+        for key, value in zip(
+                keys, self.connection.mget(
+                    [self._get_key(key) for key in keys])):
+            if value is None:
+                continue
+
+            if isinstance(value, bytes):
+                value = value.decode('utf8')
+
+            values[key] = value
+
+        return values
+
+    def set_many(self, mapping, timeout=None):
+        if timeout is None:
+            timeout = self.default_timeout
+
+        pipeline = self.connection.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.set(self._get_key(key), value, ex=timeout or None)
+        pipeline.execute()
 
     def delete(self, key):
         self.connection.delete(self._get_key(key))
 
+    def delete_many(self, keys):
+        keys = [self._get_key(key) for key in keys]
+        if keys:
+            self.connection.delete(*keys)
+
+    def incr(self, key, delta=1):
+        return self.connection.incrby(self._get_key(key), delta)
+
+    def decr(self, key, delta=1):
+        return self.connection.decrby(self._get_key(key), delta)
+
     def clear(self):
         for key in self.connection.scan_iter('{}:*'.format(self.key_prefix)):
             self.connection.delete(key)
+
+    def after_fork(self):
+        # forget the inherited connections, without closing them, as they
+        # are still used by the parent
+        self.connection.connection_pool.reset()
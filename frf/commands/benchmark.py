@@ -0,0 +1,109 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import sys
+
+import tabulate
+
+from frf import benchmark
+from frf.commands.base import BaseCommand
+
+
+class Command(BaseCommand):
+    description = 'run benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'patterns', nargs='*', metavar='pattern',
+            help='Only run benchmarks matching these patterns, '
+            'like "serializer.*".')
+        parser.add_argument(
+            '-o', '--output', metavar='FILE',
+            help='Write the results as JSON to FILE ("-" for stdout).')
+        parser.add_argument(
+            '-b', '--baseline', metavar='FILE',
+            help='Compare against results previously written with -o, and '
+            'exit with status 1 if any benchmark got slower.')
+        parser.add_argument(
+            '-t', '--threshold', type=float, default=0.1,
+            help='Relative change considered a regression when comparing '
+            '(default: 0.1).')
+        parser.add_argument(
+            '-r', '--repeat', type=int, default=5,
+            help='Samples per benchmark (default: 5).')
+        parser.add_argument(
+            '--min-time', type=float, default=0.1,
+            help='Minimum seconds per sample (default: 0.1).')
+        parser.add_argument(
+            '-l', '--list', action='store_true',
+            help='List the benchmarks and exit.')
+
+    def print_results(self, name, result):
+        self.info('{:<50} {:>12} +- {}'.format(
+            name, benchmark.format_time(result['median']),
+            benchmark.format_time(result['stdev'])))
+
+    def handle(self, args):
+        registry = benchmark.load()
+
+        if args.list:
+            for bench in registry.values():
+                for name, param in bench.cases():
+                    self.info(name)
+            return
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = benchmark.loads(f.read())
+
+        quiet = args.output == '-'
+
+        report = benchmark.run(
+            patterns=args.patterns, repeat=args.repeat,
+            min_time=args.min_time,
+            callback=None if quiet else self.print_results)
+
+        if args.output:
+            data = benchmark.dumps(report) + '\n'
+            if quiet:
+                sys.stdout.write(data)
+            else:
+                with open(args.output, 'w') as f:
+                    f.write(data)
+
+        if baseline is None:
+            return
+
+        rows = benchmark.compare(baseline, report, threshold=args.threshold)
+
+        if not quiet:
+            self.info('')
+            self.info(tabulate.tabulate(
+                [(name, benchmark.format_time(base),
+                  benchmark.format_time(current),
+                  '-' if change is None else '{:+.1%}'.format(change),
+                  status) for name, base, current, change, status in rows],
+                headers=('benchmark', 'baseline', 'current', 'change', '')))
+
+        slower = [row[0] for row in rows if row[4] == 'slower']
+        if slower:
+            self.error('{} benchmark(s) got slower: {}'.format(
+                len(slower), ', '.join(slower)))
+            sys.exit(1)
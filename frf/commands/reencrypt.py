@@ -0,0 +1,68 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+from frf import db
+from frf.commands.base import BaseCommand
+from frf.models.types.encryption import reencrypt_table
+from frf.utils.importing import import_class
+
+
+class Command(BaseCommand):
+    description = 're-encrypt encrypted columns with the current key'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'model', help='Import path of the model, like "app.models.User".')
+        parser.add_argument(
+            '-c', '--columns', nargs='+', metavar='COLUMN',
+            help='Only re-encrypt these columns (default: all encrypted '
+            'columns).')
+        parser.add_argument(
+            '-b', '--batch-size', type=int, default=1000,
+            help='Rows per batch, each batch is committed (default: 1000).')
+        parser.add_argument(
+            '-s', '--start-after', metavar='PK',
+            help='Resume after this primary key, as printed by a previous '
+            'run.')
+
+    def handle(self, args):
+        model = import_class(args.model)
+        table = model.__table__
+
+        primary_key = list(table.primary_key.columns)[0]
+
+        start_after = args.start_after
+        if start_after is not None:
+            start_after = primary_key.type.python_type(start_after)
+
+        total_read = total_updated = 0
+        try:
+            for last, read, updated in reencrypt_table(
+                    db.session, table, columns=args.columns,
+                    batch_size=args.batch_size, start_after=start_after):
+                total_read += read
+                total_updated += updated
+                self.info('{} rows read, {} re-encrypted, up to {} {}'.format(
+                    total_read, total_updated, primary_key.name, last))
+        except ValueError as e:
+            self.error(str(e))
+            return
+
+        self.greet('Done: {} of {} rows re-encrypted.'.format(
+            total_updated, total_read))
@@ -0,0 +1,86 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import re
+
+import tabulate
+
+from frf import app
+from frf.commands.base import BaseCommand
+from frf.urls import RESPONDER_PREFIX
+from frf.utils.json import serialize
+
+_FIELD_NAME_RE = re.compile(r'{(\w+)')
+
+
+def describe(route):
+    """Return the route, its resource, and what handles each HTTP method.
+
+    For viewsets, the method is mapped to the action (like ``'GET':
+    'list'``), and for other resources to the responder.
+    """
+    resource = route.resource
+    handlers = {}
+
+    bound_actions = getattr(resource, 'bound_actions', None)
+    if bound_actions:
+        lookup = resource.obj_lookup_kwarg in _FIELD_NAME_RE.findall(
+            route.uri_template)
+        for (method, is_lookup), action in bound_actions.items():
+            if is_lookup == lookup:
+                handlers[method.upper()] = action
+    else:
+        allowed_methods = getattr(resource, 'allowed_methods', None)
+        for name in dir(resource):
+            if not name.startswith(RESPONDER_PREFIX):
+                continue
+
+            method = name[len(RESPONDER_PREFIX):]
+            if allowed_methods is None or method in allowed_methods:
+                handlers[method.upper()] = name
+
+    cls = type(resource)
+    return {
+        'route': route.uri_template,
+        'resource': '{}.{}'.format(cls.__module__, cls.__name__),
+        'methods': handlers,
+    }
+
+
+class Command(BaseCommand):
+    description = 'list the routes of the API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print the routes as JSON.')
+
+    def handle(self, args):
+        routes = [describe(route) for route in app.routes]
+
+        if args.json:
+            self.info(serialize(routes, indent=2, sort_keys=True))
+            return
+
+        self.info(tabulate.tabulate(
+            [(route['route'],
+              ', '.join('{} {}'.format(method, handler) for method, handler
+                        in sorted(route['methods'].items())),
+              route['resource']) for route in routes],
+            headers=('route', 'methods', 'resource')))
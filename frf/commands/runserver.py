@@ -17,9 +17,8 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
-import os
+import sys
 
-from frf import conf
 from frf.commands.base import BaseCommand
 
 
@@ -27,32 +26,65 @@ class Command(BaseCommand):
     description = 'start a gunicorn server'
 
     def add_arguments(self, parser):
+        # the defaults are in ``frf.server.DEFAULT_OPTIONS`` and the
+        # ``SERVER`` setting
+        from frf import server
+
         parser.add_argument(
-            '-b', '--bind', help='Address to bind to', default='0.0.0.0:8080')
+            '-b', '--bind', help='Address to bind to')
         parser.add_argument(
-            '-t', '--threads', help='Number of threads', default=1)
+            '-t', '--threads', type=int, help='Number of threads')
         parser.add_argument(
-            '-w', '--workers', help='Number of workers', default=2)
+            '-w', '--workers', type=int, help='Number of workers')
         parser.add_argument(
-            '-r', '--reload', action='store_const', const='reload',
-            default='reload', help='Reload on code change')
-
-        default = 30
-        if conf.DEBUG:
-            default = 120
+            '-k', '--worker-class', choices=server.WORKER_CLASSES,
+            help='The worker class')
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help='Serve the ASGI app with uvicorn workers, so async views '
+            'do not tie up a thread per request')
+        parser.add_argument(
+            '--preload', action='store_const', const=True,
+            help='Load the app before forking the workers, so they share it')
+        parser.add_argument(
+            '--max-requests', type=int,
+            help='Restart workers after this many requests')
+        parser.add_argument(
+            '--max-requests-jitter', type=int,
+            help='Add up to this many requests to --max-requests, so workers '
+            'do not all restart at once')
         parser.add_argument(
-            '-T', '--timeout', help='Worker timeout', default=default)
+            '--keepalive', type=int,
+            help='Seconds to wait for requests on a Keep-Alive connection')
+        parser.add_argument(
+            '-r', '--reload', action='store_const', const=True,
+            help='Reload on code change (requires DEBUG)')
+        parser.add_argument(
+            '-T', '--timeout', type=int, help='Worker timeout')
 
     def handle(self, args):
+        from frf import server
+
+        worker_class = args.worker_class
+        if args.asgi:
+            worker_class = server.ASGI_WORKER_CLASS
+
+        try:
+            options = server.get_options(
+                bind=args.bind,
+                workers=args.workers,
+                threads=args.threads,
+                worker_class=worker_class,
+                preload_app=args.preload,
+                max_requests=args.max_requests,
+                max_requests_jitter=args.max_requests_jitter,
+                keepalive=args.keepalive,
+                reload=args.reload,
+                timeout=args.timeout,
+            )
+        except ValueError as e:
+            self.error(str(e))
+            sys.exit(-1)
+
         self.greet('Oh hai, starting gunicorn...')
-        app_name = os.path.basename(conf.get('BASE_DIR'))
-        os.system(
-            'gunicorn {} --access-logfile - --error-logfile - --bind {} '
-            '--workers {} --timeout {} --threads {} {}:app.api'.format(
-                '--reload' if args.reload == 'reload' else '',
-                args.bind,
-                args.workers,
-                args.timeout,
-                args.threads,
-                app_name,
-            ))
+        server.run(options, asgi=args.asgi)
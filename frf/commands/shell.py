@@ -19,11 +19,6 @@
 
 import code
 
-try:
-    import IPython
-except:
-    IPython = None
-
 from frf.commands.base import BaseCommand
 
 
@@ -31,6 +26,12 @@ class Command(BaseCommand):
     description = 'start an interactive shell'
 
     def handle(self, *args):
+        # imported here, so other commands don't spend time importing it
+        try:
+            import IPython
+        except ImportError:
+            IPython = None
+
         if IPython:
             IPython.embed()
         else:
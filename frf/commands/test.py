@@ -19,8 +19,6 @@
 
 import sys
 
-import pytest
-
 from frf import conf, db
 from frf.commands.base import BaseCommand
 
@@ -57,4 +55,6 @@ class Command(BaseCommand):
         sys.argv = sys.argv[1:]
 
         self.setup_database()
+
+        import pytest
         sys.exit(pytest.main())
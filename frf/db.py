@@ -57,21 +57,113 @@ UUID('2d2fac55-71e9-45c6-b349-13e706efa8f4')
 >>>
 """
 
+from concurrent import futures
 import contextlib
 import importlib
 import inspect
+import itertools
+import os
+import time
+import weakref
 
-from sqlalchemy import create_engine, orm
+from sqlalchemy import create_engine, event, exc, orm, pool, sql
 from sqlalchemy.util import ScopedRegistry, ThreadLocalRegistry
 
 from frf import conf, models
 from frf.exceptions import DatabaseError
+from frf.utils import aio
 from frf.utils.db import _QueryProperty
+from frf.utils.importing import import_class
 from frf.utils.json import deserialize, serialize
 
 
+REPLICA_KEY = '_frf_replica'
+WROTE_KEY = '_frf_wrote'
+
+# the statements that go to replicas
+_READS = (sql.expression.Select, sql.expression.CompoundSelect)
+
+
+class Replica(object):
+    """A read replica engine, and its health.
+
+    After a connection error, the replica is considered down for
+    ``retry_interval`` seconds, and reads go to the other replicas, or to the
+    primary.
+    """
+    def __init__(self, engine, retry_interval=30):
+        self.engine = engine
+        self.retry_interval = retry_interval
+        self.down_until = 0
+
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def _handle_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+    def mark_down(self):
+        self.down_until = time.monotonic() + self.retry_interval
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.down_until
+
+
+class RoutingSession(orm.Session):
+    """Session that sends reads to a replica, inside :func:`replica`.
+
+    All the reads of a :func:`replica` block go to the same replica, so they
+    see the same replication point.  If a read fails on it, it is retried
+    once on the primary, and the rest of the block reads from the primary.
+
+    Only ``SELECT`` statements are reads.  Flushes, and any other statement,
+    including textual ones, go to the primary, and once the session has
+    written, so do reads, so that a request reads its own writes.
+    """
+    def get_bind(self, mapper=None, clause=None):
+        chosen = self.info.get(REPLICA_KEY)
+        if chosen is not None:
+            if self._flushing or not isinstance(clause, _READS):
+                self.info[WROTE_KEY] = True
+            elif not self.info.get(WROTE_KEY):
+                if chosen.healthy:
+                    return chosen.engine
+                self.info[REPLICA_KEY] = None
+
+        return super().get_bind(mapper=mapper, clause=clause)
+
+    def with_primary_fallback(self, func, *args, **kwargs):
+        """Call ``func``, and call it again on the primary if it fails on a
+        replica.
+
+        Used by :meth:`execute` and by ``BaseQuery``, so that a replica that
+        goes down, or cancels a query, doesn't fail the request.
+        """
+        chosen = self.info.get(REPLICA_KEY)
+
+        try:
+            return func(*args, **kwargs)
+        except exc.OperationalError:
+            # only reads go to the replica, and they don't change the keys
+            if chosen is None or self.info.get(WROTE_KEY) or \
+                    self.info.get(REPLICA_KEY) is not chosen:
+                raise
+
+        self.info[REPLICA_KEY] = None
+        return func(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self.with_primary_fallback(super().execute, *args, **kwargs)
+
+
 engine = None
-session = orm.scoped_session(orm.sessionmaker())
+session = orm.scoped_session(orm.sessionmaker(class_=RoutingSession))
+replicas = []
+executor = None
+
+_pool_counters = weakref.WeakKeyDictionary()
+_replica_counter = itertools.count()
 
 
 def get_engine():
@@ -79,7 +171,51 @@ def get_engine():
     return engine
 
 
-def init(connection_uri, echo=False, scopefunc=None):
+#: Settings for the engine options of :func:`init`, used by
+#: :func:`frf.app.init`.
+ENGINE_SETTINGS = {
+    'pool_size': 'SQLALCHEMY_POOL_SIZE',
+    'max_overflow': 'SQLALCHEMY_MAX_OVERFLOW',
+    'pool_timeout': 'SQLALCHEMY_POOL_TIMEOUT',
+    'pool_recycle': 'SQLALCHEMY_POOL_RECYCLE',
+    'pool_pre_ping': 'SQLALCHEMY_POOL_PRE_PING',
+    'poolclass': 'SQLALCHEMY_POOL_CLASS',
+    'executemany_mode': 'SQLALCHEMY_EXECUTEMANY_MODE',
+    'replica_uris': 'SQLALCHEMY_REPLICA_URIS',
+    'replica_retry_interval': 'SQLALCHEMY_REPLICA_RETRY_INTERVAL',
+    'async_threads': 'SQLALCHEMY_ASYNC_THREADS',
+}
+
+EXECUTEMANY_MODES = (None, 'batch')
+
+# ``pool_pre_ping`` is native in SQLAlchemy 1.2+, it is emulated otherwise.
+_NATIVE_PRE_PING = 'pre_ping' in inspect.signature(
+    pool.Pool.__init__).parameters
+
+
+def get_engine_options():
+    """Return the :func:`init` engine options set in the settings.
+
+    See ``ENGINE_SETTINGS`` for the setting names.  ``SQLALCHEMY_POOL_CLASS``
+    may be an import path.
+    """
+    options = {}
+
+    for option, setting in ENGINE_SETTINGS.items():
+        value = conf.get(setting)
+        if value is not None:
+            options[option] = value
+
+    if isinstance(options.get('poolclass'), str):
+        options['poolclass'] = import_class(options['poolclass'])
+
+    return options
+
+
+def init(connection_uri, echo=False, scopefunc=None, pool_size=None,
+         max_overflow=None, pool_timeout=None, pool_recycle=None,
+         pool_pre_ping=False, poolclass=None, executemany_mode=None,
+         replica_uris=None, replica_retry_interval=30, async_threads=None):
     """Initialize the session.
 
     Args:
@@ -91,21 +227,59 @@ def init(connection_uri, echo=False, scopefunc=None):
             http://docs.sqlalchemy.org/en/latest/orm/contextual.html#sqlalchemy.orm.scoping.scoped_session.__init__
             for more information.  If this is not passed, the "thread-local"
             scope will be assumed.
+        pool_size (int): Number of connections kept open by the pool.
+        max_overflow (int): Number of connections that can be opened above
+            ``pool_size`` when they are all checked out.
+        pool_timeout (int): Seconds to wait for a connection when
+            ``pool_size + max_overflow`` are checked out.
+        pool_recycle (int): Replace connections older than this many
+            seconds.  Set it below the server's (or proxy's) idle timeout.
+        pool_pre_ping (bool): Test connections when they are checked out,
+            and transparently replace the ones that were dropped, for
+            instance after a database failover.
+        poolclass (type): The ``sqlalchemy.pool.Pool`` class to use instead
+            of the dialect's default.  The size options only apply to
+            ``QueuePool``, the default for PostgreSQL and MySQL.
+        executemany_mode (str): Set to ``'batch'`` to run ``executemany``
+            (bulk inserts and updates) with ``psycopg2.extras.execute_batch``
+            on PostgreSQL, which sends many statements per round trip.
+        replica_uris (list): Connection uris of read replicas, see
+            :func:`replica`.  They use the same engine options.
+        replica_retry_interval (int): Seconds a replica is skipped for after
+            a connection error.
+        async_threads (int): Number of threads :func:`run_sync` uses.
+            Defaults to the event loop's default executor.
     """
-    global engine, session
+    global engine, executor, session
 
     from frf.models import Model
 
-    if 'postgres' in connection_uri:
-        engine = create_engine(
-            connection_uri,
-            echo=echo,
-            json_serializer=serialize,
-            json_deserializer=deserialize)
-    else:
-        engine = create_engine(
-            connection_uri,
-            echo=echo)
+    if executemany_mode not in EXECUTEMANY_MODES:
+        raise DatabaseError(
+            'Invalid executemany_mode: {}'.format(executemany_mode))
+
+    options = {
+        'echo': echo,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': pool_pre_ping,
+        'poolclass': poolclass,
+        'executemany_mode': executemany_mode,
+    }
+
+    engine = _create_engine(connection_uri, **options)
+
+    replicas[:] = [
+        Replica(_create_engine(uri, **options), replica_retry_interval)
+        for uri in replica_uris or ()]
+
+    if executor is not None:
+        executor.shutdown(wait=False)
+    executor = None
+    if async_threads:
+        executor = futures.ThreadPoolExecutor(max_workers=async_threads)
 
     if scopefunc is not None:
         session.registry = ScopedRegistry(
@@ -117,6 +291,250 @@ def init(connection_uri, echo=False, scopefunc=None):
     Model.query = _QueryProperty(session)
 
 
+def _create_engine(connection_uri, echo=False, pool_size=None,
+                   max_overflow=None, pool_timeout=None, pool_recycle=None,
+                   pool_pre_ping=False, poolclass=None, executemany_mode=None):
+    options = {'echo': echo}
+
+    if 'postgres' in connection_uri:
+        options.update(
+            json_serializer=serialize,
+            json_deserializer=deserialize)
+
+    for name, value in (('pool_size', pool_size),
+                        ('max_overflow', max_overflow),
+                        ('pool_timeout', pool_timeout),
+                        ('pool_recycle', pool_recycle),
+                        ('poolclass', poolclass)):
+        if value is not None:
+            options[name] = value
+
+    if pool_pre_ping and _NATIVE_PRE_PING:
+        options['pool_pre_ping'] = True
+
+    new_engine = create_engine(connection_uri, **options)
+
+    _listen_pool(new_engine)
+
+    if pool_pre_ping and not _NATIVE_PRE_PING:
+        event.listen(new_engine, 'engine_connect', _ping_connection)
+
+    if executemany_mode == 'batch' and \
+            new_engine.dialect.driver == 'psycopg2':
+        event.listen(new_engine, 'do_executemany', _execute_batch)
+
+    return new_engine
+
+
+def _ping_connection(connection, branch):
+    # SQLAlchemy's "pessimistic disconnect handling" recipe, for versions
+    # without ``pool_pre_ping``.
+    if branch:
+        return
+
+    should_close_with_result = connection.should_close_with_result
+    connection.should_close_with_result = False
+
+    try:
+        connection.scalar(sql.select([1]))
+    except exc.DBAPIError as e:
+        # the pool was invalidated, try again with a new connection
+        if e.connection_invalidated:
+            connection.scalar(sql.select([1]))
+        else:
+            raise
+    finally:
+        connection.should_close_with_result = should_close_with_result
+
+
+def _execute_batch(cursor, statement, parameters, context):
+    from psycopg2 import extras
+
+    extras.execute_batch(cursor, statement, parameters)
+    return True
+
+
+class _PoolCounters(object):
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        self.forked = 0
+
+
+def _listen_pool(engine):
+    counters = _pool_counters[engine] = _PoolCounters()
+
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info['pid'] = os.getpid()
+        counters.connects += 1
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pid = os.getpid()
+
+        if connection_record.info.get('pid', pid) != pid:
+            # the connection was inherited from the parent process, which
+            # still uses it: drop it without closing it.
+            counters.forked += 1
+            connection_record.connection = None
+            connection_proxy.connection = None
+            raise exc.DisconnectionError(
+                'Connection record belongs to pid {}, attempting to check '
+                'out in pid {}'.format(connection_record.info['pid'], pid))
+
+        counters.checkouts += 1
+
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        counters.invalidations += 1
+
+    event.listen(engine, 'connect', on_connect)
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'invalidate', on_invalidate)
+
+
+def pool_stats(engine=None):
+    """Return connection pool statistics, for monitoring.
+
+    Args:
+        engine (Engine): Defaults to the engine set up by :func:`init`.
+
+    Returns:
+        dict: The ``pool`` class name; the configured ``size``, and the
+            number of connections ``checked_in``, ``checked_out`` and in
+            ``overflow`` (``None`` for pools other than ``QueuePool``); and
+            counters since :func:`init`: new ``connects``, ``checkouts``,
+            ``invalidations`` and connections dropped because they were
+            inherited across a fork (``forked``).
+    """
+    if engine is None:
+        engine = globals()['engine']
+
+    if engine is None:
+        raise DatabaseError('Database is not yet initialized')
+
+    engine_pool = engine.pool
+    counters = _pool_counters.get(engine) or _PoolCounters()
+
+    def call(name):
+        method = getattr(engine_pool, name, None)
+        return method() if method is not None else None
+
+    return {
+        'pool': type(engine_pool).__name__,
+        'size': call('size'),
+        'checked_in': call('checkedin'),
+        'checked_out': call('checkedout'),
+        'overflow': call('overflow'),
+        'connects': counters.connects,
+        'checkouts': counters.checkouts,
+        'invalidations': counters.invalidations,
+        'forked': counters.forked,
+    }
+
+
+def choose_replica():
+    """Return the next healthy :class:`Replica`, round robin.
+
+    Returns ``None`` if there are no replicas, or none is healthy.
+    """
+    count = len(replicas)
+    start = next(_replica_counter)
+
+    for i in range(count):
+        candidate = replicas[(start + i) % count]
+        if candidate.healthy:
+            return candidate
+
+    return None
+
+
+@contextlib.contextmanager
+def replica(enabled=True):
+    """Send the reads of the current session to a read replica.
+
+    Configure replicas with the ``SQLALCHEMY_REPLICA_URIS`` setting.  The
+    outermost block picks the next healthy replica, in turn, and all the
+    queries of the block go to it, so that they are consistent with each
+    other (a list's rows and count, for example).  They go to the primary
+    if there is no healthy replica, and for the rest of the block once the
+    chosen replica fails.  Once the session flushes or executes a write, it
+    stays on the primary until the outermost block exits.
+
+    Viewsets use it for ``list`` and ``retrieve``, see
+    ``BasicViewSet.use_replica``.
+
+    Args:
+        enabled (bool): Set to ``False`` to make this a no-op.
+    """
+    if not enabled or not replicas:
+        yield
+        return
+
+    info = session().info
+    if REPLICA_KEY in info:
+        # nested, keep the replica of the outer block
+        yield
+        return
+
+    info[REPLICA_KEY] = choose_replica()
+
+    try:
+        yield
+    finally:
+        info.pop(REPLICA_KEY, None)
+        info.pop(WROTE_KEY, None)
+
+
+def _call_in_session(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        session.remove()
+
+
+def run_sync(func, *args, **kwargs):
+    """Run blocking database code from ``async`` code.
+
+    SQLAlchemy is synchronous, so ``async`` views run their database work
+    with this, in a thread pool (see the ``SQLALCHEMY_ASYNC_THREADS``
+    setting), which leaves the event loop free to serve other requests:
+
+    >>> books = await db.run_sync(lambda: models.Book.query.all())
+
+    The thread's session is removed when ``func`` returns, so objects that
+    are returned are detached.  Serialize them inside ``func`` if they have
+    relationships that aren't loaded yet.
+
+    Returns:
+        asyncio.Future: The result of ``func``.
+    """
+    return aio.run_in_executor(
+        _call_in_session, func, args, kwargs, executor=executor)
+
+
+def dispose_after_fork():
+    """Replace the connection pool in a newly forked process.
+
+    When the app is loaded before forking (gunicorn's ``--preload``),
+    worker processes inherit the parent's pooled connections, and two
+    processes must never talk over the same connection.  Call this from the
+    worker after the fork (gunicorn's ``post_fork`` hook): the pool is
+    replaced by an empty one, without closing the inherited connections,
+    which still belong to the parent.
+
+    Connections that are checked out from a pool in a process other than
+    the one that opened them are also discarded, so this is a safety net
+    rather than a requirement.
+    """
+    if engine is None:
+        return
+
+    session.registry.clear()
+
+    for each in [engine] + [r.engine for r in replicas]:
+        each.pool = each.pool.recreate()
+
+
 def create_all():
     """Create all tables in the database.
 
@@ -18,7 +18,6 @@
 # above.
 
 from gettext import gettext as _
-import json
 import logging
 import traceback
 
@@ -34,6 +33,7 @@ from falcon.errors import (  # noqa
     )
 
 from frf import conf
+from frf.utils.json import serialize
 
 logger = logging.getLogger(__name__)
 
@@ -77,4 +77,4 @@ def error_serializer(req, resp, exception):
     if headers:
         resp.set_headers(headers)
 
-    resp.body = json.dumps(body)
+    resp.body = serialize(body)
@@ -1,16 +1,12 @@
 #!/usr/bin/env python
 
 import argparse
+import collections
 import importlib
 import sys
 
 import tabulate
 
-try:
-    import pyfiglet
-except ImportError:
-    pyfiglet = None
-
 from frf import conf
 from frf.utils.cli import colors
 
@@ -40,10 +36,13 @@ class CommandArgumentParser(argparse.ArgumentParser):
 
 
 def find_commands():
-    """Load command modules.
+    """Find the command modules.
+
+    The default command modules, plus the modules from the `COMMAND_MODULES`
+    setting.  They aren't imported, see ``load_command``.
 
-    Loads the default command modules, plus the modules from the
-    `COMMAND_MODULES` setting.
+    Returns:
+        OrderedDict: The module names, by command name.
     """
     module_names = [
         'frf.commands.runserver',
@@ -51,46 +50,69 @@ def find_commands():
         'frf.commands.test',
         'frf.commands.syncdb',
         'frf.commands.startapp',
+        'frf.commands.benchmark',
+        'frf.commands.reencrypt',
+        'frf.commands.routes',
         ]
 
     module_names += conf.get('COMMAND_MODULES', [])
 
-    commands = {}
+    commands = collections.OrderedDict()
 
     for module_name in module_names:
-        module = importlib.import_module(module_name)
-        cls = getattr(module, 'Command', None)
-        if not cls:
-            sys.stderr.write(
-                'Could not get management command'
-                ' from class: {}.Command\n'.format(module_name))
-            sys.exit(-1)
         command_name = module_name[module_name.rfind('.') + 1:]
-        commands[command_name] = cls
+        commands[command_name] = module_name
 
     return commands
 
 
+def load_command(module_name):
+    """Import a command module, and return its ``Command`` class."""
+    module = importlib.import_module(module_name)
+    cls = getattr(module, 'Command', None)
+    if not cls:
+        sys.stderr.write(
+            'Could not get management command'
+            ' from class: {}.Command\n'.format(module_name))
+        sys.exit(-1)
+
+    return cls
+
+
+def banner(figlet=False):
+    """Return the project name, rendered with pyfiglet if ``figlet``."""
+    text = conf.get('PROJECT_NAME', 'frf')
+
+    if figlet:
+        # imported here, as it is slow to import and render
+        try:
+            import pyfiglet
+        except ImportError:
+            pass
+        else:
+            return pyfiglet.Figlet(font='slant').renderText(text)
+
+    return text + '\n'
+
+
 def main():
     """The main command loader.
 
-    Args:
-        module_name (str): The main module name (where `app.init()` lives).
+    Only the module of the command that is run is imported.  The list of
+    commands imports all of them.
     """
-    if pyfiglet:
-        figlet = pyfiglet.Figlet(font='slant')
-        text = figlet.renderText(conf.get('PROJECT_NAME'))
-    else:
-        text = conf.get('PROJECT_NAME', 'frf') + '\n'
-
-    col = colors.ColorText()
-    sys.stdout.writelines([
-        col.lightmagenta(text).value(), '~' * 70, '\n'])
-
     argv = sys.argv[:]
     args, _ = globalparser.parse_known_args()
     commands = find_commands()
 
+    # the banner goes to stderr when a command runs, so the command's own
+    # output can be piped (like ``benchmark -o -``)
+    col = colors.ColorText()
+    out = sys.stderr if args.command else sys.stdout
+    out.writelines([
+        col.lightmagenta(banner(figlet=not args.command)).value(),
+        '~' * 70, '\n'])
+
     if args.command:
         if args.command not in commands:
             sys.stderr.writelines([
@@ -103,7 +125,7 @@ def main():
         # create a new parser
         parser = CommandArgumentParser(
             args.command, description='Run management commands.')
-        command = commands[args.command]()
+        command = load_command(commands[args.command])()
         command.add_arguments(parser)
 
         if getattr(command, 'parse_arguments', True):
@@ -121,7 +143,7 @@ def main():
         keys.sort()
 
         for command in keys:
-            cls = commands.get(command)
+            cls = load_command(commands[command])
             table.append((
                 col.reset(' ').green(command).reset('').value(),
                 col.reset('- ').reset(getattr(
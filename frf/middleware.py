@@ -17,7 +17,16 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
-from frf import db
+import logging
+import random
+
+from frf import conf, db, profiling
+from frf.utils import queries
+from frf.utils.importing import import_class
+
+logger = logging.getLogger(__name__)
+
+QUERY_RECORDER_CONTEXT_KEY = '_frf_queries'
 
 
 class SQLAlchemyMiddleware(object):
@@ -42,3 +51,112 @@ class SQLAlchemyMiddleware(object):
     def process_response(self, req, resp, resource):
         # close db session
         db.session.remove()
+
+
+class ProfilingMiddleware(object):
+    """Per-request profiling middleware.
+
+    Times the phases of viewset requests and counts their SQL queries (see
+    :mod:`frf.profiling`).  Timings are sent in a ``Server-Timing`` header and
+    passed to the configured sink.
+
+    To enable, add to your `MIDDLEWARE_CLASSES` in your settings, as early as
+    possible, so that the time spent in other middleware is counted, IE:
+
+    ```python
+    MIDDLEWARE_CLASSES = [
+        'frf.middleware.ProfilingMiddleware',
+        'frf.middleware.SQLAlchemyMiddleware',
+    ]
+    ```
+
+    The ``PROFILING`` setting controls sampling, the header and the sink.
+    Streamed responses are sent after the middleware has run, so the time
+    spent streaming them isn't included.
+    """
+    def __init__(self):
+        settings = conf.get('PROFILING', {})
+
+        self.sample_rate = settings.get('sample_rate', 1.0)
+        self.send_header = settings.get('header', True)
+        self.sink = import_class(
+            settings.get('sink', 'frf.profiling.LoggingSink'))()
+
+    def process_request(self, req, resp):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+
+        profile = profiling.Profile()
+        req.context[profiling.PROFILE_CONTEXT_KEY] = profile
+        profiling.set_current(profile)
+
+    def process_response(self, req, resp, resource):
+        profile = req.context.get(profiling.PROFILE_CONTEXT_KEY)
+        if profile is None:
+            return
+
+        profiling.set_current(None)
+        profile.finish()
+
+        if self.send_header:
+            resp.set_header('Server-Timing', profile.server_timing())
+
+        try:
+            self.sink.record(req, resp, profile)
+        except Exception:
+            logger.exception('Error recording the request profile.')
+
+
+class QueryInspectionMiddleware(object):
+    """Development middleware that warns about likely N+1 queries.
+
+    Records the SQL queries of each request, and logs a warning for each
+    statement shape (see :func:`frf.utils.queries.shape`) that was executed
+    more than ``threshold`` times.  That is usually a relationship being
+    lazy loaded once per object by a serializer, which can be fixed with
+    ``select_related`` or ``prefetch_related`` on the viewset.
+
+    To enable, add to your `MIDDLEWARE_CLASSES` in your settings, IE:
+
+    ```python
+    MIDDLEWARE_CLASSES = [
+        'frf.middleware.QueryInspectionMiddleware',
+        'frf.middleware.SQLAlchemyMiddleware',
+    ]
+    ```
+
+    It is configured with the ``QUERY_INSPECTION`` setting, and only active
+    when ``DEBUG`` is set, unless ``enabled`` says otherwise:
+
+    ```python
+    QUERY_INSPECTION = {
+        'enabled': True,
+        'threshold': 10,
+    }
+    ```
+    """
+    def __init__(self):
+        settings = conf.get('QUERY_INSPECTION', {})
+
+        self.enabled = settings.get('enabled', conf.get('DEBUG', False))
+        self.threshold = settings.get('threshold', 10)
+
+    def process_request(self, req, resp):
+        if not self.enabled:
+            return
+
+        recorder = queries.QueryRecorder()
+        req.context[QUERY_RECORDER_CONTEXT_KEY] = recorder
+        queries.observe(recorder)
+
+    def process_response(self, req, resp, resource):
+        recorder = req.context.get(QUERY_RECORDER_CONTEXT_KEY)
+        if recorder is None:
+            return
+
+        queries.unobserve(recorder)
+
+        for statement, count in recorder.repeated(self.threshold):
+            logger.warning(
+                'Possible N+1 queries: %s %s executed %d times: %s',
+                req.method, req.path, count, statement)
@@ -20,7 +20,6 @@
 import binascii
 import uuid
 
-from Crypto.Cipher import AES
 import pytz
 import sqlalchemy
 
@@ -30,6 +29,7 @@ from sqlalchemy.types import CHAR, Text, TypeDecorator
 
 from frf.models.types.encryption import (  # noqa
     EncryptedType, EncryptedDictionaryType)
+from frf.utils import encryption
 
 
 class DateTime(TypeDecorator):
@@ -146,13 +146,13 @@ class MutableList(Mutable, list):
 
 
 def aes_encrypt(data, key):
-    cipher = AES.new(key)
+    cipher = encryption.get_aes().new(key)
     data = data + (" " * (16 - (len(data) % 16)))
     return binascii.hexlify(cipher.encrypt(data))
 
 
 def aes_decrypt(data, key):
-    cipher = AES.new(key)
+    cipher = encryption.get_aes().new(key)
     return cipher.decrypt(binascii.unhexlify(data)).rstrip()
 
 
@@ -2,10 +2,12 @@
 import datetime
 import json
 
-from sqlalchemy.types import Binary, String, TypeDecorator
+import sqlalchemy
+from sqlalchemy import orm
+from sqlalchemy.types import Binary, LargeBinary, String, TypeDecorator
 
 from frf.models.types.scalar_coercible import ScalarCoercible
-from frf.utils.encryption import AESCipher
+from frf.utils.encryption import AESCipher, get_cipher, KeyRing
 
 
 class EncryptedType(TypeDecorator, ScalarCoercible):
@@ -31,6 +33,33 @@ class EncryptedType(TypeDecorator, ScalarCoercible):
     class SomeModel(models.Model):
         credentials = Column(EncryptedType(Text, key='encryptionkey'))))
     ```
+
+    ``key`` may be a callable, which is called for each value.  ``engine``
+    is the cipher class, :class:`frf.utils.encryption.AESCipher` (AES-CBC
+    with HMAC-SHA512) by default.  :class:`frf.utils.encryption.AESGCMCipher`
+    uses AES-GCM, and still decrypts values encrypted by ``AESCipher``:
+
+    ```
+    from frf.utils.encryption import AESGCMCipher
+
+    class SomeModel(models.Model):
+        credentials = Column(EncryptedType(
+            Text, key='encryptionkey', engine=AESGCMCipher))
+    ```
+
+    To rotate keys, ``key`` can be (or return) a
+    :class:`frf.utils.encryption.KeyRing`.  While the ring has more than
+    the current key, the encrypted columns of updated rows are re-encrypted
+    with the current key, and ``manage.py reencrypt`` re-encrypts the rest:
+
+    ```
+    from frf.utils.encryption import KeyRing
+
+    keys = KeyRing([('2', 'newkey'), ('1', 'encryptionkey')])
+
+    class SomeModel(models.Model):
+        credentials = Column(EncryptedType(Text, key=keys))
+    ```
     """
 
     impl = Binary
@@ -47,7 +76,8 @@ class EncryptedType(TypeDecorator, ScalarCoercible):
         self._key = key
         if not engine:
             engine = AESCipher
-        self.engine = engine()
+        # the cipher class, see ``get_cipher``
+        self.engine = engine
 
     @property
     def key(self):
@@ -57,15 +87,51 @@ class EncryptedType(TypeDecorator, ScalarCoercible):
     def key(self, value):
         self._key = value
 
-    def _update_key(self):
-        key = self._key() if callable(self._key) else self._key
-        self.engine._update_key(key)
+    def _get_key(self):
+        return self._key() if callable(self._key) else self._key
+
+    def _encrypt(self, value):
+        key = self._get_key()
+        if isinstance(key, KeyRing):
+            return key.encrypt(self.engine, value)
+
+        return get_cipher(self.engine, key).encrypt(value)
+
+    def _decrypt(self, value):
+        key = self._get_key()
+        if isinstance(key, KeyRing):
+            return key.decrypt(self.engine, value)
+
+        return get_cipher(self.engine, key).decrypt(value)
+
+    @property
+    def rotating(self):
+        """``True`` if the key is a :class:`KeyRing` with old keys."""
+        key = self._get_key()
+        return isinstance(key, KeyRing) and key.rotating
+
+    def reencrypt(self, value):
+        """Re-encrypt a stored value with the current key.
+
+        Args:
+            value (bytes): The ciphertext, as stored in the database.
+
+        Returns:
+            bytes: The new ciphertext, or ``None`` if ``value`` was already
+                encrypted with the current key.
+        """
+        key = self._get_key()
+        if not isinstance(key, KeyRing):
+            raise ValueError('Re-encrypting requires a KeyRing key.')
+
+        if key.is_current(value):
+            return None
+
+        return key.encrypt(self.engine, key.decrypt(self.engine, value))
 
     def process_bind_param(self, value, dialect):
         """Encrypt a value on the way in."""
         if value is not None:
-            self._update_key()
-
             try:
                 value = self.underlying_type.process_bind_param(
                     value, dialect
@@ -82,44 +148,45 @@ class EncryptedType(TypeDecorator, ScalarCoercible):
                 elif issubclass(type_, (datetime.date, datetime.time)):
                     value = value.isoformat()
 
-            return self.engine.encrypt(value)
+            return self._encrypt(value)
 
     def process_result_value(self, value, dialect):
         """Decrypt value on the way out."""
         if value is not None:
-            self._update_key()
-            decrypted_value = self.engine.decrypt(value)
+            decrypted_value = self._decrypt(value)
 
-            try:
+            # checked rather than catching the ``AttributeError``, which is
+            # slow when decrypting many rows
+            if hasattr(self.underlying_type, 'process_result_value'):
                 return self.underlying_type.process_result_value(
                     decrypted_value, dialect
                 )
 
-            except AttributeError:
-                # Doesn't have 'process_result_value'
+            # Handle 'boolean' and 'dates'
+            type_ = self.underlying_type.python_type
+            if type_ is str:
+                return decrypted_value
 
-                # Handle 'boolean' and 'dates'
-                type_ = self.underlying_type.python_type
-                if issubclass(type_, bool):
-                    return decrypted_value == 'true'
+            elif issubclass(type_, bool):
+                return decrypted_value == 'true'
 
-                elif issubclass(type_, datetime.datetime):
-                    return datetime.datetime.strptime(
-                        decrypted_value, '%Y-%m-%dT%H:%M:%S'
-                    )
+            elif issubclass(type_, datetime.datetime):
+                return datetime.datetime.strptime(
+                    decrypted_value, '%Y-%m-%dT%H:%M:%S'
+                )
 
-                elif issubclass(type_, datetime.time):
-                    return datetime.datetime.strptime(
-                        decrypted_value, '%H:%M:%S'
-                    ).time()
+            elif issubclass(type_, datetime.time):
+                return datetime.datetime.strptime(
+                    decrypted_value, '%H:%M:%S'
+                ).time()
 
-                elif issubclass(type_, datetime.date):
-                    return datetime.datetime.strptime(
-                        decrypted_value, '%Y-%m-%d'
-                    ).date()
+            elif issubclass(type_, datetime.date):
+                return datetime.datetime.strptime(
+                    decrypted_value, '%Y-%m-%d'
+                ).date()
 
-                # Handle all others
-                return self.underlying_type.python_type(decrypted_value)
+            # Handle all others
+            return type_(decrypted_value)
 
     def _coerce(self, value):
         if isinstance(self.underlying_type, ScalarCoercible):
@@ -154,3 +221,122 @@ class EncryptedDictionaryType(EncryptedType):
         value = super().process_result_value(value, dialect)
         if value is not None:
             return json.loads(value)
+
+
+_encrypted_attributes = {}
+
+
+def encrypted_attributes(mapper):
+    """Return the ``(attribute name, type)`` of encrypted column attributes.
+    """
+    try:
+        return _encrypted_attributes[mapper]
+    except KeyError:
+        pass
+
+    attributes = _encrypted_attributes[mapper] = [
+        (prop.key, prop.columns[0].type) for prop in mapper.column_attrs
+        if isinstance(prop.columns[0].type, EncryptedType)]
+    return attributes
+
+
+@sqlalchemy.event.listens_for(orm.Mapper, 'before_update')
+def _reencrypt_on_update(mapper, connection, target):
+    """Lazily re-encrypt the encrypted columns of updated rows.
+
+    Only while keys are being rotated, as the stored ciphertext, and so the
+    key it uses, isn't known here.
+    """
+    attributes = encrypted_attributes(mapper)
+    if not attributes:
+        return
+
+    # ``before_update`` is also called for rows without column changes,
+    # which aren't updated.
+    session = orm.object_session(target)
+    if not session.is_modified(target, include_collections=False):
+        return
+
+    state = sqlalchemy.inspect(target)
+    for name, type_ in attributes:
+        if name in state.dict and type_.rotating:
+            orm.attributes.flag_modified(target, name)
+
+
+def reencrypt_table(session, table, columns=None, batch_size=1000,
+                    start_after=None):
+    """Re-encrypt the encrypted columns of a table with their current key.
+
+    The rows are read in batches, in primary key order, and each batch is
+    committed, so this can run on a live database with bounded memory, and
+    be resumed from the last primary key it reported.  Rows are locked
+    (``SELECT ... FOR UPDATE``) until their batch is committed.  Values
+    already encrypted with the current key aren't written.
+
+    Args:
+        session (Session): The database session.
+        table (Table): The table.  It must have a single column primary key.
+        columns (list): Names of the columns to re-encrypt.  Defaults to all
+            the :class:`EncryptedType` columns.
+        batch_size (int): Rows per batch.
+        start_after: Only re-encrypt rows with a greater primary key.
+
+    Yields:
+        tuple: ``(last primary key, rows read, rows updated)`` after each
+            batch.
+    """
+    primary_key = list(table.primary_key.columns)
+    if len(primary_key) != 1:
+        raise ValueError(
+            '{} does not have a single column primary key.'.format(table))
+    primary_key = primary_key[0]
+
+    encrypted = [column for column in table.columns
+                 if isinstance(column.type, EncryptedType) and
+                 (columns is None or column.name in columns)]
+    if not encrypted:
+        raise ValueError('{} has no encrypted columns.'.format(table))
+
+    # read and write the ciphertexts, without the encryption of the type
+    query = sqlalchemy.select(
+        [primary_key] + [sqlalchemy.type_coerce(column, LargeBinary)
+                         for column in encrypted]
+    ).order_by(primary_key).limit(batch_size).with_for_update()
+    update = table.update().where(
+        primary_key == sqlalchemy.bindparam('_pk')).values({
+            column.name: sqlalchemy.bindparam(
+                '_' + column.name, type_=LargeBinary)
+            for column in encrypted})
+
+    last = start_after
+    while True:
+        batch_query = query
+        if last is not None:
+            batch_query = query.where(primary_key > last)
+
+        rows = session.execute(batch_query).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            values = {'_pk': row[0]}
+            changed = False
+
+            for column, value in zip(encrypted, row[1:]):
+                if value is not None:
+                    new_value = column.type.reencrypt(value)
+                    if new_value is not None:
+                        value = new_value
+                        changed = True
+                values['_' + column.name] = value
+
+            if changed:
+                params.append(values)
+
+        if params:
+            session.execute(update, params)
+        session.commit()
+
+        last = rows[-1][0]
+        yield last, len(rows), len(params)
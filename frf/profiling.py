@@ -0,0 +1,191 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""Per-request profiling.
+
+Enable :class:`frf.middleware.ProfilingMiddleware` to time the phases of
+viewset requests (see :func:`phase`) and the SQL queries they run.  The
+timings are sent back in a ``Server-Timing`` header, and passed to a sink.
+
+Configure it with the ``PROFILING`` setting:
+
+.. code-block:: text
+
+    PROFILING = {
+        # fraction of requests to profile
+        'sample_rate': 0.01,
+        # set to False to not send the ``Server-Timing`` header
+        'header': True,
+        # where the timings go, see ``BaseSink``
+        'sink': 'frf.profiling.LoggingSink',
+    }
+"""
+
+import collections
+import logging
+import threading
+import time
+
+from frf.utils import queries
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CONTEXT_KEY = '_frf_profile'
+
+_local = threading.local()
+
+
+class _Timer(object):
+    __slots__ = ('profile', 'name', 'start')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+class Profile(object):
+    """The timings of one request.
+
+    Attributes:
+        phases (OrderedDict): Seconds spent in each phase, in the order the
+            phases first ran.  A phase that runs more than once is summed.
+        sql_count (int): Number of SQL statements executed.
+        sql_time (float): Seconds spent executing them.
+        total (float): Seconds between the start and end of the request, set
+            by :meth:`finish`.
+    """
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.total = None
+        self.start = time.perf_counter()
+
+    def phase(self, name):
+        """Return a context manager that times the phase ``name``."""
+        return _Timer(self, name)
+
+    def add(self, name, duration):
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def record(self, query):
+        """Count a query, see :func:`frf.utils.queries.observe`."""
+        self.sql_count += 1
+        self.sql_time += query.duration
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def as_dict(self):
+        """Return the timings, in milliseconds."""
+        return {
+            'phases': collections.OrderedDict(
+                (name, duration * 1000)
+                for name, duration in self.phases.items()),
+            'sql_count': self.sql_count,
+            'sql_time': self.sql_time * 1000,
+            'total': self.total * 1000 if self.total is not None else None,
+        }
+
+    def server_timing(self):
+        """Format the timings as a ``Server-Timing`` header value."""
+        metrics = [
+            '{};dur={:.2f}'.format(name, duration * 1000)
+            for name, duration in self.phases.items()]
+
+        metrics.append('sql;dur={:.2f};desc="{} queries"'.format(
+            self.sql_time * 1000, self.sql_count))
+
+        if self.total is not None:
+            metrics.append('total;dur={:.2f}'.format(self.total * 1000))
+
+        return ', '.join(metrics)
+
+
+def phase(req, name):
+    """Time a phase of a request, if it is being profiled.
+
+    Usage:
+
+    .. code-block:: python
+
+        with profiling.phase(req, 'serialize'):
+            resp.body = serializer.serialize(qs, many=True)
+
+    When the request isn't profiled, this returns a shared no-op context
+    manager, so it costs a dictionary lookup.
+    """
+    profile = req.context.get(PROFILE_CONTEXT_KEY)
+    if profile is None:
+        return _null_timer
+    return _Timer(profile, name)
+
+
+def get_current():
+    """Return the :class:`Profile` of the request in this thread, if any."""
+    return getattr(_local, 'profile', None)
+
+
+def set_current(profile):
+    """Set the :class:`Profile` SQL queries in this thread are counted in."""
+    current = get_current()
+    if current is not None:
+        queries.unobserve(current)
+
+    _local.profile = profile
+    if profile is not None:
+        queries.observe(profile)
+
+
+class BaseSink(object):
+    """Receives the profile of each sampled request.
+
+    Subclass this and set the ``sink`` key of the ``PROFILING`` setting to
+    send the timings somewhere, like statsd.
+    """
+    def record(self, req, resp, profile):
+        raise NotImplementedError()
+
+
+class LoggingSink(BaseSink):
+    """Logs the timings to the ``frf.profiling`` logger."""
+    def record(self, req, resp, profile):
+        logger.info('%s %s %s %s', req.method, req.path, resp.status,
+                    profile.server_timing())
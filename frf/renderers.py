@@ -17,6 +17,7 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
+from frf.utils.json import get_backend as get_json_backend, serialize
 from frf.viewsets import ViewSet
 
 
@@ -24,12 +25,29 @@ class BaseRenderer(object):
     """Base Renderer.
 
     Subclass this to create your own renderers.
+
+    If your renderer can work on a streamed list (see
+    ``BasicViewSet.stream_list``), set ``streamable`` to ``True`` and implement
+    ``render_stream``.  Views that use a renderer that is not streamable will
+    not stream their lists.
     """
     list_only = False  # whether or not this is a list only renderer
+    streamable = False  # whether or not ``render_stream`` is implemented
 
     def render(self, req, resp, view, data):
         return data
 
+    def render_stream(self, req, resp, view, stream):
+        """Render a streamed list.
+
+        Args:
+            stream (iterator): Yields the JSON encoded list in pieces.
+
+        Returns:
+            iterator: The JSON encoded output, in pieces.
+        """
+        raise NotImplementedError()
+
 
 class ListMetaRenderer(BaseRenderer):
     """Render ``list`` with pagination information.
@@ -57,8 +75,12 @@ class ListMetaRenderer(BaseRenderer):
               "page_limit": 100
           }
         }
+
+    With cursor pagination, ``page`` is replaced by the ``next`` and ``prev``
+    cursors, and ``total`` is only present if it was requested.
     """
     list_only = True
+    streamable = True
 
     def render(self, req, resp, view, data):
         if isinstance(data, list):
@@ -68,3 +90,12 @@ class ListMetaRenderer(BaseRenderer):
             }
 
         return data
+
+    def render_stream(self, req, resp, view, stream):
+        item_separator, key_separator = get_json_backend().separators
+
+        yield '{{"meta"{key}{meta}{item}"results"{key}'.format(
+            meta=serialize(req.context.get(ViewSet.META_CONTEXT_KEY, {})),
+            item=item_separator, key=key_separator)
+        yield from stream
+        yield '}'
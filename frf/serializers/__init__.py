@@ -17,14 +17,58 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
+import copy
 from gettext import gettext as _
+import operator
+
+from frf.exceptions import InvalidFieldException,  ValidationError
+from frf.utils.json import deserialize
 
 from .fields import (  # noqa
-    Field, StringField, EmailField, BooleanField,
+    Field, StringField, EmailField, BooleanField, DateField,
     ISODateTimeField, SerializerField, ListField, UUIDField, JSONField,
     IntField, PrimaryKeyRelatedField,
 )
-from frf.exceptions import InvalidFieldException,  ValidationError
+
+
+def _uuid_to_data(value):
+    return str(value) if value else value
+
+
+def _isodatetime_to_data(value):
+    return value.isoformat() if value else value
+
+
+def _date_to_data(value):
+    return value.strftime('%Y-%m-%d') if value else value
+
+
+def _json_to_data(value):
+    return deserialize(value) if isinstance(value, str) else value
+
+
+#: Maps a field's ``to_data`` implementation to an equivalent function that
+#: only needs the value.  ``None`` means the value is passed through as is.
+#: Fields whose ``to_data`` is not listed here (including subclasses that
+#: override it) are called the regular way.
+DATA_CONVERTERS = {
+    Field.to_data: None,
+    UUIDField.to_data: _uuid_to_data,
+    ISODateTimeField.to_data: _isodatetime_to_data,
+    DateField.to_data: _date_to_data,
+    JSONField.to_data: _json_to_data,
+}
+
+_PLAIN = 0
+_VALUE = 1
+_FULL = 2
+
+
+def _source_getter(source):
+    if '.' in source:
+        # ``getattr`` doesn't traverse dotted names, but ``attrgetter`` does.
+        return lambda obj: getattr(obj, source)
+    return operator.attrgetter(source)
 
 
 class SerializerObject(object):
@@ -77,6 +121,9 @@ class Serializer(object):
     >>>
     """
 
+    #: Maximum number of derived serializers :meth:`subset` keeps.
+    SUBSET_CACHE_SIZE = 128
+
     def __init__(self, initial_fields=None):
         """Initialize the serializer."""
 
@@ -127,6 +174,98 @@ class Serializer(object):
                 if field in self.fields:
                     self.fields[field].required = True
 
+        self.build_plans()
+
+    def build_plans(self):
+        """Precompute how each field is validated and serialized.
+
+        This is called at the end of construction.  If you add or remove
+        fields from ``self.fields``, or change their settings afterwards, call
+        it again.
+        """
+        self.build_validation_plan()
+        self.build_serialization_plan()
+        self._subsets = {}
+
+    def subset(self, fields=None, exclude=None):
+        """Return a serializer for some of this serializer's fields.
+
+        The derived serializer shares this serializer's field instances and
+        validators.  It is cached, so asking for the same subset again is
+        cheap.
+
+        Args:
+            fields (list): The names of the fields to keep.  ``None`` keeps
+                all of them.
+            exclude (list): The names of the fields to leave out.
+
+        Raises:
+            :class:`frf.exceptions.InvalidFieldException`: If any of the
+                names is not a field of this serializer.
+
+        Returns:
+            :class:`Serializer`: The derived serializer.
+        """
+        key = (frozenset(fields) if fields is not None else None,
+               frozenset(exclude or ()))
+
+        derived = self._subsets.get(key)
+        if derived is not None:
+            return derived
+
+        unknown = ((key[0] or frozenset()) | key[1]) - set(self.fields)
+        if unknown:
+            raise InvalidFieldException(
+                _('Unknown fields: {fields}').format(
+                    fields=', '.join(sorted(unknown))))
+
+        derived = copy.copy(self)
+        derived.fields = {
+            name: field for name, field in self.fields.items()
+            if (key[0] is None or name in key[0]) and name not in key[1]}
+        derived.build_plans()
+
+        if len(self._subsets) >= self.SUBSET_CACHE_SIZE:
+            self._subsets.clear()
+        self._subsets[key] = derived
+
+        return derived
+
+    def build_validation_plan(self):
+        """Compile each field's validators for :meth:`validate`."""
+        plan = []
+
+        for field_name, field in self.fields.items():
+            field.compile_validators()
+            plan.append((
+                field_name,
+                field,
+                field.source,
+                not isinstance(field, (SerializerField, JSONField)),
+                self.validators.get(field_name),
+            ))
+
+        self._validation_plan = tuple(plan)
+
+    def build_serialization_plan(self):
+        """Precompute how each field is read and converted for serialize."""
+        plan = []
+
+        for field_name, field in self.fields.items():
+            to_data = type(field).to_data
+
+            if to_data in DATA_CONVERTERS:
+                converter = DATA_CONVERTERS[to_data]
+                kind = _PLAIN if converter is None else _VALUE
+            else:
+                converter = field.to_data
+                kind = _FULL
+
+            plan.append(
+                (field_name, _source_getter(field.source), kind, converter))
+
+        self._serialization_plan = tuple(plan)
+
     def validate(self, obj=None, data=None, ctx=None):
         """Validate data.
 
@@ -155,49 +294,56 @@ class Serializer(object):
         errors = {}
         cleaned_data = {}
 
-        for field_name, field in self.fields.items():
-            source_name = field.source
-            if field_name not in data and field.required and not obj:
-                errors[field_name] = [_('Field is required.')]
-                continue
+        for (field_name, field, source_name, uses_default,
+                serializer_validator) in self._validation_plan:
+            if field_name not in data:
+                if obj:
+                    continue
 
-            if field_name not in data and obj:
-                continue
+                if field.required:
+                    errors[field_name] = [_('Field is required.')]
+                    continue
 
-            if field_name not in data and not field.required \
-                    and not obj \
-                    and not isinstance(field, (SerializerField, JSONField)):
-                default = field.default
-                if callable(default):
-                    default = default()
-                cleaned_data[source_name] = default
-                continue
+                if uses_default:
+                    default = field.default
+                    if callable(default):
+                        default = default()
+                    cleaned_data[source_name] = default
+                    continue
 
-            value = data.get(field_name, None)
+                value = None
+            else:
+                value = data[field_name]
 
             if value is None and not field.nullable:
                 errors[field_name] = [_('Field cannot be `None`.')]
                 continue
 
-            # first run the field validation
-            field_errors = field.validate(
-                obj=obj, value=value, data=data, ctx=ctx)
-
-            # if there is a serializer level validator for this
-            # field...
-            if field_name in self.validators:
+            if serializer_validator is None:
+                # validate and convert in one go, so ``to_python`` only
+                # runs once.
+                field_errors, value = field.clean(
+                    obj=obj, value=value, data=data, ctx=ctx)
+            else:
+                # first run the field validation
+                field_errors = field.validate(
+                    obj=obj, value=value, data=data, ctx=ctx) or []
+
+                # then the serializer level validator for this field, which
+                # can replace the value.
                 try:
-                    value = self.validators[field_name](
-                        obj=obj, data=data, ctx=ctx)
+                    value = serializer_validator(obj=obj, data=data, ctx=ctx)
                 except ValidationError as error:
                     field_errors.append(error.description)
 
-            if not field_errors:
-                cleaned_data[source_name] = field.to_python(
-                    obj=obj, data=data, value=value, ctx=ctx)
+                if not field_errors:
+                    value = field.to_python(
+                        obj=obj, data=data, value=value, ctx=ctx)
 
             if field_errors:
                 errors[field_name] = field_errors
+            else:
+                cleaned_data[source_name] = value
 
         try:
             cleaned_data = self.clean(
@@ -300,17 +446,26 @@ class Serializer(object):
         if not many:
             objs = [objs]
 
+        plan = self._serialization_plan
         serialized_objs = []
+        append = serialized_objs.append
 
         for obj in objs:
             serialized_obj = {}
-            for field_name, field in self.fields.items():
-                source_name = field.source
-                value = getattr(obj, source_name, None)
-                serialized_obj[field_name] = field.to_data(
-                    obj=obj, value=value, ctx=ctx)
+            for field_name, getter, kind, converter in plan:
+                try:
+                    value = getter(obj)
+                except AttributeError:
+                    value = None
 
-            serialized_objs.append(serialized_obj)
+                if kind == _VALUE:
+                    value = converter(value)
+                elif kind == _FULL:
+                    value = converter(obj=obj, value=value, ctx=ctx)
+
+                serialized_obj[field_name] = value
+
+            append(serialized_obj)
 
         return serialized_objs[0] if not many else serialized_objs
 
@@ -353,5 +508,7 @@ class ModelSerializer(Serializer):
                 if field not in self.Meta.fields:
                     del self.fields[field]
 
+            self.build_plans()
+
     def create(self, cleaned_data, obj, ctx=None):
         return self.Meta.model()
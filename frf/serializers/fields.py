@@ -24,12 +24,45 @@ import re
 import uuid
 
 import dateutil.parser
-
+import sqlalchemy
 
 from frf import exceptions
 from frf.utils.json import deserialize
 
 
+def active_if(condition):
+    """Mark a ``validate_*`` method as only able to fail under ``condition``.
+
+    ``condition`` is called with the field.  When it returns a falsy value,
+    the validator is left out of the field's compiled validators, so it costs
+    nothing during validation.  For example:
+
+    .. code-block:: python
+
+        @active_if(lambda field: field.max_length)
+        def validate_max_length(self, obj, data, value, ctx=None):
+            ...
+
+    A subclass that overrides a marked validator without marking it again
+    will always run it.
+    """
+    def decorator(func):
+        func.active_if = condition
+        return func
+    return decorator
+
+
+def uses_python_value(func):
+    """Mark a ``validate_*`` method as wanting the ``to_python`` value.
+
+    These validators run after all the other validators have passed, and
+    receive the value already converted by ``to_python``.  The conversion is
+    done once, and the result is reused for the cleaned data.
+    """
+    func.uses_python_value = True
+    return func
+
+
 class Field(object):
     """Base field - all other fields inherit from this field.
 
@@ -49,6 +82,10 @@ class Field(object):
     The ``arbitrary_name`` can be any valid python name, and is not used for
     anything other then organization purposes.  Validators are validated in the
     order they are defined on the class.
+
+    Validators that can only fail for some configurations of the field should
+    be marked with :func:`active_if`, and validators that need the converted
+    value should be marked with :func:`uses_python_value`.
     """
     requires_model_serializer = False
 
@@ -97,6 +134,37 @@ class Field(object):
             if attr_name.startswith('validate_') and callable(attr):
                 self.validators.append(attr)
 
+        self.compile_validators()
+
+    def compile_validators(self):
+        """Build the list of validators that can fire for this field.
+
+        Validators marked with :func:`active_if` whose condition is false are
+        dropped, and validators marked with :func:`uses_python_value` are
+        split out so they can run against the converted value.
+
+        This is called when the field is created, and again when a serializer
+        that uses it is created.  If you change the field's settings after
+        that, call it again.
+        """
+        value_validators = []
+        python_validators = []
+
+        for validator in self.validators:
+            condition = getattr(validator, 'active_if', None)
+            if condition is not None and not condition(self):
+                continue
+
+            if getattr(validator, 'uses_python_value', False):
+                python_validators.append(validator)
+            else:
+                value_validators.append(validator)
+
+        self._value_validators = tuple(value_validators)
+        self._python_validators = tuple(python_validators)
+        self._overrides_validate = type(self).validate is not Field.validate
+
+    @active_if(lambda field: field.choices)
     def validate_choices(self, obj, data, value, ctx=None):
         if self.choices:
             if value not in self.choices:
@@ -105,30 +173,56 @@ class Field(object):
                         value=value,
                         choices=', '.join(self.choices))))
 
+    @active_if(lambda field: field.required)
     def validate_required(self, obj, data, value, ctx=None):
         if not obj and self.required and self.field_name not in data:
             raise exceptions.ValidationError(
                 _('Field is required.'))
 
+    @active_if(lambda field: field.read_only)
     def validate_read_only(self, obj, data, value, ctx=None):
         if self.field_name in data and self.read_only:
             raise exceptions.ValidationError(
                 _('Field is read-only.'))
 
+    @active_if(lambda field: field.required and not field.nullable)
     def validate_nullable(self, obj, data, value, ctx=None):
         if self.required and not self.nullable and value is None:
             raise exceptions.ValidationError(
                 _('Field cannot be null.'))
 
+    @active_if(lambda field: field.update_read_only)
+    @uses_python_value
     def validate_update_read_only(self, obj, data, value, ctx=None):
-        value = self.to_python(obj=obj, data=data, value=value, ctx=ctx)
-
-        if self.update_read_only and self.field_name in data and obj and \
+        if self.field_name in data and obj and \
                 getattr(obj, self.field_name) != value:
             raise exceptions.ValidationError(
                 _('Field is read-only when editing.'))
 
     def validate(self, obj, value, data=None, ctx=None):
+        return self._validate(obj, value, data, ctx, convert=False)[0]
+
+    def clean(self, obj, value, data=None, ctx=None):
+        """Validate ``value`` and convert it using ``to_python``.
+
+        ``to_python`` is called at most once, even if a validator marked with
+        :func:`uses_python_value` needs the converted value.
+
+        Returns:
+            tuple: A list of errors, and the converted value.  If there are
+                errors, the value will be ``None``.
+        """
+        if self._overrides_validate:
+            # the compiled validators might not be what this field uses.
+            errors = self.validate(obj=obj, value=value, data=data, ctx=ctx)
+            if errors:
+                return errors, None
+            return [], self.to_python(
+                obj=obj, data=data, value=value, ctx=ctx)
+
+        return self._validate(obj, value, data, ctx, convert=True)
+
+    def _validate(self, obj, value, data, ctx, convert):
         errors = []
 
         if data is None:
@@ -137,13 +231,27 @@ class Field(object):
         if ctx is None:
             ctx = {}
 
-        for validator in self.validators:
+        for validator in self._value_validators:
+            try:
+                validator(obj=obj, value=value, data=data, ctx=ctx)
+            except exceptions.ValidationError as error:
+                errors.append(error.description)
+
+        if errors or not (convert or self._python_validators):
+            return errors, None
+
+        value = self.to_python(obj=obj, data=data, value=value, ctx=ctx)
+
+        for validator in self._python_validators:
             try:
                 validator(obj=obj, value=value, data=data, ctx=ctx)
             except exceptions.ValidationError as error:
                 errors.append(error.description)
 
-        return errors
+        if errors:
+            return errors, None
+
+        return errors, value
 
     def to_python(self, obj, data, value, ctx=None):
         return value
@@ -190,6 +298,7 @@ class StringField(Field):
             value = value.strip()
         return value
 
+    @active_if(lambda field: not field.blank)
     def validate_blank(self, obj, data, value, ctx=None):
         if not self.blank and value == '':
             raise exceptions.ValidationError(_('Cannot be blank.'))
@@ -201,6 +310,7 @@ class StringField(Field):
         if not isinstance(value, str):
             raise exceptions.ValidationError(_('Must be a string.'))
 
+    @active_if(lambda field: field.min_length)
     def validate_min_length(self, obj, data, value, ctx=None):
         value = str(value)
         if self.min_length and len(value) < self.min_length:
@@ -208,6 +318,7 @@ class StringField(Field):
                 _('Must be at least {chars} '
                   'character(s) long.'.format(chars=self.min_length)))
 
+    @active_if(lambda field: field.max_length)
     def validate_max_length(self, obj, data, value, ctx=None):
         value = str(value)
         if self.max_length and len(value) > self.max_length:
@@ -215,6 +326,7 @@ class StringField(Field):
                 _('Must be at most {chars} character(s) long.'.format(
                     chars=self.max_length)))
 
+    @active_if(lambda field: field.regex)
     def validate_regex(self, obj, data, value, ctx=None):
         if self.nullable and value is None:
             return value
@@ -279,6 +391,7 @@ class NumberField(Field):
         self.max_value = max_value
         super().__init__(**kwargs)
 
+    @active_if(lambda field: field.min_value is not None)
     def validate_min_value(self, obj, data, value, ctx=None):
         if isinstance(value, int) and self.min_value is not None \
                 and value < self.min_value:
@@ -286,6 +399,7 @@ class NumberField(Field):
                 _('Value cannot be smaller than {value}.'.format(
                     value=self.min_value)))
 
+    @active_if(lambda field: field.max_value is not None)
     def validate_max_value(self, obj, data, value, ctx=None):
         if isinstance(value, int) and self.max_value is not None \
                  and value > self.max_value:
@@ -456,6 +570,10 @@ class ListField(Field):
 
     field_name = property(get_field_name, set_field_name)
 
+    def compile_validators(self):
+        super().compile_validators()
+        self.field.compile_validators()
+
     def validate_is_list(self, obj, data, value, ctx=None):
         if self.nullable and value is None:
             return value
@@ -517,6 +635,7 @@ class JSONField(Field):
         if self.many and not isinstance(value, (list, tuple)):
             raise exceptions.ValidationError(_('Must be a list.'))
 
+    @active_if(lambda field: field.validator)
     def validate_fields(self, obj, data, value, ctx=None):
         if isinstance(value, str):
             value = deserialize(value)
@@ -627,6 +746,38 @@ class SerializerField(Field):
         return items if self.many else items[0]
 
 
+def _coerce(value, type_):
+    if isinstance(value, type_):
+        return value
+    try:
+        return type_(value)
+    except (TypeError, ValueError, AttributeError):
+        return value
+
+
+def _find_by_ident(found, ident):
+    """Look up a loaded row by the ids that were submitted.
+
+    Submitted ids may not have the same type as the loaded ones (for example,
+    a string instead of a ``uuid.UUID``), so they are coerced if needed.
+    """
+    try:
+        item = found.get(ident)
+    except TypeError:
+        return None
+
+    if item is None and found:
+        sample = next(iter(found))
+        try:
+            item = found.get(tuple(
+                _coerce(value, type(loaded))
+                for value, loaded in zip(ident, sample)))
+        except TypeError:
+            return None
+
+    return item
+
+
 class PrimaryKeyRelatedField(Field):
     """Represent objects as a list of related keys.
 
@@ -654,6 +805,7 @@ class PrimaryKeyRelatedField(Field):
         {"name": "Dean Koontz", "books": [1, 2, 3, 4]}
     """
     requires_model_serializer = True
+    CTX_CACHE_KEY = '_frf_related_items'
     MESSAGES = {
         'multikey': _('The table {table} has a composite primary key. You '
                       'must submit all keys in the format {{"key1": value1, '
@@ -735,6 +887,10 @@ class PrimaryKeyRelatedField(Field):
     def get_items_many(self, value, validate=False, ctx=None):
         """Create a list of referenced items.
 
+        All the items are loaded with a single ``IN`` query (using a tuple
+        ``IN`` for composite primary keys).  If ``ctx`` is passed, the result
+        is remembered in it, so validation and ``to_python`` share one load.
+
         Args:
             value (list): The ids. Must be a list of IDS. Each ID can be a
                 single ID or a dictionary of IDS in the case of a composite
@@ -742,24 +898,61 @@ class PrimaryKeyRelatedField(Field):
             validate (boolean): Set to ``True`` if you are calling this method
                 from the validation step.  In the case of errors, a
                 ``ValidationError`` will be raised.
+
+        Returns:
+            list: The items, in the same order as the ids.  Items that could
+                not be found will be ``None``.
         """
-        items = []
         keys = self.get_primary_keys()
-        for item in value:
-            if not isinstance(keys, (list, tuple)):
-                items.append(
-                    self.queryset.filter_by(
-                        **{keys: item}).first())
-            else:
-                if validate:
-                    if not isinstance(item, dict):
+
+        if isinstance(keys, (list, tuple)):
+            if validate:
+                for item in value:
+                    if not isinstance(item, dict) or \
+                            not all(key in item for key in keys):
                         raise exceptions.ValidationError(
                             self.MESSAGES['multikey'].format(
                                 table=self.model.__tablename__))
-                items.append(
-                    self.queryset.filter_by(
-                        **self.build_lookup(keys, item)).first())
-        return items
+            keys = list(keys)
+            idents = [tuple(item[key] for key in keys) for item in value]
+        else:
+            keys = [keys]
+            idents = [(item, ) for item in value]
+
+        cache = None
+        if ctx is not None:
+            cache = ctx.setdefault(self.CTX_CACHE_KEY, {})
+            try:
+                cache_key = (id(self), tuple(idents))
+                if cache_key in cache:
+                    return list(cache[cache_key])
+            except TypeError:
+                # unhashable ids, so they can't be remembered.
+                cache = None
+
+        items = self._load_items(keys, idents)
+
+        if cache is not None:
+            cache[cache_key] = items
+
+        return list(items)
+
+    def _load_items(self, keys, idents):
+        if not idents:
+            return []
+
+        columns = [getattr(self.model, key) for key in keys]
+
+        if len(columns) == 1:
+            criterion = columns[0].in_([ident[0] for ident in idents])
+        else:
+            criterion = sqlalchemy.tuple_(*columns).in_(idents)
+
+        found = {}
+        for row in self.queryset.filter(criterion).all():
+            found[tuple(getattr(row, key) for key in keys)] = row
+
+        return [_find_by_ident(found, ident) for ident in idents]
 
     def get_item_single(self, value, validate=False, ctx=None):
         """Get a single referenced item.
@@ -771,20 +964,7 @@ class PrimaryKeyRelatedField(Field):
                 from the validation step.  In the case of errors, a
                 ``ValidationError`` will be raised.
         """
-        item = None
-        keys = self.get_primary_keys()
-        if not isinstance(keys, list):
-            item = self.queryset.filter_by(**{keys: value}).first()
-        else:
-            if validate:
-                if not isinstance(value, dict):
-                    raise exceptions.ValidationError(
-                        self.MESSAGES['multikey'].format(
-                            table=self.model.__tablename__))
-            item = self.queryset.filter_by(
-                **self.build_lookup(keys, value)).first()
-
-        return item
+        return self.get_items_many([value], validate=validate, ctx=ctx)[0]
 
     def to_python(self, obj, data, value, ctx=None):
         if value:
@@ -808,15 +988,17 @@ class PrimaryKeyRelatedField(Field):
 
     def validate_ids(self, obj, data, value, ctx=None):
         keys = self.get_primary_keys()
-        retval = None
+        missing = False
 
         if value:
             if self.many:
                 retval = self.get_items_many(value, validate=True, ctx=ctx)
+                missing = not retval or None in retval
             else:
                 retval = self.get_item_single(value, validate=True, ctx=ctx)
+                missing = retval is None
 
-        if not retval and value:
+        if missing:
             raise exceptions.ValidationError(
                 _('A row with the key "{key}" does'
                   ' not exist in the database.'.format(key=keys)))
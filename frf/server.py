@@ -0,0 +1,213 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""Gunicorn server for the FRF app, used by ``manage.py runserver``.
+
+:class:`Application` runs gunicorn in the process that initialized FRF
+(with :func:`frf.app.init`), so the workers it forks share the loaded app,
+its viewsets and serializers with the master, copy-on-write.  With the
+``preload_app`` option, :meth:`Application.load` also runs in the master,
+before the workers are forked.
+
+Connections opened before the fork must not be shared by the workers, so
+the ``post_fork`` hook resets the database connection pools
+(:func:`frf.db.dispose_after_fork`) and the cache engine
+(:func:`frf.cache.after_fork`) in each worker.
+
+The gunicorn settings come from :data:`DEFAULT_OPTIONS`, the ``SERVER``
+setting and the ``runserver`` options, in that order, for example:
+
+.. code-block:: text
+
+    SERVER = {
+        'workers': 4,
+        'worker_class': 'gthread',
+        'threads': 8,
+        'preload_app': True,
+        'max_requests': 10000,
+        'max_requests_jitter': 1000,
+        'keepalive': 5,
+    }
+
+``reload`` is only allowed with ``DEBUG``.  As the code of a running master
+can't be reloaded, it is served by the ``gunicorn`` command instead (see
+:func:`command_line`), which loads the app in each worker.
+"""
+
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.config import Config
+
+from frf import app, cache, conf, db
+
+#: gunicorn settings used unless they are set in the ``SERVER`` setting.
+DEFAULT_OPTIONS = {
+    'bind': '0.0.0.0:8080',
+    'workers': 2,
+    'timeout': 30,
+    'accesslog': '-',
+    'errorlog': '-',
+}
+
+#: Worker classes that can be passed to ``runserver -k``.
+WORKER_CLASSES = ('sync', 'gthread', 'gevent', 'eventlet')
+
+ASGI_WORKER_CLASS = 'uvicorn.workers.UvicornWorker'
+
+
+def get_options(**overrides):
+    """Return the gunicorn settings.
+
+    Args:
+        overrides: Settings that take precedence over :data:`DEFAULT_OPTIONS`
+            and the ``SERVER`` setting.  ``None`` values are ignored.
+
+    Raises:
+        ValueError: If an option isn't a gunicorn setting, or ``reload`` is
+            set without ``DEBUG``.
+    """
+    options = dict(DEFAULT_OPTIONS)
+    if conf.get('DEBUG', False):
+        options['timeout'] = 120
+
+    options.update(conf.get('SERVER') or {})
+    options.update(
+        (key, value) for key, value in overrides.items()
+        if value is not None)
+
+    check_options(options)
+    return options
+
+
+def check_options(options):
+    """Validate gunicorn settings.
+
+    Raises:
+        ValueError: If an option isn't a gunicorn setting, or ``reload`` is
+            set without ``DEBUG``.
+    """
+    settings = Config().settings
+    for key in options:
+        if key not in settings:
+            raise ValueError('Unknown server option: {}'.format(key))
+
+    if options.get('reload') and not conf.get('DEBUG', False):
+        raise ValueError(
+            'The server can only reload when DEBUG is enabled.')
+
+
+def post_fork(server, worker):
+    """Reset the connections a worker inherited from the master."""
+    db.dispose_after_fork()
+    cache.after_fork()
+
+
+def _chain(first, second):
+    def hook(server, worker):
+        first(server, worker)
+        second(server, worker)
+    return hook
+
+
+class Application(BaseApplication):
+    """Serves ``frf.app.api``, or ``frf.app.asgi``, with gunicorn.
+
+    >>> Application(get_options(workers=4, preload_app=True)).run()
+
+    Args:
+        options (dict): The gunicorn settings, see :func:`get_options`.  A
+            ``post_fork`` hook is called after the one resetting the
+            connections.
+        asgi (bool): Serve the ASGI app.  ``worker_class`` must be an ASGI
+            worker, like ``uvicorn.workers.UvicornWorker``.
+    """
+    def __init__(self, options=None, asgi=False):
+        self.options = options or {}
+        self.asgi = asgi
+        super().__init__()
+
+    def load_config(self):
+        check_options(self.options)
+
+        for key, value in self.options.items():
+            if key == 'post_fork':
+                value = _chain(post_fork, value)
+            self.cfg.set(key, value)
+
+        if 'post_fork' not in self.options:
+            self.cfg.set('post_fork', post_fork)
+
+    def load(self):
+        application = app.asgi if self.asgi else app.api
+        if application is None:
+            raise RuntimeError('frf.app.init has not been called.')
+
+        if self.cfg.preload_app:
+            # objects allocated so far are shared with the workers, and
+            # moving them out of the collected generations keeps the
+            # garbage collector from writing to (and copying) their pages
+            gc.collect()
+            if hasattr(gc, 'freeze'):
+                gc.freeze()
+
+        return application
+
+
+def command_line(options, asgi=False):
+    """Return the ``gunicorn`` command serving the app with ``options``.
+
+    The app is imported by each worker, so it can be reloaded.  Options
+    without a command line flag, like hooks, are left out.
+    """
+    settings = Config().settings
+    argv = ['gunicorn']
+
+    for key, value in sorted(options.items()):
+        flags = [flag for flag in settings[key].cli or ()
+                 if flag.startswith('--')]
+        if not flags or callable(value) or value is None:
+            continue
+
+        if isinstance(value, bool):
+            if value:
+                argv.append(flags[0])
+        elif isinstance(value, (list, tuple)):
+            for each in value:
+                argv.extend([flags[0], str(each)])
+        else:
+            argv.extend([flags[0], str(value)])
+
+    argv.append('{}:app.{}'.format(
+        os.path.basename(conf.get('BASE_DIR')), 'asgi' if asgi else 'api'))
+    return argv
+
+
+def run(options, asgi=False):
+    """Run the server, until it is stopped.
+
+    With ``reload``, this replaces the process with the ``gunicorn``
+    command.
+    """
+    if options.get('reload'):
+        argv = command_line(options, asgi=asgi)
+        os.execvp(argv[0], argv)
+
+    Application(options, asgi=asgi).run()
@@ -19,7 +19,8 @@
 
 from falcon.testing import TestCase
 
-from frf import conf, db
+from frf import cache, conf, db
+from frf.utils.queries import assert_num_queries
 
 
 class BaseTestCase(TestCase):
@@ -30,6 +31,10 @@ class BaseTestCase(TestCase):
             # set up the test database tables
             db.create_all()
 
+        # the default engine of ``frf.app.init``, rather than the one the
+        # previous test used
+        cache.init({'engine': 'frf.cache.engines.dummy.DummyCacheEngine'})
+
         super().setUp()
 
     def tearDown(self):
@@ -37,3 +42,10 @@ class BaseTestCase(TestCase):
 
         if self.sqlalchemy_test_uri:
             db.truncate_all()
+
+    def assertNumQueries(self, num):
+        """Assert that ``num`` SQL queries are executed in a ``with`` block.
+
+        See :func:`frf.utils.queries.assert_num_queries`.
+        """
+        return assert_num_queries(num)
@@ -0,0 +1,295 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""Benchmarks of FRF's hot paths, run with ``manage.py benchmark``.
+
+They use ``frf.tests.fakeapp``, with an in-memory SQLite database that is
+created (replacing any database set up with ``db.init``) the first time a
+benchmark needs it.  The fakeapp serializers and viewsets need the database
+when they are imported, so they are imported after it is set up.
+"""
+
+import uuid
+
+import falcon
+from falcon import testing
+from sqlalchemy import orm
+
+from frf import db, filters, serializers
+from frf.benchmark import benchmark
+from frf.cache.engines.dummy import DummyCacheEngine
+from frf.cache.engines.memory import MemoryCacheEngine
+from frf.models.types import EncryptedType
+from frf.tests.fakeapp import models
+from frf.utils import encryption
+from frf.utils.json import serialize
+
+SIZES = (1, 100, 10000)
+
+NUM_COMPANIES = 10
+NUM_AUTHORS = 100
+NUM_BOOKS = max(SIZES)
+
+_database = None
+
+
+def setup_database():
+    """Create and fill the benchmark database, once per process."""
+    global _database
+
+    if _database is not None and db.engine is _database['engine']:
+        return _database
+
+    db.init('sqlite://')
+    models.Company.metadata.create_all(db.engine)
+
+    authors = []
+    for i in range(NUM_AUTHORS):
+        authors.append({
+            'uuid1': uuid.uuid4(),
+            'uuid2': uuid.uuid4(),
+            'name': 'Author {}'.format(i),
+            'company_id': i % NUM_COMPANIES + 1,
+        })
+
+    db.session.bulk_insert_mappings(models.Company, [
+        {'id': i + 1, 'name': 'Company {}'.format(i)}
+        for i in range(NUM_COMPANIES)])
+    db.session.bulk_insert_mappings(models.Author, authors)
+    db.session.bulk_insert_mappings(models.Book, [
+        {
+            'id': i + 1,
+            'title': 'Book {}'.format(i),
+            'author_uuid1': authors[i % NUM_AUTHORS]['uuid1'],
+            'author_uuid2': authors[i % NUM_AUTHORS]['uuid2'],
+        } for i in range(NUM_BOOKS)])
+    db.session.commit()
+
+    _database = {'engine': db.engine, 'authors': authors}
+    return _database
+
+
+def _load_books(n):
+    setup_database()
+    return models.Book.query.options(
+        orm.joinedload(models.Book.author)).order_by(
+            models.Book.id).limit(n).all()
+
+
+def _make_request(query_string=''):
+    return falcon.Request(testing.create_environ(query_string=query_string))
+
+
+# serializers
+
+class ContactSerializer(serializers.Serializer):
+    id = serializers.UUIDField(required=True)
+    name = serializers.StringField(required=True, max_length=100)
+    email = serializers.EmailField(required=True)
+    age = serializers.IntField(min_value=0, max_value=150)
+    active = serializers.BooleanField()
+    created_at = serializers.ISODateTimeField()
+    tags = serializers.ListField(serializers.StringField())
+
+
+def _setup_serialize(n):
+    books = _load_books(n)
+
+    from frf.tests.fakeapp.serializers import BookSerialzier
+    return BookSerialzier(), books
+
+
+@benchmark('serializer.serialize', params=SIZES, setup=_setup_serialize)
+def bench_serialize(args):
+    serializer, books = args
+    serializer.serialize(books, many=True)
+
+
+def _setup_validate(n):
+    return ContactSerializer(), [{
+        'id': str(uuid.uuid4()),
+        'name': '  Contact {}  '.format(i),
+        'email': 'contact{}@example.com'.format(i),
+        'age': i % 100,
+        'active': bool(i % 2),
+        'created_at': '2016-09-20T20:18:01.682945',
+        'tags': ['a', 'b', 'c'],
+    } for i in range(n)]
+
+
+@benchmark('serializer.validate', params=SIZES, setup=_setup_validate)
+def bench_validate(args):
+    serializer, items = args
+    for item in items:
+        serializer.validate(data=item, ctx={})
+
+
+# queries
+
+def _setup_paginate(page):
+    setup_database()
+    return page
+
+
+@benchmark('query.paginate', params=(1, 50), setup=_setup_paginate)
+def bench_paginate(page):
+    models.Book.query.order_by(models.Book.id).paginate(
+        page=page, per_page=100)
+
+
+FILTER_QUERIES = {
+    'search': 'search=Book',
+    'combined': 'author_uuid1={author}&search=1&filter=recent',
+}
+
+
+def _setup_filters(name):
+    database = setup_database()
+    author = database['authors'][0]
+
+    chain = filters.CompoundFilter(filters=(
+        filters.FieldMatchFilter(models.Book.author_uuid1),
+        filters.SearchFilter(models.Book.title),
+        filters.FlagFilter(
+            'recent',
+            filter_flag_present_func=lambda req, qs: qs.filter(
+                models.Book.id > NUM_BOOKS // 2)),
+    ))
+
+    req = _make_request(
+        FILTER_QUERIES[name].format(author=author['uuid1']))
+    return chain, req
+
+
+@benchmark('filters.chain', params=sorted(FILTER_QUERIES),
+           setup=_setup_filters)
+def bench_filters(args):
+    chain, req = args
+    chain.filter(req, models.Book.query).count()
+
+
+# viewsets
+
+def _setup_api(param):
+    database = setup_database()
+
+    from frf.tests.fakeapp import viewsets
+
+    class BookViewSet(viewsets.BookViewSet):
+        paginate = (20, 1000)
+
+    api = falcon.API()
+    view = BookViewSet()
+    api.add_route('/books/', view)
+    api.add_route('/books/{id}/', view)
+    # like ``frf.app.init``
+    view.bind_actions()
+
+    author = database['authors'][0]
+    body = serialize({
+        'title': 'New Book',
+        'author': {'uuid1': author['uuid1'], 'uuid2': author['uuid2']},
+    })
+
+    return testing.TestClient(api), param, body
+
+
+def _check(res, status):
+    assert res.status == status, (res.status, res.text)
+
+
+@benchmark('viewset.list', params=(1, 100, 1000), setup=_setup_api)
+def bench_list(args):
+    client, per_page, body = args
+    res = client.simulate_get(
+        '/books/', query_string='per_page={}'.format(per_page))
+    _check(res, falcon.HTTP_200)
+
+
+@benchmark('viewset.retrieve', setup=_setup_api)
+def bench_retrieve(args):
+    client, param, body = args
+    _check(client.simulate_get('/books/1/'), falcon.HTTP_200)
+
+
+def _teardown_create(args):
+    models.Book.query.filter(models.Book.id > NUM_BOOKS).delete()
+    db.session.commit()
+
+
+@benchmark('viewset.create', setup=_setup_api, teardown=_teardown_create)
+def bench_create(args):
+    client, param, body = args
+    _check(client.simulate_post('/books/', body=body), falcon.HTTP_201)
+
+
+# cache engines
+
+ENGINES = {
+    'dummy': DummyCacheEngine,
+    'memory': MemoryCacheEngine,
+}
+
+
+def _setup_cache(name):
+    engine = ENGINES[name](default_timeout=60)
+    engine.set('key', {'id': 1, 'name': 'value'})
+    engine.set_many({'key{}'.format(i): i for i in range(100)})
+    return engine
+
+
+@benchmark('cache.get', params=sorted(ENGINES), setup=_setup_cache)
+def bench_cache_get(engine):
+    engine.get('key')
+
+
+@benchmark('cache.set', params=sorted(ENGINES), setup=_setup_cache)
+def bench_cache_set(engine):
+    engine.set('key', {'id': 1, 'name': 'value'})
+
+
+MANY_KEYS = ['key{}'.format(i) for i in range(100)]
+
+
+@benchmark('cache.get_many', params=sorted(ENGINES), setup=_setup_cache)
+def bench_cache_get_many(engine):
+    engine.get_many(MANY_KEYS)
+
+
+# encryption
+
+CIPHERS = {'cbc': encryption.AESCipher}
+if encryption.has_aead():
+    CIPHERS['gcm'] = encryption.AESGCMCipher
+
+
+def _setup_decrypt(name):
+    """1000 rows with 3 encrypted columns."""
+    type_ = EncryptedType(key=lambda: 'benchmark', engine=CIPHERS[name])
+    values = [type_.process_bind_param('value {}'.format(i), None)
+              for i in range(3000)]
+    return type_, values
+
+
+@benchmark('encryption.decrypt', params=sorted(CIPHERS),
+           setup=_setup_decrypt)
+def bench_decrypt(args):
+    type_, values = args
+    for value in values:
+        type_.process_result_value(value, None)
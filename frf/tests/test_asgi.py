@@ -0,0 +1,246 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import falcon
+from falcon import testing
+
+from frf import cache, db, middleware, views, viewsets
+from frf.asgi import ASGIApp
+from frf.tests.test_model_viewsets import Dummy, DummyViewSet
+
+
+class AsyncKeyAuthentication(object):
+    async def authenticate(self, req, view):
+        await asyncio.sleep(0)
+        if req.get_param('auth_key') == 'async':
+            return 'async user'
+
+
+class AsyncDenyPermission(object):
+    async def has_permission(self, req, view, **kwargs):
+        return req.get_param('deny') is None
+
+
+class HelloView(views.AsyncView):
+    allowed_methods = ('get', 'post')
+    authentication = (AsyncKeyAuthentication(), )
+    permissions = (AsyncDenyPermission(), )
+
+    async def get(self, req, resp, **kwargs):
+        resp.body = json.dumps({'user': req.context['user']})
+
+    async def post(self, req, resp, **kwargs):
+        resp.body = req.stream.read()
+
+
+class RendezvousView(views.AsyncView):
+    """Each request waits for the other one, so they must run together."""
+    events = {}
+
+    async def get(self, req, resp, name, **kwargs):
+        other = 'b' if name == 'a' else 'a'
+        self.events.setdefault(name, asyncio.Event()).set()
+        await asyncio.wait_for(
+            self.events.setdefault(other, asyncio.Event()).wait(), 1)
+        resp.body = json.dumps({'name': name})
+
+
+class AsyncDummyViewSet(viewsets.AsyncViewSetMixin, DummyViewSet):
+    async def retrieve(self, req, resp, **kwargs):
+        obj = await db.run_sync(self.get_obj, req, **kwargs)
+        resp.body = self.serializer.serialize(obj)
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        db.init('sqlite:///{}'.format(self.path), async_threads=4)
+        Dummy.metadata.create_all(db.engine)
+        db.session.add(Dummy(name='Alice', email='alice@example.com'))
+        db.session.commit()
+        db.session.remove()
+
+        cache.init({'engine': 'frf.cache.engines.memory.MemoryCacheEngine'})
+
+        api = falcon.API(middleware=[middleware.SQLAlchemyMiddleware()])
+        api.add_route('/hello/', HelloView())
+        api.add_route('/rendezvous/{name}/', RendezvousView())
+        api.add_route('/dummies/', DummyViewSet())
+        api.add_route('/async_dummies/', AsyncDummyViewSet())
+        api.add_route('/async_dummies/{uuid}/', AsyncDummyViewSet())
+        self.app = ASGIApp(api, max_body_size=100)
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        db.session.remove()
+        db.init('sqlite://')
+        os.unlink(self.path)
+
+    async def request(self, method, path, query_string='', body=b''):
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'query_string': query_string.encode('ascii'),
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode())],
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': body}
+
+        async def send(message):
+            messages.append(message)
+
+        await self.app(scope, receive, send)
+
+        start = messages[0]
+        self.assertEqual('http.response.start', start['type'])
+        return (start['status'], dict(start['headers']),
+                b''.join(m.get('body', b'') for m in messages[1:]))
+
+    def simulate(self, *args, **kwargs):
+        return self.loop.run_until_complete(self.request(*args, **kwargs))
+
+    def test_async_view(self):
+        status, headers, body = self.simulate(
+            'GET', '/hello/', 'auth_key=async')
+
+        self.assertEqual(200, status)
+        self.assertEqual({'user': 'async user'}, json.loads(body.decode()))
+        self.assertEqual(str(len(body)).encode(), headers[b'content-length'])
+
+        status, headers, body = self.simulate(
+            'POST', '/hello/', 'auth_key=async', body=b'{"a": 1}')
+        self.assertEqual(200, status)
+        self.assertEqual(b'{"a": 1}', body)
+
+    def test_async_authentication_and_permissions(self):
+        status, headers, body = self.simulate('GET', '/hello/')
+        self.assertEqual(401, status)
+
+        status, headers, body = self.simulate(
+            'GET', '/hello/', 'auth_key=async&deny=1')
+        self.assertEqual(403, status)
+
+    def test_concurrent_requests(self):
+        RendezvousView.events = {}
+        results = self.loop.run_until_complete(asyncio.gather(
+            self.request('GET', '/rendezvous/a/'),
+            self.request('GET', '/rendezvous/b/')))
+
+        self.assertEqual([200, 200], [status for status, h, b in results])
+
+    def test_async_view_with_wsgi(self):
+        client = testing.TestClient(self.app.api)
+
+        res = client.simulate_get(
+            '/hello/', query_string='auth_key=async')
+        self.assertEqual(200, res.status_code)
+        self.assertEqual({'user': 'async user'}, json.loads(res.text))
+
+        res = client.simulate_get('/hello/')
+        self.assertEqual(401, res.status_code)
+
+    def test_sync_viewset(self):
+        status, headers, body = self.simulate(
+            'GET', '/dummies/', 'auth_key=superpassword')
+
+        self.assertEqual(200, status)
+        results = json.loads(body.decode())['results']
+        self.assertEqual(['Alice'], [d['name'] for d in results])
+
+    def test_async_viewset(self):
+        status, headers, body = self.simulate(
+            'POST', '/async_dummies/', 'auth_key=superpassword',
+            body=b'{"name": "Bob", "email": "bob@example.com"}')
+        self.assertEqual(201, status)
+        created = json.loads(body.decode())
+
+        status, headers, body = self.simulate(
+            'GET', '/async_dummies/', 'auth_key=superpassword')
+        self.assertEqual(200, status)
+        self.assertEqual(2, len(json.loads(body.decode())['results']))
+
+        # ``retrieve`` is async
+        status, headers, body = self.simulate(
+            'GET', '/async_dummies/{}/'.format(created['uuid']),
+            'auth_key=superpassword')
+        self.assertEqual(200, status)
+        self.assertEqual('Bob', json.loads(body.decode())['name'])
+
+        status, headers, body = self.simulate('GET', '/async_dummies/')
+        self.assertEqual(401, status)
+
+    def test_not_found_and_too_large(self):
+        status, headers, body = self.simulate('GET', '/nope/')
+        self.assertEqual(404, status)
+
+        status, headers, body = self.simulate(
+            'POST', '/hello/', 'auth_key=async', body=b'x' * 101)
+        self.assertEqual(413, status)
+
+    def test_lifespan(self):
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        self.loop.run_until_complete(
+            self.app({'type': 'lifespan'}, receive, send))
+        self.assertEqual(
+            ['lifespan.startup.complete', 'lifespan.shutdown.complete'], sent)
+
+    def test_async_cache(self):
+        async def use_cache():
+            await cache.aset('key', 'value')
+            self.assertEqual(2, await cache.aincr('count', 2))
+            return await cache.aget('key')
+
+        self.assertEqual('value', self.loop.run_until_complete(use_cache()))
+
+    def test_run_sync_removes_session(self):
+        sessions = []
+
+        def query():
+            sessions.append(db.session())
+            return Dummy.query.count()
+
+        async def run():
+            return [await db.run_sync(query), await db.run_sync(query)]
+
+        self.assertEqual([1, 1], self.loop.run_until_complete(run()))
+        self.assertIsNot(sessions[0], sessions[1])
@@ -0,0 +1,119 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import contextlib
+import io
+import json
+import sys
+import unittest
+
+from frf import benchmark, manage
+
+STATS = ('loops', 'repeat', 'min', 'max', 'mean', 'median', 'stdev')
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.bench = benchmark.Benchmark(
+            'toy', self.calls.append, params=(1, 10),
+            setup=lambda n: list(range(n)),
+            teardown=lambda items: self.calls.append('teardown'))
+
+    def test_run(self):
+        report = benchmark.run(
+            benchmarks=[self.bench], repeat=3, min_time=0.001)
+
+        self.assertEqual(benchmark.FORMAT_VERSION, report['format'])
+        self.assertIn('python', report['environment'])
+        self.assertEqual({'toy[1]', 'toy[10]'}, set(report['results']))
+
+        result = report['results']['toy[10]']
+        self.assertEqual(sorted(STATS), sorted(result))
+        self.assertEqual(3, result['repeat'])
+        self.assertLessEqual(result['min'], result['median'])
+        self.assertIn(list(range(10)), self.calls)
+        self.assertEqual(2, self.calls.count('teardown'))
+
+    def test_patterns(self):
+        report = benchmark.run(
+            benchmarks=[self.bench], patterns=['toy[[]1]'], repeat=1,
+            min_time=0)
+
+        self.assertEqual(['toy[1]'], list(report['results']))
+
+    def test_dumps_loads(self):
+        report = benchmark.run(
+            benchmarks=[self.bench], repeat=2, min_time=0)
+        data = benchmark.dumps(report)
+
+        self.assertEqual(report, benchmark.loads(data))
+        # sorted keys, so reports can be diffed
+        self.assertLess(data.index('"environment"'), data.index('"format"'))
+
+        with self.assertRaises(ValueError):
+            benchmark.loads('{"format": 0, "results": {}}')
+
+    def test_compare(self):
+        def report(**medians):
+            return {'results': {
+                name: {'median': median} for name, median in medians.items()}}
+
+        rows = benchmark.compare(
+            report(a=1.0, b=1.0, c=1.0),
+            report(a=1.5, b=0.5, c=1.05, d=1.0), threshold=0.1)
+
+        self.assertEqual([
+            ('a', 1.0, 1.5, 0.5, 'slower'),
+            ('b', 1.0, 0.5, -0.5, 'faster'),
+            ('c', 1.0, 1.05, 0.050000000000000044, 'same'),
+            ('d', None, 1.0, None, 'new'),
+        ], rows)
+
+    def test_format_time(self):
+        self.assertEqual('1.50 s', benchmark.format_time(1.5))
+        self.assertEqual('12.00 ms', benchmark.format_time(0.012))
+        self.assertEqual('3.00 us', benchmark.format_time(0.000003))
+        self.assertEqual('-', benchmark.format_time(None))
+
+    def test_suite(self):
+        registry = benchmark.load(['frf.tests.benchmarks'])
+        self.assertIn('viewset.list', registry)
+
+        report = benchmark.run(
+            patterns=['cache.*', 'viewset.retrieve'], repeat=1, min_time=0)
+
+        self.assertIn('cache.get[memory]', report['results'])
+        self.assertIn('viewset.retrieve', report['results'])
+
+    def test_command_output_to_stdout(self):
+        stdout = io.StringIO()
+        argv = ['manage.py', 'benchmark', '-o', '-', '-r', '1',
+                '--min-time', '0', 'cache.get[[]memory]']
+
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(io.StringIO()):
+            old_argv, sys.argv = sys.argv, argv
+            try:
+                manage.main()
+            finally:
+                sys.argv = old_argv
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(['cache.get[memory]'], list(report['results']))
@@ -18,6 +18,7 @@
 # above.
 
 import datetime
+import sys
 import unittest
 
 import mock
@@ -38,6 +39,16 @@ class DummyCacheEngineTestCase(unittest.TestCase):
 
         self.assertEqual(cache.get('testing'), 'onetwothree')
 
+    def test_cache_get_set_many(self):
+        cache.set_many({'one': '1', 'two': '2'})
+
+        self.assertEqual(
+            cache.get_many(['one', 'two', 'three']), {'one': '1', 'two': '2'})
+
+    def test_cache_incr_decr(self):
+        self.assertEqual(cache.incr('counter'), 1)
+        self.assertEqual(cache.decr('counter', 3), -2)
+
     def test_cache_get_default(self):
         self.assertEqual('bwent', cache.get('woot', 'bwent'))
 
@@ -81,6 +92,119 @@ class DummyCacheEngineTestCase(unittest.TestCase):
         self.assertEqual(len(cache._cache_engine.items), 0)
 
 
+class MemoryCacheEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        cache.init({
+            'engine': 'frf.cache.engines.memory.MemoryCacheEngine',
+            'max_entries': 3,
+            })
+        cache.clear()
+
+    def test_cache_get_set(self):
+        cache.set('testing', 'onetwothree')
+
+        self.assertEqual(cache.get('testing'), 'onetwothree')
+
+    def test_cache_get_set_many(self):
+        cache.set_many({'one': '1', 'two': '2'})
+
+        self.assertEqual(
+            cache.get_many(['one', 'two', 'three']), {'one': '1', 'two': '2'})
+
+    def test_cache_delete_many(self):
+        cache.set_many({'one': '1', 'two': '2', 'three': '3'})
+        cache.delete_many(['one', 'two'])
+
+        self.assertEqual(
+            cache.get_many(['one', 'two', 'three']), {'three': '3'})
+
+    def test_cache_incr_decr(self):
+        self.assertEqual(cache.incr('counter'), 1)
+        self.assertEqual(cache.incr('counter', 5), 6)
+        self.assertEqual(cache.decr('counter', 2), 4)
+        self.assertEqual(int(cache.get('counter')), 4)
+
+    def test_cache_get_default(self):
+        self.assertEqual('bwent', cache.get('woot', 'bwent'))
+
+    @mock.patch('frf.cache.engines.memory.time.monotonic')
+    def test_cache_set_timeout(self, monotonic_mock):
+        monotonic_mock.return_value = 1000
+
+        cache.set('test', 'value', timeout=30)
+
+        monotonic_mock.return_value = 1029
+        self.assertEqual(cache.get('test'), 'value')
+
+        monotonic_mock.return_value = 1031
+        self.assertIsNone(cache.get('test'))
+        self.assertEqual(cache.get_engine().stats()['expirations'], 1)
+
+    @mock.patch('frf.cache.engines.memory.time.monotonic')
+    def test_cache_sweep(self, monotonic_mock):
+        monotonic_mock.return_value = 1000
+        engine = cache.get_engine()
+        engine.clear()
+
+        cache.set('short', 'value', timeout=10)
+        cache.set('forever', 'value', timeout=0)
+
+        monotonic_mock.return_value = 1100
+        cache.set('new', 'value')
+
+        self.assertEqual(['forever', 'new'], list(engine.items))
+
+    def test_cache_lru_eviction(self):
+        for i in range(3):
+            cache.set(str(i), str(i))
+
+        # touch "0", so "1" is the least recently used.
+        cache.get('0')
+        cache.set('3', '3')
+
+        self.assertIsNone(cache.get('1'))
+        for key in ('0', '2', '3'):
+            self.assertEqual(cache.get(key), key)
+
+        stats = cache.get_engine().stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['hits'], 4)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 3)
+
+    def test_cache_max_bytes(self):
+        engine = cache.get_engine()
+        engine.max_entries = None
+        engine.max_bytes = sys.getsizeof('a' * 100) * 2
+
+        for i in range(3):
+            cache.set(str(i), 'a' * 100)
+
+        self.assertEqual(['1', '2'], list(engine.items))
+        self.assertEqual(engine.stats()['bytes'], engine.max_bytes)
+
+    def test_cache_value_larger_than_max_bytes(self):
+        engine = cache.get_engine()
+        engine.max_entries = None
+        engine.max_bytes = sys.getsizeof('a' * 100) * 2
+
+        cache.set('small', 'a' * 100)
+        cache.set('large', 'a' * 1000)
+
+        self.assertEqual(['small'], list(engine.items))
+        self.assertIsNone(cache.get('large'))
+        self.assertEqual(engine.stats()['evictions'], 0)
+
+    def test_cache_delete(self):
+        cache.set('test', 'one')
+        cache.delete('test')
+
+        self.assertIsNone(cache.get('test'))
+        self.assertEqual(cache.get_engine().stats()['bytes'], 0)
+
+
 class RedisCacheEngineTestCase(unittest.TestCase):
     # couldn't figure out how to test redis timeout, because I can't mock the
     # datetime for redis itself.
@@ -102,6 +226,25 @@ class RedisCacheEngineTestCase(unittest.TestCase):
 
         self.assertEqual(cache.get('testing'), 'onetwothree')
 
+    def test_cache_get_set_many(self):
+        cache.set_many({'one': '1', 'two': '2'})
+
+        self.assertEqual(
+            cache.get_many(['one', 'two', 'three']), {'one': '1', 'two': '2'})
+
+    def test_cache_delete_many(self):
+        cache.set_many({'one': '1', 'two': '2', 'three': '3'})
+        cache.delete_many(['one', 'two'])
+
+        self.assertEqual(
+            cache.get_many(['one', 'two', 'three']), {'three': '3'})
+
+    def test_cache_incr_decr(self):
+        self.assertEqual(cache.incr('counter'), 1)
+        self.assertEqual(cache.incr('counter', 5), 6)
+        self.assertEqual(cache.decr('counter', 2), 4)
+        self.assertEqual(int(cache.get('counter')), 4)
+
     def test_cache_get_default(self):
         self.assertEqual('bwent', cache.get('woot', 'bwent'))
 
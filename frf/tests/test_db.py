@@ -0,0 +1,298 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import os
+import tempfile
+import unittest
+
+import falcon
+from falcon.testing import TestCase as FalconTestCase
+from sqlalchemy import create_engine, func, pool, select, text
+
+from frf import cache, conf, db
+from frf.exceptions import DatabaseError
+from frf.tests.test_model_viewsets import Dummy, DummyViewSet
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.uri = 'sqlite:///{}'.format(self.path)
+
+    def tearDown(self):
+        for setting in db.ENGINE_SETTINGS.values():
+            conf.pop(setting, None)
+        db.engine.dispose()
+        db.init('sqlite://')
+        os.unlink(self.path)
+
+    def init(self, **kwargs):
+        db.init(self.uri, poolclass=pool.QueuePool, **kwargs)
+
+    def test_pool_options(self):
+        self.init(pool_size=2, max_overflow=1, pool_timeout=3,
+                  pool_recycle=60)
+
+        self.assertEqual(2, db.engine.pool.size())
+        self.assertEqual(1, db.engine.pool._max_overflow)
+        self.assertEqual(3, db.engine.pool._timeout)
+        self.assertEqual(60, db.engine.pool._recycle)
+
+    def test_engine_options_from_settings(self):
+        conf['SQLALCHEMY_POOL_SIZE'] = 3
+        conf['SQLALCHEMY_POOL_PRE_PING'] = True
+        conf['SQLALCHEMY_POOL_CLASS'] = 'sqlalchemy.pool.QueuePool'
+
+        self.assertEqual({
+            'pool_size': 3,
+            'pool_pre_ping': True,
+            'poolclass': pool.QueuePool,
+        }, db.get_engine_options())
+
+    def test_invalid_executemany_mode(self):
+        with self.assertRaises(DatabaseError):
+            self.init(executemany_mode='values')
+
+    def test_pool_stats(self):
+        self.init(pool_size=2)
+
+        conn = db.engine.connect()
+        stats = db.pool_stats()
+        conn.close()
+
+        self.assertEqual('QueuePool', stats['pool'])
+        self.assertEqual(2, stats['size'])
+        self.assertEqual(1, stats['checked_out'])
+        self.assertEqual(1, stats['connects'])
+        self.assertEqual(1, stats['checkouts'])
+
+        db.engine.execute('select 1')
+        stats = db.pool_stats()
+        self.assertEqual(0, stats['checked_out'])
+        self.assertEqual(1, stats['checked_in'])
+        self.assertEqual(1, stats['connects'])
+        self.assertEqual(2, stats['checkouts'])
+
+    def test_pre_ping(self):
+        self.init(pool_pre_ping=True)
+
+        conn = db.engine.connect()
+        # simulate the server dropping the connection
+        conn.connection.connection.close()
+        conn.close()
+
+        self.assertEqual(1, db.engine.execute('select 1').scalar())
+        stats = db.pool_stats()
+        self.assertEqual(2, stats['connects'])
+        self.assertEqual(1, stats['invalidations'])
+
+    def test_connection_from_another_process(self):
+        self.init()
+
+        conn = db.engine.connect()
+        dbapi_connection = conn.connection.connection
+        conn.connection._connection_record.info['pid'] = -1
+        conn.close()
+
+        conn = db.engine.connect()
+        self.assertIsNot(dbapi_connection, conn.connection.connection)
+        conn.close()
+
+        # the inherited connection was not closed
+        dbapi_connection.execute('select 1')
+        self.assertEqual(1, db.pool_stats()['forked'])
+
+    def test_dispose_after_fork(self):
+        self.init()
+
+        db.engine.execute('select 1')
+        old_pool = db.engine.pool
+        db.dispose_after_fork()
+
+        self.assertIsNot(old_pool, db.engine.pool)
+        self.assertEqual(0, db.pool_stats()['checked_in'])
+
+        db.engine.execute('select 1')
+        self.assertEqual(2, db.pool_stats()['connects'])
+
+
+class ReplicaTestCase(FalconTestCase):
+    def setUp(self):
+        super().setUp()
+        self.paths = []
+        self.primary_uri = self.create_database('primary')
+        self.replica_uris = [
+            self.create_database('replica1'),
+            self.create_database('replica2'),
+        ]
+
+        db.init(self.primary_uri, replica_uris=self.replica_uris)
+        cache.init({'engine': 'frf.cache.engines.dummy.DummyCacheEngine'})
+
+        self.viewset = DummyViewSet()
+        self.api = falcon.API()
+        self.api.add_route('/dummies/', self.viewset)
+        self.api.add_route('/dummies/{uuid}/', self.viewset)
+
+    def tearDown(self):
+        db.session.remove()
+        for each in [db.engine] + [r.engine for r in db.replicas]:
+            each.dispose()
+        db.init('sqlite://')
+
+        for path in self.paths:
+            os.unlink(path)
+        super().tearDown()
+
+    def create_database(self, name):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.paths.append(path)
+
+        uri = 'sqlite:///{}'.format(path)
+        engine = create_engine(uri)
+        Dummy.metadata.create_all(engine)
+        engine.execute(Dummy.__table__.insert().values(
+            name=name, email='{}@example.com'.format(name)))
+        engine.dispose()
+
+        return uri
+
+    def names(self):
+        return [d.name for d in Dummy.query.all()]
+
+    def test_reads_outside_replica_block(self):
+        self.assertEqual(['primary'], self.names())
+
+    def test_round_robin(self):
+        names = set()
+        for i in range(4):
+            with db.replica():
+                names.add(self.names()[0])
+
+        self.assertEqual({'replica1', 'replica2'}, names)
+
+    def test_one_replica_per_block(self):
+        with db.replica():
+            names = {self.names()[0] for i in range(4)}
+
+            with db.replica():
+                names.add(self.names()[0])
+
+        self.assertEqual(1, len(names))
+        self.assertIn(names.pop(), ('replica1', 'replica2'))
+
+    def test_failed_replica_falls_back_to_primary(self):
+        with db.replica():
+            name = self.names()[0]
+            replica = db.replicas[0 if name == 'replica1' else 1]
+            replica.mark_down()
+
+            self.assertEqual(['primary'], self.names())
+
+            # stays on the primary, even once the replica is back
+            replica.down_until = 0
+            self.assertEqual(['primary'], self.names())
+
+    def test_read_your_writes(self):
+        with db.replica():
+            self.assertIn(self.names()[0], ('replica1', 'replica2'))
+
+            db.session.add(Dummy(name='new', email='new@example.com'))
+            db.session.flush()
+
+            self.assertEqual(['primary', 'new'], self.names())
+            db.session.commit()
+            self.assertEqual(['primary', 'new'], self.names())
+
+        with db.replica():
+            self.assertIn(self.names()[0], ('replica1', 'replica2'))
+
+    def test_unhealthy_replica(self):
+        for replica in db.replicas:
+            replica.mark_down()
+
+        with db.replica():
+            self.assertEqual(['primary'], self.names())
+
+        db.replicas[0].down_until = 0
+        with db.replica():
+            self.assertEqual(['replica1'], self.names())
+
+    def test_connection_error_marks_replica_down(self):
+        db.init(self.primary_uri,
+                replica_uris=['sqlite:////nonexistent/replica.db'])
+
+        with db.replica():
+            # the failed read is retried on the primary
+            self.assertEqual(['primary'], self.names())
+            self.assertFalse(db.replicas[0].healthy)
+
+    def test_failed_read_retried_on_primary(self):
+        # a replica without the table fails reads, without being down
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.paths.append(path)
+        db.init(self.primary_uri, replica_uris=['sqlite:///' + path])
+
+        count = select([func.count()]).select_from(Dummy.__table__)
+
+        with db.replica():
+            self.assertEqual(1, db.session.scalar(count))
+            self.assertEqual(['primary'], self.names())
+
+        self.assertTrue(db.replicas[0].healthy)
+
+        with db.replica():
+            self.assertEqual(['primary'], self.names())
+
+    def test_textual_statements_go_to_primary(self):
+        with db.replica():
+            self.assertIn(self.names()[0], ('replica1', 'replica2'))
+
+            db.session.execute(text(
+                "UPDATE {} SET name = 'updated'".format(
+                    Dummy.__tablename__)))
+            self.assertEqual(['updated'], self.names())
+            db.session.commit()
+
+        self.assertEqual(['updated'], self.names())
+
+        with db.replica():
+            self.assertIn(self.names()[0], ('replica1', 'replica2'))
+
+    def test_viewset_routing(self):
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertIn(res.json['results'][0]['name'], ('replica1', 'replica2'))
+
+        res = self.simulate_post(
+            '/dummies/', query_string='auth_key=superpassword',
+            body='{"name": "new", "email": "new@example.com"}')
+        self.assertEqual(falcon.HTTP_201, res.status)
+        db.session.remove()
+
+        self.assertEqual(['primary', 'new'], self.names())
+
+        self.viewset.use_replica = False
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(
+            ['primary', 'new'], [d['name'] for d in res.json['results']])
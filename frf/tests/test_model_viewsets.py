@@ -22,28 +22,33 @@ import json
 import uuid
 
 import falcon
-
 from falcon.testing import TestCase as BaseTestCase
+import mock
 
-from frf import db, models
+from frf import cache, db, models
 from frf import exceptions, filters, renderers, serializers, viewsets
+from frf.models import mixins
 from frf.tests.fake import faker
+from frf.utils.queries import QueryRecorder
 
 
 class User(object):
-    pass
+    def __init__(self, id=None):
+        self.id = id
 
 
 class SimpleKeyAuthentication(object):
+    users = {'superpassword': 1, 'otherpassword': 2, 'nobody': None}
+
     def authenticate(self, req, view):
         key = req.get_param('auth_key')
-        if key != 'superpassword':
+        if key not in self.users:
             raise exceptions.HTTPUnauthorized(
                 title='Not Authorized',
                 description='Not Authorized',
                 challenges=('key',))
 
-        return User()
+        return User(self.users[key])
 
 
 def awesome_flag_present(req=None, qs=None, is_awesome=False, **kwargs):
@@ -64,6 +69,26 @@ class Dummy(models.Model):
     __tablename__ = 'dummy_table'
 
 
+class Note(mixins.TimestampMixin, models.Model):
+    id = models.Column(models.Integer, primary_key=True)
+    text = models.Column(models.Text)
+
+    __tablename__ = 'note_table'
+
+
+class NoteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Note
+
+
+class NoteViewSet(viewsets.ModelViewSet):
+    serializer = NoteSerializer()
+    model = Note
+    obj_lookup_kwarg = 'id'
+    conditional_get = True
+    updated_at_validators = True
+
+
 class DummySerializer(serializers.ModelSerializer):
     uuid = serializers.UUIDField(default=uuid.uuid4)
     name = serializers.StringField(required=True)
@@ -262,3 +287,500 @@ class TestCase(BaseTestCase):
             query_string='auth_key=superpassword')
 
         self.assertEqual(res.status, falcon.HTTP_405)
+
+    def test_index_streamed(self):
+        expected = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+
+        self.viewset.stream_list = True
+        self.viewset.stream_chunk_size = 2
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_200)
+        self.assertEqual(res.content, expected.content)
+        self.assertEqual(res.json['meta']['total'], 3)
+        self.assertEqual(len(res.json['results']), 3)
+
+    def test_index_streamed_not_when_paginated(self):
+        self.viewset.stream_list = True
+        self.viewset.paginate = (2, 10)
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+
+        self.assertEqual(res.json['meta']['total'], 3)
+        self.assertEqual(len(res.json['results']), 2)
+
+    def test_index_cursor_paginated(self):
+        self.viewset.cursor_paginate = (2, 10)
+        self.viewset.cursor_ordering = ('-email', )
+
+        expected = [
+            str(d.uuid) for d in Dummy.query.order_by(
+                Dummy.email.desc(), Dummy.uuid)]
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword&total=1')
+        meta = res.json['meta']
+
+        self.assertEqual(meta['total'], 3)
+        self.assertIsNone(meta['prev'])
+        self.assertEqual(
+            [d['uuid'] for d in res.json['results']], expected[:2])
+
+        res = self.simulate_get(
+            '/dummies/',
+            query_string='auth_key=superpassword&cursor={}'.format(
+                meta['next']))
+        meta = res.json['meta']
+
+        self.assertNotIn('total', meta)
+        self.assertIsNone(meta['next'])
+        self.assertEqual(
+            [d['uuid'] for d in res.json['results']], expected[2:])
+
+        res = self.simulate_get(
+            '/dummies/',
+            query_string='auth_key=superpassword&cursor={}'.format(
+                meta['prev']))
+        meta = res.json['meta']
+
+        self.assertIsNone(meta['prev'])
+        self.assertIsNotNone(meta['next'])
+        self.assertEqual(
+            [d['uuid'] for d in res.json['results']], expected[:2])
+
+    def test_index_cursor_paginated_empty_page(self):
+        self.viewset.cursor_paginate = (2, 10)
+        self.viewset.cursor_ordering = ('-email', )
+
+        expected = [
+            str(d.uuid) for d in Dummy.query.order_by(
+                Dummy.email.desc(), Dummy.uuid)]
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        next_cursor = res.json['meta']['next']
+
+        Dummy.query.filter(Dummy.uuid == uuid.UUID(expected[2])).delete()
+        db.session.commit()
+
+        res = self.simulate_get(
+            '/dummies/',
+            query_string='auth_key=superpassword&cursor={}'.format(
+                next_cursor))
+        meta = res.json['meta']
+
+        self.assertEqual(res.json['results'], [])
+        self.assertIsNone(meta['next'])
+        self.assertIsNotNone(meta['prev'])
+
+        res = self.simulate_get(
+            '/dummies/',
+            query_string='auth_key=superpassword&cursor={}'.format(
+                meta['prev']))
+
+        self.assertEqual(
+            [d['uuid'] for d in res.json['results']], expected[:2])
+
+    def test_index_cursor_paginated_invalid_cursor(self):
+        self.viewset.cursor_paginate = (2, 10)
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword&cursor=nope')
+
+        self.assertEqual(res.status, falcon.HTTP_400)
+
+    def test_index_cached(self):
+        cache.init({'engine': 'frf.cache.engines.memory.MemoryCacheEngine'})
+        self.viewset.cache_responses = True
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 3)
+
+        # changes made outside of the viewset aren't seen.
+        Dummy.query.delete()
+        db.session.commit()
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 3)
+
+        # but different query parameters are cached separately
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword&filter=x')
+        self.assertEqual(res.json['meta']['total'], 0)
+
+        # and authentication still runs.
+        res = self.simulate_get('/dummies/')
+        self.assertEqual(res.status, falcon.HTTP_401)
+
+    def test_index_cached_per_user(self):
+        cache.init({'engine': 'frf.cache.engines.memory.MemoryCacheEngine'})
+        self.viewset.cache_responses = True
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 3)
+
+        Dummy.query.delete()
+        db.session.commit()
+
+        # another user doesn't get the first user's response
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=otherpassword')
+        self.assertEqual(res.json['meta']['total'], 0)
+
+        # and users that can't be identified aren't cached
+        with QueryRecorder() as recorder:
+            self.simulate_get('/dummies/', query_string='auth_key=nobody')
+            self.simulate_get('/dummies/', query_string='auth_key=nobody')
+        self.assertEqual(recorder.count, 4)
+
+    def test_cache_generation_not_reused(self):
+        cache.init({'engine': 'frf.cache.engines.memory.MemoryCacheEngine'})
+        self.viewset.cache_responses = True
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 3)
+
+        # a lost generation doesn't bring back the responses cached under it
+        Dummy.query.delete()
+        db.session.commit()
+        cache.get_engine().delete_many([
+            key for key in list(cache.get_engine().items)
+            if key.endswith(':generation')])
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 0)
+
+    def test_index_cache_invalidated_on_write(self):
+        cache.init({'engine': 'frf.cache.engines.memory.MemoryCacheEngine'})
+        self.viewset.cache_responses = True
+        item = Dummy.query.first()
+
+        res = self.simulate_get(
+            '/dummies/{}/'.format(item.uuid),
+            query_string='auth_key=superpassword')
+        self.assertEqual(res.json['email'], item.email)
+
+        update_data = {'email': faker.email()}
+        res = self.simulate_patch(
+            '/dummies/{}/'.format(item.uuid),
+            body=json.dumps(update_data),
+            query_string='auth_key=superpassword')
+        self.assertEqual(res.status, falcon.HTTP_204)
+
+        res = self.simulate_get(
+            '/dummies/{}/'.format(item.uuid),
+            query_string='auth_key=superpassword')
+        self.assertEqual(res.json['email'], update_data['email'])
+
+    def test_cache_invalidated_by_other_viewset(self):
+        cache.init({'engine': 'frf.cache.engines.memory.MemoryCacheEngine'})
+        reader = DummyViewSet()
+        reader.cache_responses = True
+        self.api.add_route('/cached_dummies/', reader)
+
+        res = self.simulate_get(
+            '/cached_dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 3)
+
+        # written through a viewset for the same model, that doesn't cache
+        res = self.simulate_post(
+            '/dummies/', body=json.dumps({
+                'name': faker.name(), 'email': faker.email()}),
+            query_string='auth_key=superpassword')
+        self.assertEqual(res.status, falcon.HTTP_201)
+
+        res = self.simulate_get(
+            '/cached_dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.json['meta']['total'], 4)
+
+    def test_index_etag(self):
+        self.viewset.conditional_get = True
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(res.status, falcon.HTTP_200)
+        etag = res.headers['etag']
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword',
+            headers={'If-None-Match': etag})
+        self.assertEqual(res.status, falcon.HTTP_304)
+        self.assertEqual(res.content, b'')
+
+        item = Dummy.query.first()
+        self.simulate_patch(
+            '/dummies/{}/'.format(item.uuid),
+            body=json.dumps({'email': faker.email()}),
+            query_string='auth_key=superpassword')
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword',
+            headers={'If-None-Match': etag})
+        self.assertEqual(res.status, falcon.HTTP_200)
+        self.assertNotEqual(res.headers['etag'], etag)
+
+    def test_index_sparse_fields(self):
+        self.viewset.sparse_fields = True
+
+        with QueryRecorder() as recorder:
+            res = self.simulate_get(
+                '/dummies/',
+                query_string='auth_key=superpassword&fields=uuid,name')
+
+        for item in res.json['results']:
+            self.assertEqual(['name', 'uuid'], sorted(item))
+
+        select = [s for s in recorder.statements
+                  if 'dummy_table.name' in s][-1]
+        self.assertNotIn('dummy_table.title', select)
+
+        res = self.simulate_get(
+            '/dummies/',
+            query_string='auth_key=superpassword&exclude=title,email')
+        for item in res.json['results']:
+            self.assertEqual(['is_awesome', 'name', 'uuid'], sorted(item))
+
+    def test_retrieve_sparse_fields_unknown(self):
+        self.viewset.sparse_fields = True
+        item = Dummy.query.first()
+
+        res = self.simulate_get(
+            '/dummies/{}/'.format(item.uuid),
+            query_string='auth_key=superpassword&fields=name,password')
+
+        self.assertEqual(res.status, falcon.HTTP_422)
+        self.assertIn('password', res.json['description']['fields'][0])
+
+    def test_bulk_create(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        create_data = [
+            {'email': faker.email(), 'name': faker.name()} for i in range(3)]
+
+        with QueryRecorder() as recorder:
+            res = self.simulate_post(
+                '/dummies/', body=json.dumps(create_data),
+                query_string='auth_key=superpassword')
+
+        inserts = [s for s in recorder.statements if s.startswith('INSERT')]
+
+        self.assertEqual(res.status, falcon.HTTP_201)
+        self.assertEqual(1, len(inserts))
+        self.assertEqual(3, len(res.json))
+        self.assertEqual(6, Dummy.query.count())
+        self.assertEqual(
+            [d['email'] for d in create_data],
+            [d['email'] for d in res.json])
+
+    def test_bulk_create_errors(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        create_data = [
+            {'email': faker.email(), 'name': faker.name()},
+            {'name': faker.name()},
+            {'email': 'invalid', 'name': faker.name()},
+        ]
+
+        res = self.simulate_post(
+            '/dummies/', body=json.dumps(create_data),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_422)
+        self.assertEqual(['1', '2'], sorted(res.json['description']))
+        self.assertIn('email', res.json['description']['1'])
+        self.assertEqual(3, Dummy.query.count())
+
+    def test_bulk_create_not_enabled(self):
+        res = self.simulate_post(
+            '/dummies/', body=json.dumps([{'name': 'one'}]),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_422)
+
+    def test_bulk_update(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        items = Dummy.query.all()
+        update_data = [
+            {'uuid': str(item.uuid), 'title': 'Title {}'.format(i)}
+            for i, item in enumerate(items)]
+
+        res = self.simulate_patch(
+            '/dummies/', body=json.dumps(update_data),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_204)
+
+        db.session.expire_all()
+        for i, item in enumerate(items):
+            self.assertEqual(
+                Dummy.query.filter_by(uuid=item.uuid).one().title,
+                'Title {}'.format(i))
+
+    def test_bulk_update_not_found(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        item = Dummy.query.first()
+        update_data = [
+            {'uuid': str(item.uuid), 'title': 'Changed'},
+            {'uuid': str(uuid.uuid4()), 'title': 'Changed'},
+        ]
+
+        res = self.simulate_patch(
+            '/dummies/', body=json.dumps(update_data),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_422)
+        self.assertEqual(['1'], list(res.json['description']))
+
+        db.session.expire_all()
+        self.assertNotEqual(
+            Dummy.query.filter_by(uuid=item.uuid).one().title, 'Changed')
+
+    def test_bulk_destroy(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        items = Dummy.query.all()
+
+        with QueryRecorder() as recorder:
+            res = self.simulate_delete(
+                '/dummies/',
+                body=json.dumps([str(items[0].uuid), str(items[1].uuid)]),
+                query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_204)
+        # the objects are loaded, then deleted with a single statement
+        self.assertEqual(2, recorder.count)
+        self.assertEqual(
+            [items[2].uuid], [d.uuid for d in Dummy.query.all()])
+
+    def test_bulk_destroy_each(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        self.viewset.bulk_destroy_each = True
+        items = Dummy.query.order_by(Dummy.uuid).all()
+        removed = []
+
+        def destroy_remove_obj(req, obj, commit=True, **kwargs):
+            # soft delete
+            obj.title = 'deleted'
+            removed.append(obj.uuid)
+            if commit:
+                db.session.commit()
+
+        self.viewset.destroy_remove_obj = destroy_remove_obj
+
+        res = self.simulate_delete(
+            '/dummies/',
+            body=json.dumps([str(items[0].uuid), str(items[1].uuid)]),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_204)
+        self.assertEqual([items[0].uuid, items[1].uuid], removed)
+
+        db.session.expire_all()
+        self.assertEqual(3, Dummy.query.count())
+        self.assertEqual(
+            ['deleted', 'deleted'],
+            [d.title for d in Dummy.query.filter(
+                Dummy.uuid.in_(removed))])
+
+    def test_bulk_destroy_each_is_atomic(self):
+        self.viewset.bulk_actions = ('create', 'update', 'destroy')
+        self.viewset.bulk_destroy_each = True
+        items = Dummy.query.order_by(Dummy.uuid).all()
+
+        def destroy_remove_obj(req, obj, commit=True, **kwargs):
+            if obj.uuid == items[1].uuid:
+                raise ValueError('nope')
+            db.session.delete(obj)
+            if commit:
+                db.session.commit()
+
+        self.viewset.destroy_remove_obj = destroy_remove_obj
+
+        with self.assertRaises(ValueError):
+            self.simulate_delete(
+                '/dummies/',
+                body=json.dumps([str(items[0].uuid), str(items[1].uuid)]),
+                query_string='auth_key=superpassword')
+
+        db.session.expire_all()
+        self.assertEqual(3, Dummy.query.count())
+
+
+class ConditionalGetTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        db.init('sqlite://', echo=False)
+        Note.metadata.create_all(db.engine)
+
+        self.api = falcon.API()
+        self.viewset = NoteViewSet()
+        self.api.add_route('/notes/', self.viewset)
+        self.api.add_route('/notes/{id}/', self.viewset)
+
+        for i in range(3):
+            db.session.add(Note(text=faker.sentence()))
+        db.session.commit()
+
+    def test_index_not_modified_without_serializing(self):
+        res = self.simulate_get('/notes/')
+        self.assertEqual(res.status, falcon.HTTP_200)
+        self.assertNotIn('last-modified', res.headers)
+        etag = res.headers['etag']
+
+        with mock.patch.object(NoteSerializer, 'serialize') as serialize:
+            res = self.simulate_get(
+                '/notes/', headers={'If-None-Match': etag})
+
+        self.assertEqual(res.status, falcon.HTTP_304)
+        self.assertFalse(serialize.called)
+
+        # different query string, different etag.
+        res = self.simulate_get(
+            '/notes/', query_string='page=2', headers={'If-None-Match': etag})
+        self.assertNotEqual(res.headers['etag'], etag)
+
+    def test_index_etag_hashes_body_by_default(self):
+        self.viewset.updated_at_validators = False
+        etag = self.simulate_get('/notes/').headers['etag']
+
+        with mock.patch.object(
+                NoteSerializer, 'serialize', return_value=[]) as serialize:
+            res = self.simulate_get(
+                '/notes/', headers={'If-None-Match': etag})
+
+        self.assertTrue(serialize.called)
+        self.assertEqual(res.status, falcon.HTTP_200)
+
+    def test_index_etag_changes_on_delete(self):
+        etag = self.simulate_get('/notes/').headers['etag']
+
+        Note.query.filter_by(id=Note.query.first().id).delete()
+        db.session.commit()
+
+        res = self.simulate_get('/notes/', headers={'If-None-Match': etag})
+        self.assertEqual(res.status, falcon.HTTP_200)
+        self.assertEqual(2, len(res.json))
+
+    def test_retrieve_if_modified_since(self):
+        note = Note.query.first()
+
+        res = self.simulate_get('/notes/{}/'.format(note.id))
+        self.assertEqual(res.status, falcon.HTTP_200)
+        last_modified = res.headers['last-modified']
+
+        res = self.simulate_get(
+            '/notes/{}/'.format(note.id),
+            headers={'If-Modified-Since': last_modified})
+        self.assertEqual(res.status, falcon.HTTP_304)
+
+        res = self.simulate_get(
+            '/notes/{}/'.format(note.id),
+            headers={'If-Modified-Since': 'Sat, 01 Jan 2000 00:00:00 GMT'})
+        self.assertEqual(res.status, falcon.HTTP_200)
+        self.assertEqual(res.json['id'], note.id)
@@ -0,0 +1,91 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import falcon
+from falcon.testing import TestCase as BaseTestCase
+
+from frf import conf, db, middleware, profiling
+from frf.tests.fake import faker
+from frf.tests.test_model_viewsets import Dummy, DummyViewSet
+
+RECORDED = []
+
+
+class ListSink(profiling.BaseSink):
+    def record(self, req, resp, profile):
+        RECORDED.append(profile)
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        db.init('sqlite://', echo=False)
+        Dummy.metadata.create_all(db.engine)
+
+        for i in range(3):
+            db.session.add(Dummy(name=faker.name(), email=faker.email()))
+        db.session.commit()
+
+        RECORDED[:] = []
+        self.setup_api({'sink': 'frf.tests.test_profiling.ListSink'})
+
+    def tearDown(self):
+        conf.pop('PROFILING', None)
+        super().tearDown()
+
+    def setup_api(self, settings):
+        conf['PROFILING'] = settings
+        self.api = falcon.API(middleware=[middleware.ProfilingMiddleware()])
+        self.api.add_route('/dummies/', DummyViewSet())
+
+    def test_server_timing(self):
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_200)
+
+        header = res.headers['server-timing']
+        for name in ('authenticate', 'check_permissions', 'get_filtered_qs',
+                     'count', 'serialize', 'render', 'json_encode', 'sql',
+                     'total'):
+            self.assertIn('{};dur='.format(name), header)
+
+        self.assertEqual(1, len(RECORDED))
+        profile = RECORDED[0]
+        # the count, and the list
+        self.assertEqual(2, profile.sql_count)
+        self.assertIn('2 queries', header)
+        self.assertGreater(profile.total, 0)
+
+    def test_sampling(self):
+        self.setup_api({
+            'sample_rate': 0, 'sink': 'frf.tests.test_profiling.ListSink'})
+
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_200)
+        self.assertNotIn('server-timing', res.headers)
+        self.assertEqual([], RECORDED)
+
+    def test_queries_outside_requests_not_counted(self):
+        self.simulate_get('/dummies/', query_string='auth_key=superpassword')
+        Dummy.query.count()
+
+        self.assertEqual(2, RECORDED[0].sql_count)
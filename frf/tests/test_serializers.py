@@ -22,6 +22,7 @@ import unittest
 import uuid
 
 import falcon
+import mock
 
 from frf import db, exceptions, serializers
 from frf.tests.base import BaseTestCase
@@ -29,6 +30,7 @@ from frf.tests import fakeproject  # noqa
 from frf.tests.fakeapp import models
 from frf.utils import timezone
 from frf.utils.json import serialize
+from frf.utils.queries import QueryRecorder
 
 
 class DummySerializer(serializers.Serializer):
@@ -136,6 +138,57 @@ class TestCase(unittest.TestCase):
             self.assertEqual(item['email'], objs[i].email)
             self.assertEqual(item['title'], objs[i].title)
 
+    def test_serialize_plan_matches_field_to_data(self):
+        class UpperField(serializers.StringField):
+            def to_data(self, obj, value, ctx=None):
+                return value.upper()
+
+        serializer = new_serializer_class(
+            uuid=serializers.UUIDField(),
+            date=serializers.ISODateTimeField(),
+            settings=serializers.JSONField(),
+            name=UpperField(),
+            title=serializers.StringField(),
+            missing=serializers.UUIDField(),
+            )
+
+        obj = serializers.SerializerObject(
+            uuid=uuid.uuid4(),
+            date=timezone.now(),
+            settings='{"one": 1}',
+            name='adam',
+            title='Sweet')
+
+        expected = {}
+        for field_name, field in serializer.fields.items():
+            expected[field_name] = field.to_data(
+                obj=obj, value=getattr(obj, field.source, None))
+
+        self.assertEqual(serializer.serialize(obj), expected)
+        self.assertEqual(serializer.serialize([obj, obj], many=True),
+                         [expected, expected])
+        self.assertEqual(expected['name'], 'ADAM')
+        self.assertIsNone(expected['missing'])
+
+    def test_subset(self):
+        serializer = DummySerializer()
+        subset = serializer.subset(fields=['name', 'email'])
+
+        self.assertIs(subset, serializer.subset(fields=['email', 'name']))
+        self.assertEqual(['email', 'name'], sorted(subset.fields))
+        self.assertEqual(
+            ['is_awesome', 'title'],
+            sorted(serializer.subset(exclude=['name', 'email']).fields))
+
+        obj = serializer.save(data={
+            'name': 'Adam', 'email': 'adam@example.com', 'title': 'Sweet'})
+        self.assertEqual(
+            {'name': 'Adam', 'email': 'adam@example.com'},
+            subset.serialize(obj))
+
+        with self.assertRaises(exceptions.InvalidFieldException):
+            serializer.subset(fields=['name', 'nope'])
+
     def test_update_update_read_only_field_same_value(self):
         """Test that an update_read_only field allows the update if the value
         is the same as the one that's already on the object, after calling
@@ -266,6 +319,45 @@ class TestCase(unittest.TestCase):
         for i, match in enumerate(matches):
             self.assertIn(match, context.exception.description['name'][i])
 
+    def test_compiled_validators_skip_inactive(self):
+        field = serializers.StringField()
+        names = [v.__name__ for v in field._value_validators]
+
+        self.assertIn('validate_is_string', names)
+        for name in ('validate_choices', 'validate_regex', 'validate_blank',
+                     'validate_min_length', 'validate_max_length',
+                     'validate_update_read_only'):
+            self.assertNotIn(name, names)
+
+        field = serializers.StringField(
+            max_length=3, regex='a', update_read_only=True)
+        names = [v.__name__ for v in field._value_validators]
+
+        self.assertIn('validate_regex', names)
+        self.assertIn('validate_max_length', names)
+        self.assertEqual(
+            ['validate_update_read_only'],
+            [v.__name__ for v in field._python_validators])
+
+    def test_validate_to_python_called_once(self):
+        calls = []
+
+        class CountingField(serializers.StringField):
+            def to_python(self, obj, data, value, ctx=None):
+                calls.append(value)
+                return super().to_python(
+                    obj=obj, data=data, value=value, ctx=ctx)
+
+        serializer = new_serializer_class(
+            name=CountingField(update_read_only=True),
+            )
+
+        obj = serializers.SerializerObject(name='Adam')
+        cleaned_data = serializer.validate(obj=obj, data={'name': ' Adam '})
+
+        self.assertEqual(cleaned_data['name'], 'Adam')
+        self.assertEqual(calls, [' Adam '])
+
     def test_fail_update_email_read_only(self):
         obj = serializers.SerializerObject(**{
             'name': 'Adam Olsen',
@@ -557,3 +649,66 @@ class FakeProjectTestCase(BaseTestCase):
 
         self.assertEqual(1, len(self.adam.books))
         self.assertEqual(self.adam.books[0], book)
+
+    def test_related_ids_loaded_in_one_query(self):
+        from frf.tests.fakeapp.serializers import CompanySerializer
+
+        serializer = CompanySerializer()
+        ctx = {}
+        data = {
+            'name': 'SOC',
+            'authors': [
+                {'uuid1': str(a.uuid1), 'uuid2': str(a.uuid2)}
+                for a in (self.ross, self.adam)],
+        }
+
+        with self.assertNumQueries(1):
+            cleaned_data = serializer.validate(data=data, ctx=ctx)
+
+        self.assertEqual([self.ross, self.adam], cleaned_data['authors'])
+
+    def test_fail_related_id_missing(self):
+        from frf.tests.fakeapp.serializers import AuthorSerializer
+
+        serializer = AuthorSerializer()
+
+        with self.assertRaises(exceptions.ValidationError) as context:
+            serializer.validate(
+                obj=self.adam,
+                data={'books': [self.books[0].id, 12345]})
+
+        self.assertIn('books', context.exception.description)
+
+    def test_index_authors_eager_loaded(self):
+        from frf.tests.fakeapp.viewsets import AuthorViewSet
+
+        for i in range(5):
+            company = models.Company(name='Company {}'.format(i))
+            db.session.add(models.Author(name=str(i), company=company))
+        db.session.commit()
+
+        with QueryRecorder() as lazy:
+            self.simulate_get('/api/authors/')
+
+        with mock.patch.object(AuthorViewSet, 'auto_eager_load', True):
+            # the list query, the total count, and the books.
+            with self.assertNumQueries(3):
+                res = self.simulate_get('/api/authors/')
+
+        self.assertGreater(lazy.count, 3)
+        # lazy loading runs the same books query once per author
+        self.assertTrue(lazy.repeated(threshold=5))
+        self.assertEqual(7, len(res.json))
+
+        adam = [a for a in res.json if a['name'] == 'Adam Olsen'][0]
+        self.assertEqual(sorted(adam['books']), [1, 2])
+
+    def test_index_authors_streamed_eager_loaded(self):
+        from frf.tests.fakeapp.viewsets import AuthorViewSet
+
+        with mock.patch.multiple(
+                AuthorViewSet, auto_eager_load=True, stream_list=True):
+            res = self.simulate_get('/api/authors/')
+
+        self.assertEqual(falcon.HTTP_200, res.status)
+        self.assertEqual(2, len(res.json))
@@ -0,0 +1,108 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import unittest
+
+from frf.tests import fakeproject  # noqa
+from frf import app, cache, db, server  # noqa
+from frf.cache.engines.memory import MemoryCacheEngine
+from frf.utils.conf import OverrideSettingsManager
+
+
+class OptionsTestCase(unittest.TestCase):
+    def test_get_options(self):
+        with OverrideSettingsManager(
+                DEBUG=False, SERVER={'workers': 8, 'keepalive': 5}):
+            options = server.get_options(keepalive=10, threads=None)
+
+        self.assertEqual('0.0.0.0:8080', options['bind'])
+        self.assertEqual(30, options['timeout'])
+        self.assertEqual(8, options['workers'])
+        self.assertEqual(10, options['keepalive'])
+        self.assertNotIn('threads', options)
+
+    def test_unknown_option(self):
+        with self.assertRaises(ValueError):
+            server.get_options(not_an_option=1)
+
+    def test_reload_requires_debug(self):
+        with OverrideSettingsManager(DEBUG=True):
+            self.assertTrue(server.get_options(reload=True)['reload'])
+
+        with OverrideSettingsManager(DEBUG=False):
+            with self.assertRaises(ValueError):
+                server.get_options(reload=True)
+
+            with OverrideSettingsManager(SERVER={'reload': True}):
+                with self.assertRaises(ValueError):
+                    server.get_options()
+
+    def test_command_line(self):
+        argv = server.command_line({
+            'bind': ['127.0.0.1:8000', '127.0.0.1:8001'],
+            'keepalive': 5,
+            'reload': True,
+            'preload_app': False,
+            'post_fork': server.post_fork,
+        }, asgi=True)
+
+        self.assertEqual([
+            'gunicorn',
+            '--bind', '127.0.0.1:8000', '--bind', '127.0.0.1:8001',
+            '--keep-alive', '5',
+            '--reload',
+        ], argv[:-1])
+        self.assertTrue(argv[-1].endswith(':app.asgi'))
+
+
+class ApplicationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.old_engine = cache.get_engine()
+        cache._cache_engine = MemoryCacheEngine(default_timeout=30)
+
+    def tearDown(self):
+        cache._cache_engine = self.old_engine
+
+    def test_load(self):
+        application = server.Application({'workers': 4, 'max_requests': 100})
+
+        self.assertEqual(4, application.cfg.workers)
+        self.assertEqual(100, application.cfg.max_requests)
+        self.assertIs(app.api, application.load())
+        self.assertIs(
+            app.asgi, server.Application({}, asgi=True).load())
+
+    def test_post_fork(self):
+        calls = []
+        application = server.Application({
+            'post_fork': lambda server, worker: calls.append(worker),
+        })
+
+        old_pool = db.engine.pool
+        old_lock = cache.get_engine().lock
+        application.cfg.post_fork(None, 'worker')
+
+        self.assertIsNot(old_pool, db.engine.pool)
+        self.assertIsNot(old_lock, cache.get_engine().lock)
+        self.assertEqual(['worker'], calls)
+
+    def test_default_post_fork(self):
+        application = server.Application()
+
+        self.assertIs(server.post_fork, application.cfg.post_fork)
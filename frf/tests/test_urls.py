@@ -0,0 +1,138 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import falcon
+from falcon.testing import TestCase as BaseTestCase
+
+from frf import app, urls, views
+from frf.commands.routes import describe
+from frf.tests import fakeproject  # noqa
+from frf.tests import test_viewsets
+from frf.tests.test_viewsets import DummyViewSet
+
+
+class HelloView(views.View):
+    allowed_methods = ('get', )
+
+    def get(self, req, resp, **kwargs):
+        resp.body = '{}'
+
+
+class ReadOnlyDummyViewSet(DummyViewSet):
+    allowed_actions = ('list', 'retrieve')
+
+
+class CompileRoutesTestCase(BaseTestCase):
+    def test_flatten_and_dedupe(self):
+        viewset = DummyViewSet()
+        view = HelloView()
+
+        routes = urls.compile_routes([
+            ('/dummies/', viewset),
+            ('/api/', urls.include([
+                ('/hello/', view),
+                ('/hello', view),
+            ])),
+            ('/dummies/', viewset),
+        ])
+
+        self.assertEqual(
+            [urls.Route('/dummies/', viewset),
+             urls.Route('/api/hello/', view)], routes)
+
+    def test_errors(self):
+        viewset = DummyViewSet()
+
+        with self.assertRaises(urls.RouteError) as cm:
+            urls.compile_routes([
+                ('/dummies/', viewset),
+                ('/dummies/{uuid}/', viewset),
+                ('/dummies', HelloView()),
+                ('/dummies/{id}/', viewset),
+                ('/nothing/', object()),
+            ])
+
+        message = str(cm.exception)
+        self.assertIn('/dummies: frf.tests.test_urls.HelloView conflicts '
+                      'with /dummies/', message)
+        self.assertIn(
+            '/dummies/{id}/: field names differ from /dummies/{uuid}/',
+            message)
+        self.assertIn('/nothing/: builtins.object has no responders',
+                      message)
+
+    def test_include_error(self):
+        with self.assertRaisesRegex(urls.IncludeError, 'frf.tests.nope'):
+            urls.include('frf.tests.nope.urls')
+
+    def test_app_routes(self):
+        # set up by ``frf.tests.fakeproject``
+        routes = {route.uri_template: route for route in app.routes}
+        route = routes['/api/companies/{id}/']
+
+        self.assertEqual({
+            'route': '/api/companies/{id}/',
+            'resource': 'frf.tests.fakeapp.viewsets.CompanyViewSet',
+            'methods': {'GET': 'retrieve', 'POST': 'create', 'PUT': 'update',
+                        'PATCH': 'update', 'DELETE': 'destroy'},
+        }, describe(route))
+
+        self.assertEqual(
+            {'GET': 'on_get'},
+            describe(urls.Route('/hello/', HelloView()))['methods'])
+
+
+class BindActionsTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        test_viewsets.ITEMS = []
+
+        self.viewset = ReadOnlyDummyViewSet()
+        self.api = falcon.API()
+        app._add_urls(self.api, [
+            ('/dummies/', self.viewset),
+            ('/dummies/{uuid}/', self.viewset),
+        ])
+
+    def test_bind_actions(self):
+        self.assertEqual({
+            ('get', False): 'list',
+            ('get', True): 'retrieve',
+        }, self.viewset.bound_actions)
+
+    def test_dispatch(self):
+        res = self.simulate_get(
+            '/dummies/', query_string='auth_key=superpassword')
+        self.assertEqual(falcon.HTTP_200, res.status)
+        self.assertEqual([], res.json['results'])
+
+        res = self.simulate_post(
+            '/dummies/', query_string='auth_key=superpassword', body='{}')
+        self.assertEqual(falcon.HTTP_405, res.status)
+
+        # authentication still comes first
+        res = self.simulate_get('/dummies/')
+        self.assertEqual(falcon.HTTP_401, res.status)
+
+    def test_overridden_get_action_is_not_bound(self):
+        class CustomViewSet(DummyViewSet):
+            def get_action(self, mapped_method, req, **kwargs):
+                return super().get_action(mapped_method, req, **kwargs)
+
+        self.assertEqual({}, CustomViewSet().bind_actions())
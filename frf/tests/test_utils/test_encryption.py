@@ -17,10 +17,32 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
+import os
+import subprocess
+import sys
+import threading
 import unittest
 
+import sqlalchemy
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+from frf.models.types import EncryptedType
+from frf.models.types.encryption import reencrypt_table
 from frf.utils import encryption
 
+Base = declarative_base()
+
+keys = ['oldkey']
+
+
+class Secret(Base):
+    __tablename__ = 'secrets'
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    name = sqlalchemy.Column(sqlalchemy.String(50))
+    value = sqlalchemy.Column(EncryptedType(key=lambda: keys[0]))
+
 
 class TestCase(unittest.TestCase):
     def setUp(self):
@@ -58,3 +80,224 @@ class TestCase(unittest.TestCase):
 
         self.assertEqual(res1, res2)
         self.assertEqual(res1, 'this is some data')
+
+    def test_key_derivation_is_cached(self):
+        encryption.derive_key.cache_clear()
+
+        for key in ('fruitloops', 'fruitloops', 'other', 'fruitloops'):
+            cipher = encryption.AESCipher(key=key)
+            cipher.decrypt(cipher.encrypt('data'))
+
+        info = encryption.derive_key.cache_info()
+        self.assertEqual(2, info.misses)
+
+    def test_get_cipher(self):
+        cipher = encryption.get_cipher(encryption.AESCipher, 'fruitloops')
+
+        self.assertIs(
+            cipher, encryption.get_cipher(encryption.AESCipher, 'fruitloops'))
+        self.assertIsNot(
+            cipher, encryption.get_cipher(encryption.AESCipher, 'other'))
+        self.assertEqual(
+            'data', self.cipher.decrypt(cipher.encrypt('data')))
+
+    def test_crypto_is_imported_lazily(self):
+        # in a new interpreter, as this one has imported it already
+        root = os.path.dirname(os.path.dirname(encryption.__file__))
+        code = ('import sys\n'
+                'import frf.models\n'
+                'sys.exit("Crypto" in sys.modules)\n')
+
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=os.path.dirname(root))
+        self.assertEqual(0, result.returncode)
+
+
+@unittest.skipIf(not encryption.has_aead(), 'cryptography is not installed')
+class GCMTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.cipher = encryption.AESGCMCipher(key='fruitloops')
+
+    def test_encrypt_decrypt(self):
+        res = self.cipher.encrypt('this is some data')
+        self.assertTrue(res.startswith(encryption.GCM_PREFIX))
+        self.assertNotEqual(res, self.cipher.encrypt('this is some data'))
+        self.assertEqual('this is some data', self.cipher.decrypt(res))
+        self.assertEqual(
+            'this is some data', self.cipher.decrypt(memoryview(res)))
+
+    def test_decrypts_cbc_data(self):
+        res = encryption.AESCipher(key='fruitloops').encrypt('old data')
+        self.assertEqual('old data', self.cipher.decrypt(res))
+
+    def test_fail_decrypt(self):
+        res = self.cipher.encrypt('this is some data')
+
+        with self.assertRaises(encryption.DecryptionError):
+            encryption.AESGCMCipher(key='wrongkey').decrypt(res)
+
+        with self.assertRaises(encryption.DecryptionError):
+            self.cipher.decrypt(res[:-1] + bytes([res[-1] ^ 1]))
+
+        with self.assertRaises(encryption.DecryptionError):
+            self.cipher.decrypt(encryption.GCM_PREFIX + b'short')
+
+    def test_encrypted_type(self):
+        keys = ['fruitloops']
+        type_ = EncryptedType(
+            key=lambda: keys[0], engine=encryption.AESGCMCipher)
+
+        value = type_.process_bind_param('secret', None)
+        self.assertTrue(value.startswith(encryption.GCM_PREFIX))
+        self.assertEqual('secret', type_.process_result_value(value, None))
+
+        old = EncryptedType(key='fruitloops').process_bind_param('old', None)
+        self.assertEqual('old', type_.process_result_value(old, None))
+
+        keys[0] = 'other'
+        with self.assertRaises(encryption.DecryptionError):
+            type_.process_result_value(value, None)
+
+
+class KeyRingTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.engine = encryption.AESCipher
+        self.ring = encryption.KeyRing([('2', 'newkey'), ('1', 'oldkey')])
+
+    def test_encrypt_decrypt(self):
+        res = self.ring.encrypt(self.engine, 'data')
+        self.assertTrue(res.startswith(b'$k:2$'))
+        self.assertTrue(self.ring.is_current(res))
+        self.assertEqual('data', self.ring.decrypt(self.engine, res))
+
+    def test_decrypt_old_keys(self):
+        old_ring = encryption.KeyRing([('1', 'oldkey')])
+        res = old_ring.encrypt(self.engine, 'data')
+        self.assertFalse(self.ring.is_current(res))
+        self.assertEqual('data', self.ring.decrypt(self.engine, res))
+
+        # untagged values, from before using a key ring
+        res = encryption.AESCipher(key='oldkey').encrypt('data')
+        self.assertEqual(
+            (None, res), self.ring.split(memoryview(res)))
+        self.assertEqual('data', self.ring.decrypt(self.engine, res))
+
+    def test_fail_decrypt(self):
+        res = encryption.KeyRing([('3', 'otherkey')]).encrypt(
+            self.engine, 'data')
+        with self.assertRaises(encryption.DecryptionError):
+            self.ring.decrypt(self.engine, res)
+
+        res = encryption.AESCipher(key='otherkey').encrypt('data')
+        with self.assertRaises(encryption.DecryptionError):
+            self.ring.decrypt(self.engine, res)
+
+    def test_concurrent_use(self):
+        old = encryption.KeyRing([('1', 'oldkey')]).encrypt(
+            self.engine, 'old')
+        written = []
+        errors = []
+
+        def read():
+            try:
+                for i in range(200):
+                    self.ring.decrypt(self.engine, old)
+            except Exception as e:
+                errors.append(e)
+
+        def write():
+            for i in range(200):
+                written.append(self.ring.encrypt(self.engine, 'new'))
+
+        threads = [threading.Thread(target=read) for i in range(3)]
+        threads.append(threading.Thread(target=write))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        new_ring = encryption.KeyRing([('2', 'newkey')])
+        self.assertEqual(
+            ['new'] * 200,
+            [new_ring.decrypt(self.engine, value) for value in written])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            encryption.KeyRing([])
+
+        with self.assertRaises(ValueError):
+            encryption.KeyRing([('a$b', 'key')])
+
+
+class RotationTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        keys[0] = 'oldkey'
+        self.engine = sqlalchemy.create_engine('sqlite://')
+        Base.metadata.create_all(self.engine)
+        self.session = orm.Session(self.engine)
+
+        self.session.add_all([
+            Secret(id=i, name='secret {}'.format(i),
+                   value='value {}'.format(i))
+            for i in range(1, 11)])
+        self.session.add(Secret(id=11, name='empty', value=None))
+        self.session.commit()
+
+        keys[0] = encryption.KeyRing([('2', 'newkey'), ('1', 'oldkey')])
+
+    def tearDown(self):
+        keys[0] = 'oldkey'
+        self.session.close()
+        super().tearDown()
+
+    def ciphertexts(self):
+        return dict(self.engine.execute(
+            'SELECT id, value FROM secrets').fetchall())
+
+    def test_reencrypt_on_update(self):
+        self.assertEqual(
+            'value 1', self.session.query(Secret).get(1).value)
+        self.assertFalse(self.ciphertexts()[1].startswith(b'$k:2$'))
+
+        self.session.query(Secret).get(1).name = 'changed'
+        self.session.query(Secret).get(2)
+        self.session.commit()
+
+        ciphertexts = self.ciphertexts()
+        self.assertTrue(ciphertexts[1].startswith(b'$k:2$'))
+        self.assertFalse(ciphertexts[2].startswith(b'$k:2$'))
+        self.assertEqual(
+            'value 1', self.session.query(Secret).get(1).value)
+
+    def test_reencrypt_table(self):
+        before = self.ciphertexts()
+
+        progress = list(reencrypt_table(
+            self.session, Secret.__table__, batch_size=4, start_after=2))
+        self.assertEqual([(6, 4, 4), (10, 4, 4), (11, 1, 0)], progress)
+
+        ciphertexts = self.ciphertexts()
+        self.assertEqual(before[1], ciphertexts[1])
+        self.assertEqual(before[2], ciphertexts[2])
+        self.assertIsNone(ciphertexts[11])
+        for i in range(3, 11):
+            self.assertTrue(ciphertexts[i].startswith(b'$k:2$'))
+
+        # resuming doesn't rewrite values already using the current key
+        self.assertEqual(
+            [(11, 11, 2)],
+            list(reencrypt_table(self.session, Secret.__table__)))
+
+        keys[0] = encryption.KeyRing([('2', 'newkey')])
+        self.session.expire_all()
+        self.assertEqual(
+            ['value {}'.format(i) for i in range(1, 11)] + [None],
+            [secret.value for secret in
+             self.session.query(Secret).order_by(Secret.id)])
@@ -18,6 +18,7 @@
 # above.
 
 import inspect
+import sys
 import unittest
 
 from frf.utils import importing
@@ -40,3 +41,29 @@ class TestCase(unittest.TestCase):
             importing.import_class('frf.tests.test_utils.test_importing')
 
         self.assertIn('does not refer to a class', str(context.exception))
+
+
+class ImportProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        sys.modules.pop('colorsys', None)
+
+    def test_profile_import(self):
+        with importing.ImportProfiler() as profiler:
+            import colorsys  # noqa
+
+        self.assertNotIn(profiler, sys.meta_path)
+        self.assertIn('colorsys', profiler.modules)
+
+        own, cumulative = profiler.modules['colorsys']
+        self.assertGreater(own, 0)
+        self.assertGreaterEqual(cumulative, own)
+        self.assertEqual('colorsys', profiler.slowest(1)[0][0])
+        self.assertIn('colorsys', profiler.format())
+
+    def test_already_imported(self):
+        import colorsys  # noqa
+
+        with importing.ImportProfiler() as profiler:
+            import colorsys  # noqa
+
+        self.assertEqual(0, len(profiler.modules))
@@ -46,3 +46,48 @@ class TestCase(unittest.TestCase):
         res = json.deserialize(json.serialize(data))
         self.assertEqual(
             res['uuid'], 'abea9b06-43a1-4e84-ad75-fc0346a64497')
+
+    def test_serialize_aware_datetime(self):
+        d = datetime.datetime(
+            2016, 1, 1, 10, 32, 1, tzinfo=datetime.timezone.utc)
+
+        self.assertEqual(
+            json.deserialize(json.serialize([d])),
+            ['2016-01-01T10:32:01+00:00'])
+
+    def test_serialize_unknown_type(self):
+        with self.assertRaises(TypeError):
+            json.serialize({'value': object()})
+
+    def test_deserialize_bytes(self):
+        self.assertEqual(
+            json.deserialize('{"name": "été"}'.encode('utf-8')),
+            {'name': 'été'})
+
+    def test_deserialize_invalid(self):
+        with self.assertRaises(json.json.JSONDecodeError):
+            json.deserialize(b'{"name": ')
+
+    def test_json_backend_deserialize_bytes(self):
+        try:
+            json.set_backend('json')
+            self.assertEqual(
+                json.deserialize('{"name": "été"}'.encode('utf-8')),
+                {'name': 'été'})
+
+            with self.assertRaises(json.json.JSONDecodeError):
+                json.deserialize(b'{"name": "\xff"}')
+        finally:
+            json.set_backend('auto')
+
+    def test_set_backend(self):
+        try:
+            self.assertEqual(json.set_backend('json').name, 'json')
+            self.assertEqual(
+                json.serialize({'one': 1, 'two': [1, 2]}),
+                '{"one": 1, "two": [1, 2]}')
+
+            with self.assertRaises(ValueError):
+                json.set_backend('nope')
+        finally:
+            json.set_backend('auto')
@@ -0,0 +1,108 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+import falcon
+from falcon.testing import TestCase as BaseTestCase
+
+from frf import conf, db, middleware
+from frf.tests.test_model_viewsets import Dummy
+from frf.utils import queries
+
+
+class LoopResource(object):
+    def on_get(self, req, resp):
+        for i in range(5):
+            Dummy.query.filter(Dummy.name == str(i)).all()
+        Dummy.query.filter(Dummy.name.in_(['a', 'b'])).all()
+        Dummy.query.filter(Dummy.name.in_(['a', 'b', 'c'])).all()
+
+
+class TestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        db.init('sqlite://', echo=False)
+        Dummy.metadata.create_all(db.engine)
+
+    def tearDown(self):
+        conf.pop('QUERY_INSPECTION', None)
+        super().tearDown()
+
+    def test_shape(self):
+        self.assertEqual(
+            'SELECT a FROM t WHERE b IN (...) AND c = ?',
+            queries.shape('SELECT a\n  FROM t WHERE b IN (?, ?,?) AND c = ?'))
+        self.assertEqual(
+            'SELECT a FROM t WHERE b IN (...)',
+            queries.shape(
+                'SELECT a FROM t WHERE b IN (%(b_1)s, %(b_2)s)'))
+
+    def test_recorder(self):
+        with queries.QueryRecorder() as outer:
+            Dummy.query.count()
+            with queries.QueryRecorder() as inner:
+                Dummy.query.all()
+
+        Dummy.query.all()
+
+        self.assertEqual(2, outer.count)
+        self.assertEqual(1, inner.count)
+        self.assertIn('FROM dummy_table', inner.statements[0])
+        self.assertGreaterEqual(inner.queries[0].duration, 0)
+
+    def test_assert_num_queries(self):
+        with queries.assert_num_queries(1):
+            Dummy.query.all()
+
+        with self.assertRaises(AssertionError) as context:
+            with queries.assert_num_queries(1):
+                Dummy.query.all()
+                Dummy.query.count()
+
+        self.assertIn('2 queries executed, 1 expected', str(context.exception))
+        self.assertIn('2. SELECT count(', str(context.exception))
+
+    def setup_api(self, settings):
+        conf['QUERY_INSPECTION'] = settings
+        self.api = falcon.API(
+            middleware=[middleware.QueryInspectionMiddleware()])
+        self.api.add_route('/loop/', LoopResource())
+
+    def test_n_plus_one_warning(self):
+        self.setup_api({'enabled': True, 'threshold': 4})
+
+        with self.assertLogs('frf.middleware', 'WARNING') as logs:
+            self.simulate_get('/loop/')
+
+        self.assertEqual(1, len(logs.output))
+        self.assertIn('GET /loop executed 5 times', logs.output[0])
+
+        # the two IN queries have the same shape
+        self.setup_api({'enabled': True, 'threshold': 1})
+        with self.assertLogs('frf.middleware', 'WARNING') as logs:
+            self.simulate_get('/loop/')
+
+        self.assertEqual(2, len(logs.output))
+        self.assertIn('executed 2 times', logs.output[1])
+
+    def test_n_plus_one_disabled(self):
+        self.setup_api({'enabled': False, 'threshold': 1})
+
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('frf.middleware', 'WARNING'):
+                self.simulate_get('/loop/')
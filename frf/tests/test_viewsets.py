@@ -25,7 +25,8 @@ import falcon
 
 from falcon.testing import TestCase as BaseTestCase
 
-from frf import exceptions, filters, renderers, serializers, viewsets
+from frf import exceptions, filters, parsers, renderers, serializers
+from frf import viewsets
 from frf.tests.fake import faker
 
 ITEMS = []
@@ -270,3 +271,42 @@ class TestCase(BaseTestCase):
             query_string='auth_key=superpassword')
 
         self.assertEqual(res.status, falcon.HTTP_405)
+
+    def test_create_body_too_large(self):
+        self.viewset.max_body_size = 20
+
+        res = self.simulate_post(
+            '/dummies/',
+            body=json.dumps({'name': faker.name(), 'title': 'x' * 50}),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_413)
+        self.assertEqual(3, len(ITEMS))
+
+    def test_create_invalid_json(self):
+        res = self.simulate_post(
+            '/dummies/', body='{"name": ',
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_400)
+
+    def test_update_parsers_run_once(self):
+        calls = []
+
+        class CountingParser(parsers.BaseParser):
+            def parse(self, req, view, data):
+                calls.append(data)
+                return data
+
+        self.viewset.parsers = [CountingParser()]
+        self.viewset.body_read_size = 4
+
+        update_data = {'email': faker.email()}
+        res = self.simulate_patch(
+            '/dummies/{}/'.format(ITEMS[0].uuid),
+            body=json.dumps(update_data),
+            query_string='auth_key=superpassword')
+
+        self.assertEqual(res.status, falcon.HTTP_204)
+        self.assertEqual([update_data], calls)
+        self.assertEqual(ITEMS[0].email, update_data['email'])
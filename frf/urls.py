@@ -17,13 +17,22 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
+import collections
 import importlib
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 URL_REGISTRY = []
 
+#: A compiled route, see :func:`compile_routes`.
+Route = collections.namedtuple('Route', ('uri_template', 'resource'))
+
+RESPONDER_PREFIX = 'on_'
+
+_FIELD_RE = re.compile(r'{[^}]*}')
+
 
 class IncludeURLs(list):
     def get_list(self, base_url):
@@ -50,6 +59,11 @@ class IncludeError(Exception):
     pass
 
 
+class RouteError(Exception):
+    """Raised by :func:`compile_routes` for invalid or conflicting routes."""
+    pass
+
+
 def include(module, urlpatterns_name='urlpatterns'):
     """Include url patterns from a separate file.
 
@@ -83,9 +97,88 @@ def include(module, urlpatterns_name='urlpatterns'):
                         module))
                 return []
             return IncludeURLs(urlpatterns_attr)
-        except ImportError:
+        except ImportError as e:
             logger.warning(
                 'Could not load url module {}'.format(module))
-            raise IncludeError()
+            raise IncludeError(
+                'Could not load url module {}: {}'.format(module, e)) from e
     else:
         return IncludeURLs(module)
+
+
+def flatten_urls(url_list, urls=None):
+    """Return the ``(url, resource)`` pairs of nested url patterns."""
+    if urls is None:
+        urls = []
+
+    for url in url_list:
+        if isinstance(url, IncludeURLs):
+            flatten_urls(url, urls)
+        elif isinstance(url[1], IncludeURLs):
+            flatten_urls(url[1].get_list(base_url=url[0]), urls)
+        elif url:
+            urls.append(url)
+
+    return urls
+
+
+def _route_key(uri_template):
+    """Falcon ignores the slashes around templates, and field names."""
+    return _FIELD_RE.sub('{}', uri_template.strip('/'))
+
+
+def _describe(resource):
+    cls = type(resource)
+    return '{}.{}'.format(cls.__module__, cls.__name__)
+
+
+def compile_routes(url_list):
+    """Flatten, deduplicate and validate url patterns.
+
+    Patterns that add the same resource to the same route more than once
+    are only kept once.  Two resources on the same route, routes that only
+    differ by their field names, and resources without responders are
+    errors.  Falcon would use the last resource added, fail on the first
+    request, or fail without saying which routes conflict.
+
+    Args:
+        url_list (list): The url patterns, including :func:`include` calls.
+            ``URL_REGISTRY`` is appended.
+
+    Returns:
+        list: :class:`Route` tuples, in the order of the patterns.
+
+    Raises:
+        RouteError: Listing all the problems that were found.
+    """
+    routes = []
+    by_key = {}
+    errors = []
+
+    for uri_template, resource in flatten_urls(url_list) + URL_REGISTRY:
+        if not any(name.startswith(RESPONDER_PREFIX)
+                   for name in dir(resource)):
+            errors.append('{}: {} has no responders'.format(
+                uri_template, _describe(resource)))
+            continue
+
+        key = _route_key(uri_template)
+        existing = by_key.get(key)
+
+        if existing is None:
+            route = by_key[key] = Route(uri_template, resource)
+            routes.append(route)
+        elif existing.resource is not resource:
+            errors.append('{}: {} conflicts with {} ({})'.format(
+                uri_template, _describe(resource), existing.uri_template,
+                _describe(existing.resource)))
+        elif existing.uri_template.strip('/') != uri_template.strip('/'):
+            errors.append('{}: field names differ from {}'.format(
+                uri_template, existing.uri_template))
+        else:
+            logger.debug('Ignoring duplicate route {}'.format(uri_template))
+
+    if errors:
+        raise RouteError('Invalid routes:\n' + '\n'.join(errors))
+
+    return routes
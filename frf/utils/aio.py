@@ -0,0 +1,113 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""Asyncio helpers.
+
+``asyncio`` is imported when these are first called, so applications that
+are only served with WSGI don't spend time importing it.
+"""
+
+import contextlib
+import functools
+import inspect
+import threading
+
+
+_local = threading.local()
+
+
+async def maybe_await(value):
+    """Return ``value``, awaiting it first if it is awaitable.
+
+    Lets async code call hooks (authentication methods, permissions) that
+    may be written either as regular or as ``async`` methods.
+    """
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def run_in_executor(func, *args, executor=None, **kwargs):
+    """Run ``func(*args, **kwargs)`` in a thread, without blocking the loop.
+
+    Args:
+        executor (Executor): Defaults to the event loop's default executor.
+
+    Returns:
+        asyncio.Future: The result of ``func``.
+    """
+    return get_event_loop().run_in_executor(
+        executor, functools.partial(func, *args, **kwargs))
+
+
+def get_event_loop():
+    import asyncio
+    return asyncio.get_event_loop()
+
+
+def call_now(func, *args):
+    """Call ``func(*args)``, and return its result in a future."""
+    future = get_event_loop().create_future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def run_threadsafe(coro, loop):
+    """Run ``coro`` in ``loop``, from another thread, and wait for it."""
+    import asyncio
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+@contextlib.contextmanager
+def serving(loop):
+    """Make :func:`run` use ``loop`` in the current thread.
+
+    The ASGI entry point wraps the requests it runs in worker threads with
+    this, so ``async`` responders run on the server's event loop.
+    """
+    previous = getattr(_local, 'loop', None)
+    _local.loop = loop
+    try:
+        yield loop
+    finally:
+        _local.loop = previous
+
+
+def run(coro):
+    """Run ``coro`` from synchronous code, and return its result.
+
+    In a thread serving an ASGI request (see :func:`serving`), ``coro`` runs
+    on the server's event loop, and the thread waits for it.  Elsewhere, for
+    example when the app is served with WSGI, it runs on a new event loop.
+    """
+    loop = getattr(_local, 'loop', None)
+    if loop is not None:
+        return run_threadsafe(coro, loop)
+
+    import asyncio
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
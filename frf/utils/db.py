@@ -17,12 +17,16 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
-
+import base64
+import binascii
+import datetime
+import json
 from math import ceil
+import uuid
 
+import dateutil.parser
 import falcon
-
-from sqlalchemy import orm
+from sqlalchemy import and_, or_, orm
 from sqlalchemy.orm.exc import UnmappedClassError
 from sqlalchemy.sql import func
 
@@ -112,6 +116,161 @@ class Pagination(object):
                 last = num
 
 
+class KeysetPagination(object):
+    """Internal helper class returned by `BaseQuery.paginate_keyset`.
+
+    Cursors are opaque strings.  Pass one back to `paginate_keyset` to get the
+    page after (``next_cursor``) or before (``prev_cursor``) this one.
+    """
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None,
+                 total=None):
+        #: the items for the current page
+        self.items = items
+        #: the number of items to be displayed on a page.
+        self.per_page = per_page
+        #: cursor for the next page, or `None` if this is the last page
+        self.next_cursor = next_cursor
+        #: cursor for the previous page, or `None` if this is the first page
+        self.prev_cursor = prev_cursor
+        #: the total number of items matching the query, if it was requested
+        self.total = total
+
+    @property
+    def has_next(self):
+        """True if a next page exists."""
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        """True if a previous page exists."""
+        return self.prev_cursor is not None
+
+
+def _keyset_columns(mapper, ordering):
+    """Return ``(key, attribute, descending)`` for each ordering column.
+
+    The primary key columns are appended so that the ordering is unique.
+    """
+    columns = []
+    names = []
+
+    for name in ordering or []:
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        names.append(name)
+        columns.append((name, getattr(mapper.class_, name), descending))
+
+    for column in mapper.primary_key:
+        name = mapper.get_property_by_column(column).key
+        if name not in names:
+            columns.append((name, getattr(mapper.class_, name), False))
+
+    return columns
+
+
+def _encode_keyset_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_keyset_value(attribute, value):
+    if value is None:
+        return value
+
+    try:
+        python_type = attribute.property.columns[0].type.python_type
+    except NotImplementedError:
+        return value
+
+    if issubclass(python_type, datetime.datetime):
+        return dateutil.parser.parse(value)
+    if issubclass(python_type, datetime.date):
+        return dateutil.parser.parse(value).date()
+
+    return value
+
+
+def encode_cursor(columns, obj, backwards=False):
+    """Build an opaque cursor pointing at ``obj``."""
+    return _encode_values(
+        [getattr(obj, name) for name, attribute, descending in columns],
+        backwards)
+
+
+def _encode_values(values, backwards=False, inclusive=False):
+    data = {'k': [_encode_keyset_value(value) for value in values]}
+    if backwards:
+        data['b'] = 1
+    if inclusive:
+        data['i'] = 1
+
+    cursor = base64.urlsafe_b64encode(json.dumps(data).encode('utf-8'))
+    return cursor.decode('ascii').rstrip('=')
+
+
+def decode_cursor(columns, cursor):
+    """Decode a cursor built by `encode_cursor`.
+
+    Returns:
+        tuple: ``(backwards, inclusive, values)``.  ``inclusive`` is `True`
+            if the row at ``values`` is part of the page.
+
+    Raises:
+        ValueError: if the cursor is invalid.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(
+            base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        values = data['k']
+        backwards = bool(data.get('b'))
+        inclusive = bool(data.get('i'))
+    except (binascii.Error, UnicodeError, TypeError, KeyError,
+            AttributeError, ValueError):
+        raise ValueError('Invalid cursor.')
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor.')
+
+    try:
+        values = [
+            _decode_keyset_value(column[1], value)
+            for column, value in zip(columns, values)]
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('Invalid cursor.')
+
+    return backwards, inclusive, values
+
+
+def _keyset_filter(columns, values, backwards, inclusive=False):
+    """Match the rows that come after ``values`` in the keyset ordering.
+
+    With ``inclusive``, the row at ``values`` is matched too.
+    """
+    clauses = []
+
+    for i, (name, attribute, descending) in enumerate(columns):
+        if descending != backwards:
+            comparison = attribute < values[i]
+        else:
+            comparison = attribute > values[i]
+
+        equals = [columns[j][1] == values[j] for j in range(i)]
+        clauses.append(and_(*(equals + [comparison])))
+
+    if inclusive:
+        clauses.append(and_(*[
+            attribute == value
+            for (name, attribute, descending), value in zip(columns, values)
+        ]))
+
+    return or_(*clauses)
+
+
 class BaseQuery(orm.Query):
     """SQLAlchemy `sqlalchemy.orm.query.Query` subclass.
 
@@ -124,6 +283,15 @@ class BaseQuery(orm.Query):
         self.count_column = kwargs.pop('count_column', None)
         super().__init__(*args, **kwargs)
 
+    def __iter__(self):
+        # sessions that route reads to replicas retry failed reads on the
+        # primary, see ``frf.db.RoutingSession``
+        fallback = getattr(self.session, 'with_primary_fallback', None)
+        if fallback is None:
+            return super().__iter__()
+
+        return fallback(super().__iter__)
+
     def count(self):
         if not self.count_column:
             return super().count()
@@ -184,6 +352,91 @@ class BaseQuery(orm.Query):
 
         return Pagination(self, page, per_page, total, items)
 
+    def paginate_keyset(self, ordering=None, per_page=None, cursor=None,
+                        with_total=False):
+        """Return `per_page` items after (or before) `cursor`.
+
+        Unlike `paginate`, this doesn't use ``OFFSET``, so deep pages are as
+        cheap as the first one, and the total is only counted when
+        `with_total` is `True`.
+
+        Args:
+            ordering (list): Attribute names to order by.  Prefix a name with
+                ``-`` for descending order.  The primary key is always
+                appended, so the ordering is unique.  Ordering columns should
+                not be nullable.
+            per_page (int): The page size.  Defaults to 20.
+            cursor (str): A cursor from a previous `KeysetPagination`, or
+                `None` for the first page.
+            with_total (bool): Set to `True` to also count the total number
+                of matching rows.
+
+        Raises:
+            falcon.HTTPInvalidParam: If the cursor is invalid.
+
+        Returns:
+            KeysetPagination: The page.
+        """
+        if per_page is None:
+            per_page = 20
+
+        mapper = orm.class_mapper(self.column_descriptions[0]['entity'])
+        columns = _keyset_columns(mapper, ordering)
+
+        backwards = False
+        qs = self.order_by(None)
+
+        if cursor:
+            try:
+                backwards, inclusive, values = decode_cursor(columns, cursor)
+            except ValueError as e:
+                raise falcon.HTTPInvalidParam(str(e), 'cursor')
+            qs = qs.filter(
+                _keyset_filter(columns, values, backwards, inclusive))
+
+        qs = qs.order_by(*[
+            attribute.desc() if descending != backwards else attribute.asc()
+            for name, attribute, descending in columns])
+
+        items = qs.limit(per_page + 1).all()
+        has_more = len(items) > per_page
+        items = items[:per_page]
+
+        if backwards:
+            items.reverse()
+
+        # when paging backwards, the page we came from is always next, and
+        # when paging forwards, it's always previous.
+        if backwards:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(cursor)
+
+        next_cursor = prev_cursor = None
+
+        if items:
+            if has_next:
+                next_cursor = encode_cursor(columns, items[-1])
+            if has_prev:
+                prev_cursor = encode_cursor(
+                    columns, items[0], backwards=True)
+        elif cursor:
+            # an empty page (the rows after the cursor were deleted, or it
+            # was the last page) still leads back to the page it came from,
+            # including the row at the cursor
+            if backwards:
+                next_cursor = _encode_values(values, inclusive=True)
+            else:
+                prev_cursor = _encode_values(
+                    values, backwards=True, inclusive=True)
+
+        total = None
+        if with_total:
+            total = self.order_by(None).count()
+
+        return KeysetPagination(
+            items, per_page, next_cursor, prev_cursor, total)
+
 
 class _QueryProperty(object):
     def __init__(self, session):
@@ -18,65 +18,138 @@
 # above.
 
 import base64
+import collections
+import functools
 import hashlib
 import hmac
+import os
 
-from Crypto import Random
-from Crypto.Cipher import AES
+from frf.exceptions import InitializationError
+
+# imported by ``has_aead``, as ``cryptography`` is slow to import
+AESGCM = InvalidTag = None
+
+# imported by ``get_aes``, so importing the models doesn't import ``Crypto``
+AES = None
+
+#: AES block size, in bytes.
+BLOCK_SIZE = 16
+
+#: Prefix of :class:`AESGCMCipher` ciphertexts.  ``$`` is not in the base64
+#: alphabet, so they can't be mistaken for :class:`AESCipher` ciphertexts.
+GCM_PREFIX = b'$2$'
+
+#: Prefix of the key id :class:`KeyRing` adds to ciphertexts, as in
+#: ``$k:<key id>$<ciphertext>``.
+KEY_ID_PREFIX = b'$k:'
+
+_HMAC_DIGEST_SIZE = hashlib.sha512().digest_size
 
 
 class DecryptionError(Exception):
     pass
 
 
+def get_aes():
+    """Return the ``Crypto.Cipher.AES`` module, importing it on first use."""
+    global AES
+
+    if AES is None:
+        from Crypto.Cipher import AES
+
+    return AES
+
+
+def has_aead():
+    """Return ``True`` if ``cryptography``, needed for AES-GCM, is installed.
+    """
+    global AESGCM, InvalidTag
+
+    if AESGCM is None:
+        try:
+            from cryptography.exceptions import InvalidTag
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        except ImportError:
+            return False
+
+    return True
+
+
+@functools.lru_cache(maxsize=128)
+def derive_key(key):
+    """Return the 256 bit AES key for ``key`` (``str`` or ``bytes``).
+
+    Cached, so the ciphers don't hash the same key for every value.
+    """
+    if not isinstance(key, bytes):
+        key = key.encode()
+    return hashlib.sha256(key).digest()
+
+
+@functools.lru_cache(maxsize=128)
+def get_cipher(engine, key):
+    """Return a cipher of class ``engine`` for ``key``.
+
+    Ciphers are cached, and shared, so their key must never change.  They
+    are safe to use from several threads.
+    """
+    return engine(key=key)
+
+
 class AESCipher(object):
     """Simple AES Encryption.
 
+    The key is set when the cipher is created, and never changes, so a
+    cipher can be shared between threads (see :func:`get_cipher`).
+
     Credits: http://stackoverflow.com/questions/12524994/encrypt-decrypt-using-pycrypto-aes-256  # noqa
     """
     def __init__(self, key=None):
         if not key:
             # Get 32 bytes (256 bits) of data from /dev/urandom
-            key = Random.new().read(32)
-        if not isinstance(key, bytes):
-            key = key.encode()
-        self.bs = AES.block_size
-        self.key = hashlib.sha256(key).digest()
+            key = os.urandom(32)
+        self.bs = BLOCK_SIZE
+        self._set_key(key)
 
-    def _update_key(self, key):
-        if type(key) != bytes:
-            key = key.encode()
-        self.key = hashlib.sha256(key).digest()
+    def _set_key(self, key):
+        self._raw_key = key
+        self.key = derive_key(key)
+        # copied for each value, which is faster than keying a new HMAC
+        self._hmac = hmac.new(self.key, digestmod=hashlib.sha512)
+
+    def _digest(self, msg):
+        hmac_obj = self._hmac.copy()
+        hmac_obj.update(msg)
+        return hmac_obj.digest()
 
     def encrypt(self, raw):
         raw = self._pad(raw)
-        iv = Random.new().read(AES.block_size)
-        cipher = AES.new(self.key, AES.MODE_CBC, iv)
+        iv = os.urandom(BLOCK_SIZE)
+        aes = get_aes()
+        cipher = aes.new(self.key, aes.MODE_CBC, iv)
 
         ciphertext = cipher.encrypt(raw)
         cipher_msg = iv + ciphertext
-        hmac_obj = hmac.new(self.key, msg=cipher_msg, digestmod='sha512')
-        hmac_digest = hmac_obj.digest()
 
-        return base64.b64encode(cipher_msg + hmac_digest)
+        return base64.b64encode(cipher_msg + self._digest(cipher_msg))
 
     def decrypt(self, enc):
-        hmac_digest_size = hashlib.sha512().digest_size
         enc = base64.b64decode(enc)
 
         try:
-            iv = enc[:AES.block_size]
-            hmac_digest = enc[-hmac_digest_size:]
-            ciphertext = enc[AES.block_size:-hmac_digest_size]
+            iv = enc[:BLOCK_SIZE]
+            hmac_digest = enc[-_HMAC_DIGEST_SIZE:]
+            ciphertext = enc[BLOCK_SIZE:-_HMAC_DIGEST_SIZE]
         except IndexError:
             raise DecryptionError()
 
         # Verify the HMAC before decrypting
-        hmac_obj = hmac.new(self.key, msg=iv+ciphertext, digestmod='sha512')
-        if not hmac.compare_digest(hmac_digest, hmac_obj.digest()):
+        if not hmac.compare_digest(
+                hmac_digest, self._digest(iv + ciphertext)):
             raise DecryptionError('HMAC could not be verified')
 
-        cipher = AES.new(self.key, AES.MODE_CBC, iv)
+        aes = get_aes()
+        cipher = aes.new(self.key, aes.MODE_CBC, iv)
 
         try:
             data = self._unpad(
@@ -87,11 +160,11 @@ class AESCipher(object):
         return data
 
     def _pad(self, s):
-        pad_length = AES.block_size - (len(s) % AES.block_size)
+        pad_length = BLOCK_SIZE - (len(s) % BLOCK_SIZE)
 
         # Add pad even if it is a multiple already as per RFC 5652
         if pad_length == 0:
-            pad_length = AES.block_size
+            pad_length = BLOCK_SIZE
         pad = pad_length.to_bytes(1, 'big') * pad_length
 
         return s.encode() + pad
@@ -101,3 +174,158 @@ class AESCipher(object):
         # the last one.
         pad_length = s[-1]
         return s[:-pad_length]
+
+
+class AESGCMCipher(AESCipher):
+    """AES-256-GCM encryption.
+
+    Encrypts and authenticates in a single pass, and skips base64.  With
+    recent versions of ``cryptography`` it is faster than
+    :class:`AESCipher`, but older versions have a per call overhead that
+    outweighs this for short values, so benchmark before switching
+    (``manage.py benchmark "encryption.*"``).
+
+    Ciphertexts are ``GCM_PREFIX``, a 12 byte nonce, then the encrypted data
+    and its 16 byte tag.
+
+    Values encrypted by :class:`AESCipher` don't have the prefix, and are
+    still decrypted, so existing data keeps working after switching to this
+    cipher.
+
+    Requires the ``cryptography`` package (``pip install frf[Encryption]``).
+    """
+    nonce_size = 12
+
+    def __init__(self, key=None):
+        if not has_aead():
+            raise InitializationError(
+                'AESGCMCipher requires the "cryptography" package.')
+
+        super().__init__(key=key)
+
+    def _set_key(self, key):
+        super()._set_key(key)
+        self._aead = AESGCM(self.key)
+
+    def encrypt(self, raw):
+        nonce = os.urandom(self.nonce_size)
+        return GCM_PREFIX + nonce + self._aead.encrypt(
+            nonce, raw.encode(), None)
+
+    def decrypt(self, enc):
+        if isinstance(enc, memoryview):
+            enc = enc.tobytes()
+        elif isinstance(enc, str):
+            enc = enc.encode()
+
+        if not enc.startswith(GCM_PREFIX):
+            return super().decrypt(enc)
+
+        start = len(GCM_PREFIX)
+        nonce = enc[start:start + self.nonce_size]
+
+        try:
+            return self._aead.decrypt(
+                nonce, enc[start + self.nonce_size:], None).decode('utf-8')
+        except (InvalidTag, ValueError):
+            # ``ValueError`` is raised for truncated values, and by
+            # ``decode``
+            raise DecryptionError('AES-GCM tag could not be verified')
+
+
+class KeyRing(object):
+    """Encryption keys, by id, so keys can be rotated.
+
+    Values are encrypted with the current key, and tagged with its id.
+    Tagged values are decrypted with the key they were encrypted with.
+    Untagged values, encrypted before using a key ring, are tried with each
+    key, current key first.
+
+    To rotate, add the new key first, re-encrypt the data (see ``manage.py
+    reencrypt``), then remove the old key:
+
+    .. code-block:: python
+
+        keys = KeyRing([('2', 'newkey'), ('1', 'oldkey')])
+
+    The ``engine`` passed to :meth:`encrypt` and :meth:`decrypt` is the
+    cipher class.  Each key gets its own cipher (see :func:`get_cipher`), so
+    a key ring can be used from several threads.
+
+    Args:
+        keys (list): ``(key_id, key)`` pairs, current key first.  Key ids
+            are strings without ``$``.
+    """
+    def __init__(self, keys):
+        self.keys = collections.OrderedDict(keys)
+
+        if not self.keys:
+            raise ValueError('A key ring needs at least one key.')
+
+        self._tags = {}
+        for key_id in self.keys:
+            if not isinstance(key_id, str) or '$' in key_id:
+                raise ValueError('Invalid key id: {!r}'.format(key_id))
+            self._tags[key_id] = KEY_ID_PREFIX + key_id.encode() + b'$'
+
+        self.current_id = next(iter(self.keys))
+        self.current = self.keys[self.current_id]
+
+    @property
+    def rotating(self):
+        """``True`` if there are keys other than the current one."""
+        return len(self.keys) > 1
+
+    def split(self, enc):
+        """Return the key id ``enc`` is tagged with, and the ciphertext.
+
+        The key id is ``None`` for untagged values.
+        """
+        if isinstance(enc, memoryview):
+            enc = enc.tobytes()
+        elif isinstance(enc, str):
+            enc = enc.encode()
+
+        if not enc.startswith(KEY_ID_PREFIX):
+            return None, enc
+
+        end = enc.find(b'$', len(KEY_ID_PREFIX))
+        if end == -1:
+            raise DecryptionError('Invalid key id tag')
+
+        return enc[len(KEY_ID_PREFIX):end].decode(), enc[end + 1:]
+
+    def is_current(self, enc):
+        """Return ``True`` if ``enc`` was encrypted with the current key."""
+        return self.split(enc)[0] == self.current_id
+
+    def encrypt(self, engine, raw):
+        """Encrypt ``raw`` with the current key, using the ``engine`` cipher.
+        """
+        cipher = get_cipher(engine, self.current)
+        return self._tags[self.current_id] + cipher.encrypt(raw)
+
+    def decrypt(self, engine, enc):
+        """Decrypt ``enc`` using the ``engine`` cipher.
+
+        Raises:
+            DecryptionError: If the key it was encrypted with is not in the
+                ring, or none of the keys can decrypt an untagged value.
+        """
+        key_id, enc = self.split(enc)
+
+        if key_id is not None:
+            try:
+                key = self.keys[key_id]
+            except KeyError:
+                raise DecryptionError('Unknown key id: {}'.format(key_id))
+
+            return get_cipher(engine, key).decrypt(enc)
+
+        for key in self.keys.values():
+            try:
+                return get_cipher(engine, key).decrypt(enc)
+            except DecryptionError:
+                pass
+
+        raise DecryptionError('None of the keys could decrypt the value')
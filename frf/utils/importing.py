@@ -17,8 +17,11 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
+import collections
 import importlib
 import inspect
+import sys
+import time
 
 
 def import_class(cl):
@@ -36,3 +39,111 @@ def import_class(cl):
         raise ImportError('{} does not refer to a class.'.format(cl))
 
     return attr
+
+
+class _TimedLoader(object):
+    """Wraps a loader to time the execution of the module."""
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(module.__name__)
+
+
+class ImportProfiler(object):
+    """Times the modules imported while it is active.
+
+    Use as a context manager, or with :meth:`start` and :meth:`stop`:
+
+    >>> with ImportProfiler() as profiler:
+    ...     import somemodule
+    >>> print(profiler.format())
+
+    Attributes:
+        modules (OrderedDict): ``(self, cumulative)`` seconds spent executing
+            each module, in import order.  ``self`` excludes the modules it
+            imported.
+    """
+    def __init__(self):
+        self.modules = collections.OrderedDict()
+        self._stack = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def start(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+
+    def _enter(self):
+        # time spent in the modules it imports is added to the last item
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        start, children = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        self.modules[name] = (cumulative - children, cumulative)
+
+        if self._stack:
+            self._stack[-1][1] += cumulative
+
+    @property
+    def total(self):
+        """Seconds spent importing, excluding nested imports twice."""
+        return sum(own for own, cumulative in self.modules.values())
+
+    def slowest(self, limit=None):
+        """Return ``(module, self, cumulative)`` tuples, slowest first."""
+        modules = sorted(
+            ((name, own, cumulative)
+             for name, (own, cumulative) in self.modules.items()),
+            key=lambda item: item[2], reverse=True)
+        return modules[:limit]
+
+    def format(self, limit=30):
+        """Format the ``limit`` slowest imports as a table, in milliseconds.
+        """
+        import tabulate
+
+        return tabulate.tabulate(
+            [(name, '{:.1f}'.format(own * 1000),
+              '{:.1f}'.format(cumulative * 1000))
+             for name, own, cumulative in self.slowest(limit)],
+            headers=('module', 'self (ms)', 'cumulative (ms)'))
@@ -17,29 +17,222 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
+"""JSON encoding and decoding.
+
+Everything FRF encodes or decodes (responses, request bodies, errors,
+``JSONField`` values) goes through :func:`serialize` and :func:`deserialize`.
+The library that does the work is picked with the ``JSON_BACKEND`` setting:
+
+* ``'auto'`` (the default): the first of ``orjson``, ``rapidjson`` and
+  ``ujson`` that is installed, or the standard library.
+* ``'orjson'``, ``'rapidjson'``, ``'ujson'`` (5.4 or newer) or ``'json'``
+  for the standard library.
+
+``uuid.UUID`` and ``datetime.datetime`` values are encoded as strings by all
+of them.  :func:`deserialize` accepts ``bytes`` as well as ``str``.
+"""
+
 import datetime
 import functools
+from gettext import gettext as _
 import json
 import uuid
 
+from frf import conf
+
 CONVERSION_MAP = {
     uuid.UUID: lambda x: str(x),
     datetime.datetime: lambda x: x.isoformat(),
 }
 
+AUTO_BACKENDS = ('orjson', 'rapidjson', 'ujson')
 
-class EnderJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        for type_, converter in CONVERSION_MAP.items():
+_backend = None
+
+
+def _default(obj):
+    converter = CONVERSION_MAP.get(type(obj))
+
+    if converter is None:
+        # subclasses, like ``pytz`` aware datetimes.
+        for type_, type_converter in CONVERSION_MAP.items():
             if isinstance(obj, type_):
-                return converter(obj)
+                converter = type_converter
+                break
+        else:
+            raise TypeError(
+                '{!r} is not JSON serializable'.format(obj))
 
-        return super().default(obj)
+    return converter(obj)
+
+
+class EnderJSONEncoder(json.JSONEncoder):
+    def default(self, obj):
+        try:
+            return _default(obj)
+        except TypeError:
+            return super().default(obj)
 
 
 class EnderJSONDecoder(json.JSONDecoder):
     pass
 
 
-serialize = functools.partial(json.dumps, cls=EnderJSONEncoder)
-deserialize = functools.partial(json.loads, cls=EnderJSONDecoder)
+class JSONBackend(object):
+    """A JSON library.
+
+    Args:
+        name (str): The name of the library.
+        dumps (callable): Encodes an object to a ``str``.
+        loads (callable): Decodes a ``str`` or ``bytes``.  Errors must be
+            raised as ``json.JSONDecodeError``.
+        separators (tuple): The ``(item_separator, key_separator)`` that
+            ``dumps`` uses, so JSON that is put together by hand (when
+            streaming) looks the same.
+    """
+    def __init__(self, name, dumps, loads, separators=(',', ':')):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self.separators = separators
+
+
+def _reraise_decode_errors(loads, error_cls):
+    def wrapper(data):
+        try:
+            return loads(data)
+        except error_cls as e:
+            raise json.JSONDecodeError(str(e), '', 0) from e
+    return wrapper
+
+
+def _json_backend():
+    encoder = EnderJSONEncoder()
+    decoder = EnderJSONDecoder()
+
+    def loads(data):
+        # ``json.loads`` only accepts ``bytes`` from Python 3.6
+        if isinstance(data, (bytes, bytearray)):
+            try:
+                data = data.decode('utf-8')
+            except UnicodeDecodeError as e:
+                raise json.JSONDecodeError(str(e), '', 0) from e
+        return decoder.decode(data)
+
+    return JSONBackend(
+        'json', encoder.encode, loads, separators=(', ', ': '))
+
+
+def _orjson_backend():
+    import orjson
+
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default, option=option).decode(
+            'utf-8')
+
+    # ``orjson.JSONDecodeError`` is a ``json.JSONDecodeError`` already.
+    return JSONBackend('orjson', dumps, orjson.loads)
+
+
+def _rapidjson_backend():
+    import rapidjson
+
+    return JSONBackend(
+        'rapidjson',
+        functools.partial(
+            rapidjson.dumps, default=_default,
+            mapping_mode=rapidjson.MM_COERCE_KEYS_TO_STRINGS),
+        _reraise_decode_errors(rapidjson.loads, ValueError))
+
+
+def _ujson_backend():
+    import ujson
+
+    try:
+        ujson.dumps(None, default=_default)
+    except TypeError:
+        raise ImportError(_('The ujson backend needs ujson 5.4 or newer.'))
+
+    return JSONBackend(
+        'ujson',
+        functools.partial(
+            ujson.dumps, default=_default, escape_forward_slashes=False),
+        _reraise_decode_errors(ujson.loads, ValueError))
+
+
+BACKENDS = {
+    'json': _json_backend,
+    'orjson': _orjson_backend,
+    'rapidjson': _rapidjson_backend,
+    'ujson': _ujson_backend,
+}
+
+
+def set_backend(name='auto'):
+    """Select the JSON library.
+
+    Called by :func:`frf.app.init` with the ``JSON_BACKEND`` setting.
+
+    Args:
+        name (str): ``'auto'``, or one of the keys of ``BACKENDS``.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the backend's library isn't installed.
+
+    Returns:
+        :class:`JSONBackend`: The selected backend.
+    """
+    global _backend
+
+    if name == 'auto':
+        for candidate in AUTO_BACKENDS:
+            try:
+                _backend = BACKENDS[candidate]()
+            except ImportError:
+                continue
+            return _backend
+
+        name = 'json'
+
+    if name not in BACKENDS:
+        raise ValueError(
+            _('Unknown JSON backend: {name}').format(name=name))
+
+    _backend = BACKENDS[name]()
+    return _backend
+
+
+def get_backend():
+    """Return the current :class:`JSONBackend`."""
+    if _backend is None:
+        return set_backend(conf.get('JSON_BACKEND', 'auto'))
+    return _backend
+
+
+def serialize(obj, **kwargs):
+    """Encode ``obj`` to a JSON ``str``.
+
+    If any keyword arguments (like ``indent``) are passed, the standard
+    library is used, with the same conversions.
+    """
+    if kwargs:
+        return json.dumps(obj, cls=EnderJSONEncoder, **kwargs)
+
+    return (_backend or get_backend()).dumps(obj)
+
+
+def deserialize(data, **kwargs):
+    """Decode JSON from a ``str`` or ``bytes``.
+
+    If any keyword arguments are passed, the standard library is used.
+
+    Raises:
+        json.JSONDecodeError: If ``data`` isn't valid JSON.
+    """
+    if kwargs:
+        return json.loads(data, cls=EnderJSONDecoder, **kwargs)
+
+    return (_backend or get_backend()).loads(data)
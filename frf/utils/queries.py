@@ -0,0 +1,185 @@
+# Copyright 2016 by Teem, and other contributors,
+# as noted in the individual source code files.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# By contributing to this project, you agree to also license your source
+# code under the terms of the Apache License, Version 2.0, as described
+# above.
+
+"""SQL query inspection.
+
+Observers registered with :func:`observe` are told about every SQL statement
+executed by any engine in the current thread.  This is used by
+:class:`QueryRecorder`, :func:`assert_num_queries`, the N+1 detector (see
+:class:`frf.middleware.QueryInspectionMiddleware`) and :mod:`frf.profiling`.
+
+>>> from frf.utils.queries import assert_num_queries
+>>> with assert_num_queries(1):
+...     models.Book.query.all()
+"""
+
+import collections
+import contextlib
+import re
+import threading
+import time
+
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+Query = collections.namedtuple(
+    'Query', ('statement', 'parameters', 'duration', 'executemany'))
+
+_local = threading.local()
+_listening = False
+
+_START_KEY = '_frf_query_start'
+
+# a parenthesized list of two or more bind parameters, as in ``IN (?, ?)``
+_PARAM = r'\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*'
+_PARAM_LIST_RE = re.compile(r'\({p}(?:,{p})+\)'.format(p=_PARAM))
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def shape(statement):
+    """Return the shape of a statement.
+
+    Statements that only differ by whitespace, or by how many values are
+    in a list of bind parameters (like ``IN (?, ?, ?)``), have the same
+    shape.
+    """
+    statement = _WHITESPACE_RE.sub(' ', statement).strip()
+    return _PARAM_LIST_RE.sub('(...)', statement)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    if getattr(_local, 'observers', None):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    observers = getattr(_local, 'observers', None)
+    if not observers:
+        return
+
+    starts = conn.info.get(_START_KEY)
+    duration = time.perf_counter() - starts.pop() if starts else 0.0
+
+    query = Query(statement, parameters, duration, executemany)
+    for observer in observers:
+        observer.record(query)
+
+
+def listen():
+    """Register the SQLAlchemy event listeners, once, for all engines."""
+    global _listening
+
+    if _listening:
+        return
+
+    sqlalchemy.event.listen(
+        Engine, 'before_cursor_execute', _before_cursor_execute)
+    sqlalchemy.event.listen(
+        Engine, 'after_cursor_execute', _after_cursor_execute)
+    _listening = True
+
+
+def observe(observer):
+    """Send the queries of the current thread to ``observer.record(query)``.
+
+    ``query`` is a :class:`Query` with the ``statement``, its
+    ``parameters``, the ``duration`` in seconds and ``executemany``.
+    """
+    listen()
+    _local.observers = getattr(_local, 'observers', ()) + (observer, )
+
+
+def unobserve(observer):
+    """Stop sending queries to ``observer``."""
+    _local.observers = tuple(
+        o for o in getattr(_local, 'observers', ()) if o is not observer)
+
+
+class QueryRecorder(object):
+    """Records the queries executed in the current thread.
+
+    Use as a context manager:
+
+    >>> with QueryRecorder() as recorder:
+    ...     models.Book.query.all()
+    >>> recorder.count
+    1
+
+    Attributes:
+        queries (list): The recorded :class:`Query` tuples.
+    """
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        observe(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        unobserve(self)
+        return False
+
+    def record(self, query):
+        self.queries.append(query)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def statements(self):
+        return [query.statement for query in self.queries]
+
+    def shapes(self):
+        """Return a ``Counter`` of the :func:`shape` of each statement."""
+        return collections.Counter(
+            shape(query.statement) for query in self.queries)
+
+    def repeated(self, threshold):
+        """Return the shapes executed more than ``threshold`` times.
+
+        Returns:
+            list: ``(shape, count)`` tuples, most repeated first.
+        """
+        return [(statement, count)
+                for statement, count in self.shapes().most_common()
+                if count > threshold]
+
+
+@contextlib.contextmanager
+def assert_num_queries(num):
+    """Assert that exactly ``num`` queries are executed in the block.
+
+    Yields the :class:`QueryRecorder`.
+
+    Raises:
+        AssertionError: If another number of queries was executed.  The
+            message lists the statements.
+    """
+    with QueryRecorder() as recorder:
+        yield recorder
+
+    if recorder.count != num:
+        raise AssertionError(
+            '{} queries executed, {} expected:\n{}'.format(
+                recorder.count, num, '\n'.join(
+                    '{}. {}'.format(i, statement)
+                    for i, statement in enumerate(recorder.statements, 1))))
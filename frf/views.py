@@ -21,6 +21,8 @@ from gettext import gettext as _
 
 import falcon
 
+from frf.utils import aio
+
 
 class View(object):
     """Simple View object.
@@ -148,3 +150,96 @@ class View(object):
 
     def on_delete(self, req, resp, **kwargs):
         self.dispatch('delete', req, resp, **kwargs)
+
+
+class AsyncViewMixin(object):
+    """``async`` authentication and permission checks.
+
+    Authentication methods and permissions may implement ``authenticate``
+    and ``has_permission`` either as regular or as ``async`` methods.
+    """
+    async def authenticate(self, method, req, resp, **kwargs):
+        """``async`` version of :meth:`View.authenticate`."""
+        user = None
+        auth_methods = self.get_authentication(req, **kwargs)
+
+        if auth_methods:
+            for auth_method in auth_methods:
+                user = await aio.maybe_await(
+                    auth_method.authenticate(req, self))
+                if user:
+                    break
+            if not user:
+                raise falcon.HTTPUnauthorized(
+                    title=_('Not Authorized'),
+                    description=_('Not Authorized'),
+                    challenges=[str(m) for m in auth_methods])
+            else:
+                req.context['user'] = user
+        else:
+            req.context['user'] = None
+
+    async def check_permissions(self, req, **kwargs):
+        """``async`` version of :meth:`View.check_permissions`."""
+        permissions = self.get_permissions(req, **kwargs)
+        if permissions:
+            for permission in permissions:
+                allowed = await aio.maybe_await(
+                    permission.has_permission(req, self, **kwargs))
+                if not allowed:
+                    raise falcon.HTTPForbidden(
+                        title=_('Forbidden'),
+                        description=_(
+                            'You do not have permission to access '
+                            'this resource.'))
+
+
+class AsyncView(AsyncViewMixin, View):
+    """View with ``async`` handlers.
+
+    The responders run :meth:`dispatch` with :func:`frf.utils.aio.run`, on
+    the server's event loop when the app is run with the ASGI entry point
+    (see :mod:`frf.asgi`).  Handlers should not block: use
+    :func:`frf.db.run_sync` for database access, and the ``async`` functions
+    of :mod:`frf.cache`.
+
+    Example:
+
+    .. code-block:: python
+
+       from frf import cache, views
+
+
+       class CountView(views.AsyncView):
+           allowed_methods = ('post', )
+
+           async def post(self, req, resp, **kwargs):
+               count = await cache.aincr('count')
+               resp.body = '{{"count": {}}}'.format(count)
+    """
+    async def dispatch(self, method, req, resp, **kwargs):
+        """``async`` version of :meth:`View.dispatch`."""
+        if method not in self.get_allowed_methods(req, **kwargs):
+            raise falcon.HTTPMethodNotAllowed(
+                allowed_methods=self.allowed_methods)
+
+        await self.authenticate(method, req, resp, **kwargs)
+        await self.check_permissions(req, **kwargs)
+
+        await getattr(self, method)(req, resp, **kwargs)
+        resp.content_type = 'application/json'
+
+    def on_get(self, req, resp, **kwargs):
+        aio.run(self.dispatch('get', req, resp, **kwargs))
+
+    def on_put(self, req, resp, **kwargs):
+        aio.run(self.dispatch('put', req, resp, **kwargs))
+
+    def on_patch(self, req, resp, **kwargs):
+        aio.run(self.dispatch('patch', req, resp, **kwargs))
+
+    def on_post(self, req, resp, **kwargs):
+        aio.run(self.dispatch('post', req, resp, **kwargs))
+
+    def on_delete(self, req, resp, **kwargs):
+        aio.run(self.dispatch('delete', req, resp, **kwargs))
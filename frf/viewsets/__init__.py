@@ -18,14 +18,95 @@
 # above.
 
 from gettext import gettext as _
+import hashlib
+import inspect
 import json
+import uuid
 
 import falcon
-
-from frf import views
+import pytz
+import sqlalchemy
+from sqlalchemy.orm import joinedload, load_only, subqueryload
+
+from frf import cache, conf, db, exceptions, profiling, serializers, views
+from frf.utils import aio
+from frf.utils.json import (
+    deserialize, get_backend as get_json_backend, serialize)
 from frf.viewsets import mixins
 
 
+def _strip_etag(etag):
+    etag = etag.strip()
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    return etag
+
+
+def _to_http_dt(dt):
+    """Convert ``dt`` to a naive UTC datetime, truncated to the second."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(pytz.utc).replace(tzinfo=None)
+    return dt.replace(microsecond=0)
+
+
+_EAGER_LOADERS = {
+    'joinedload': joinedload,
+    'subqueryload': subqueryload,
+}
+
+
+def _eager_load_paths(model, serializer, prefix='', seen=None):
+    """Find the relationships a serializer's fields will load.
+
+    Yields ``(path, strategy)`` tuples, with ``joinedload`` for many-to-one
+    relationships and ``subqueryload`` for collections.  Nested model
+    serializers are followed.
+    """
+    if seen is None:
+        seen = set()
+
+    if id(serializer) in seen:
+        return
+    seen.add(id(serializer))
+
+    relationships = sqlalchemy.inspect(model).relationships
+
+    for field in serializer.fields.values():
+        if not isinstance(field, (serializers.SerializerField,
+                                  serializers.PrimaryKeyRelatedField)):
+            continue
+
+        if field.source not in relationships:
+            continue
+
+        relationship = relationships[field.source]
+        path = prefix + field.source
+
+        yield path, 'subqueryload' if relationship.uselist else 'joinedload'
+
+        if isinstance(field, serializers.SerializerField) and \
+                isinstance(field.serializer, serializers.ModelSerializer):
+            yield from _eager_load_paths(
+                relationship.mapper.class_, field.serializer,
+                prefix=path + '.', seen=seen)
+
+
+def _stream_json_list(chunks):
+    """Encode lists of objects as one JSON list, piece by piece.
+
+    The output is the same as ``serialize`` on the combined list.
+    """
+    item_separator = get_json_backend().separators[0]
+
+    yield '['
+    separator = ''
+    for chunk in chunks:
+        if chunk:
+            yield separator + serialize(chunk)[1:-1]
+            separator = item_separator
+    yield ']'
+
+
 class BasicViewSet(views.View):
     """Base ViewSet.
 
@@ -46,6 +127,56 @@ class BasicViewSet(views.View):
 
     paginate = None
 
+    #: Set to a list or tuple of 2 integers (default and maximum page size)
+    #: to use cursor (keyset) pagination instead of ``paginate``.
+    cursor_paginate = None
+    #: Attribute names to order by for cursor pagination.  Prefix a name with
+    #: ``-`` for descending order.  The primary key is always appended.
+    cursor_ordering = None
+
+    #: Actions that also accept a list of items: ``'create'`` (POST a list),
+    #: ``'update'`` (PATCH a list to the list url, each item containing the
+    #: ``obj_lookup_kwarg`` key), and ``'destroy'`` (DELETE to the list url
+    #: with a list of ids).  Only supported by model viewsets.
+    bulk_actions = ()
+    #: Maximum number of items in a bulk request.
+    bulk_max_items = 1000
+
+    #: Set to ``True`` to stream unpaginated ``list`` responses.  See
+    #: :meth:`is_streamed`.
+    stream_list = False
+    #: Number of objects to load and serialize at a time when streaming.
+    stream_chunk_size = 500
+
+    #: Set to ``True`` to store rendered ``list`` and ``retrieve`` responses
+    #: in the cache (see :mod:`frf.cache`).  See :meth:`is_cached`.
+    cache_responses = False
+    #: Expiration of cached responses, in seconds.  ``None`` uses the cache
+    #: engine's default timeout.
+    cache_timeout = None
+    #: Cached responses are invalidated per prefix.  Viewsets that share a
+    #: prefix invalidate each other's responses.  Defaults to the class name,
+    #: or the table name for model viewsets.
+    cache_prefix = None
+    #: Query string parameters that are part of the cache key.  ``None``
+    #: means all of them.
+    cache_params = None
+
+    #: Set to ``True`` to let clients choose the fields of ``list`` and
+    #: ``retrieve`` responses.  See :meth:`get_response_serializer`.
+    sparse_fields = False
+
+    #: Set to ``True`` to send ``ETag`` (and, where possible,
+    #: ``Last-Modified``) headers with ``list`` and ``retrieve`` responses,
+    #: and answer ``If-None-Match``/``If-Modified-Since`` with a ``304``.
+    #: See :meth:`get_validators`.
+    conditional_get = False
+
+    #: ``list`` and ``retrieve`` read from a replica database, when replicas
+    #: are configured (see :func:`frf.db.replica`).  Set to ``False`` for
+    #: viewsets that must read their data from the primary.
+    use_replica = True
+
     method_map = {
         'list': 'GET',
         'retrieve': 'GET',
@@ -62,8 +193,22 @@ class BasicViewSet(views.View):
         'delete': 'destroy',
     }
 
+    #: The action for each ``(HTTP method, lookup kwarg passed)``, set by
+    #: :meth:`bind_actions`.
+    bound_actions = {}
+    _bound_handlers = {}
+
+    #: Maximum size of request bodies, in bytes.  ``None`` uses the
+    #: ``MAX_BODY_SIZE`` setting, which defaults to 10MB.
+    max_body_size = None
+    #: Size of the pieces request bodies are read in.
+    body_read_size = 64 * 1024
+
     PAGINATOR_CONTEXT_KEY = '_frf_paginator'
     META_CONTEXT_KEY = '_frf_meta'
+    BODY_CONTEXT_KEY = '_frf_body'
+    DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024
+    CACHE_KEY_PREFIX = 'frf:views'
 
     def get_allowed_methods(self, req, **kwargs):
         """List of allowed methods, such as GET, POST, etc."""
@@ -82,7 +227,68 @@ class BasicViewSet(views.View):
         return self.allowed_actions
 
     def dispatch(self, method, req, resp, **kwargs):
-        self.authenticate(method, req, resp, **kwargs)
+        with profiling.phase(req, 'authenticate'):
+            self.authenticate(method, req, resp, **kwargs)
+
+        action = self.bound_actions.get(
+            (method, self.obj_lookup_kwarg in kwargs))
+        bound = action is not None
+
+        if not bound:
+            action = self.check_action(method, req, **kwargs)
+
+        with profiling.phase(req, 'check_permissions'):
+            self.check_permissions(req, **kwargs)
+
+        if not bound:
+            action = self.get_action(action, req, **kwargs)
+
+        self.perform_action(method, action, req, resp, **kwargs)
+
+    def bind_actions(self):
+        """Resolve the action and handler of each HTTP method in advance.
+
+        Called by :func:`frf.app.init` for the viewsets in the url patterns,
+        so requests skip :meth:`check_action` and :meth:`get_action`.  Call
+        it again after changing ``allowed_actions`` or ``bulk_actions`` of a
+        bound viewset.  Viewsets that override ``check_action`` or
+        ``get_action`` aren't bound, as their actions may depend on the
+        request.
+
+        Returns:
+            dict: :attr:`bound_actions`.
+        """
+        cls = type(self)
+        if cls.check_action is not BasicViewSet.check_action or \
+                cls.get_action is not BasicViewSet.get_action:
+            return self.bound_actions
+
+        actions = {}
+        handlers = {}
+
+        for method, mapped_method in self.reverse_method_map.items():
+            if mapped_method not in self.allowed_actions:
+                continue
+
+            for lookup in (False, True):
+                action = self.resolve_action(mapped_method, lookup)
+                handler = getattr(self, action, None)
+                if handler is not None:
+                    actions[method, lookup] = action
+                    handlers[action] = handler
+
+        self.bound_actions = actions
+        self._bound_handlers = handlers
+        return actions
+
+    def check_action(self, method, req, **kwargs):
+        """Return the action for ``method``, if it is allowed.
+
+        Raises:
+            falcon.HTTPMethodNotAllowed: If the action isn't allowed.
+            falcon.HTTPBadRequest: If the action needs a lookup kwarg, and
+                it wasn't passed.
+        """
         mapped_method = self.reverse_method_map[method]
         assert mapped_method in (
             'list', 'retrieve', 'update', 'create', 'destroy')
@@ -100,21 +306,87 @@ class BasicViewSet(views.View):
                         '{obj_lookup_kwarg} not passed for lookup').format(
                         obj_lookup_kwarg=self.obj_lookup_kwarg))
 
-        self.check_permissions(req, **kwargs)
+        return mapped_method
+
+    def resolve_action(self, mapped_method, lookup):
+        """Return the name of the method that handles ``mapped_method``.
+
+        ``list`` becomes ``retrieve`` when a lookup kwarg is passed
+        (``lookup``), and ``update`` and ``destroy`` become their bulk
+        versions when it isn't.
+        """
+        if mapped_method == 'list' and lookup:
+            return 'retrieve'
+
+        if mapped_method in ('update', 'destroy') and \
+                mapped_method in self.bulk_actions and not lookup:
+            return 'bulk_' + mapped_method
+
+        return mapped_method
+
+    def get_action(self, mapped_method, req, **kwargs):
+        """Return the name of the method that handles the request.
+
+        See :meth:`resolve_action`.
 
-        if mapped_method == 'list' and self.obj_lookup_kwarg in kwargs:
-            mapped_method = 'retrieve'
+        Raises:
+            falcon.HTTPBadRequest: If there is no such method.
+        """
+        mapped_method = self.resolve_action(
+            mapped_method, self.obj_lookup_kwarg in kwargs)
 
         if not hasattr(self, mapped_method):
-            raise falcon.HttpBadReqeust(
+            raise falcon.HTTPBadRequest(
                 title=_('Operation not supported'),
                 description=_(
                     'The operation {operation} is not supported '
                     'at this endpoint.').format(operation=mapped_method))
 
-        getattr(self, mapped_method)(req, resp, **kwargs)
+        return mapped_method
+
+    def perform_action(self, method, mapped_method, req, resp, **kwargs):
+        """Run the action, and render its response.
 
-        resp.body = self.render(method, req, resp, resp.body, **kwargs)
+        Takes care of conditional GET, response caching and replica
+        routing for ``list`` and ``retrieve``.
+        """
+        is_read = mapped_method in ('list', 'retrieve')
+
+        with db.replica(is_read and self.use_replica):
+            validators = None
+            if is_read and self.conditional_get:
+                validators = self.get_validators(req, **kwargs)
+                if validators is not None:
+                    etag, last_modified = validators
+                    if self.check_not_modified(
+                            req, resp, etag, last_modified, **kwargs):
+                        return
+
+            cache_key = None
+            if is_read and self.is_cached(req, **kwargs):
+                cache_key = self.get_cache_key(req, **kwargs)
+                body = cache.get(cache_key)
+
+                if body is not None:
+                    resp.body = body
+                    if self.conditional_get and validators is None:
+                        self.check_body_not_modified(req, resp, **kwargs)
+                    return
+
+            handler = self._bound_handlers.get(mapped_method)
+            if handler is None:
+                handler = getattr(self, mapped_method)
+            handler(req, resp, **kwargs)
+
+            if resp.stream is None:
+                resp.body = self.render(method, req, resp, resp.body, **kwargs)
+
+                if resp.status == falcon.HTTP_200:
+                    if cache_key is not None:
+                        cache.set(cache_key, resp.body, self.cache_timeout)
+
+                    if is_read and self.conditional_get and validators is None:
+                        self.check_body_not_modified(req, resp, **kwargs)
 
     def get_qs(self, req, **kwargs):
         raise NotImplementedError()
@@ -159,6 +431,92 @@ class BasicViewSet(views.View):
         """
         return self.parsers
 
+    def get_max_body_size(self, req, **kwargs):
+        """Return the maximum request body size in bytes, or ``None``."""
+        if self.max_body_size is not None:
+            return self.max_body_size
+
+        return conf.get('MAX_BODY_SIZE', self.DEFAULT_MAX_BODY_SIZE)
+
+    def read_body(self, req, **kwargs):
+        """Read the request body.
+
+        The body is refused with a ``413`` if its ``Content-Length`` is over
+        :meth:`get_max_body_size`, or, when there is no ``Content-Length``, as
+        soon as more than that has been read.
+
+        Returns:
+            bytes: The body.
+        """
+        max_size = self.get_max_body_size(req, **kwargs)
+        length = req.content_length
+
+        if max_size is not None and length is not None and length > max_size:
+            raise exceptions.HTTPRequestEntityTooLarge(
+                title=_('Request body too large'),
+                description=_(
+                    'The request body cannot be larger than {size} '
+                    'bytes.').format(size=max_size))
+
+        if length is not None:
+            stream = req.bounded_stream
+            remaining = length
+        else:
+            stream = req.stream
+            remaining = None
+
+        body = bytearray()
+        while remaining is None or remaining > 0:
+            size = self.body_read_size
+            if remaining is not None:
+                size = min(size, remaining)
+
+            chunk = stream.read(size)
+            if not chunk:
+                break
+
+            body += chunk
+            if remaining is not None:
+                remaining -= len(chunk)
+
+            if max_size is not None and len(body) > max_size:
+                raise exceptions.HTTPRequestEntityTooLarge(
+                    title=_('Request body too large'),
+                    description=_(
+                        'The request body cannot be larger than {size} '
+                        'bytes.').format(size=max_size))
+
+        return bytes(body)
+
+    def parse_body(self, req, **kwargs):
+        """Read, decode and parse the request body.
+
+        The JSON is decoded straight from the bytes that were read, then
+        passed through the :meth:`get_parsers` parsers.  This happens once per
+        request; the result is also put in ``req.context['json']``.
+
+        Raises:
+            falcon.HTTPBadRequest: If the body isn't valid JSON.
+        """
+        if self.BODY_CONTEXT_KEY in req.context:
+            return req.context[self.BODY_CONTEXT_KEY]
+
+        with profiling.phase(req, 'parse_body'):
+            try:
+                data = deserialize(self.read_body(req, **kwargs))
+            except ValueError:
+                raise falcon.HTTPBadRequest(
+                    title=_('Invalid JSON'),
+                    description=_('The request body is not valid JSON.'))
+
+        for parser in self.get_parsers(req, **kwargs):
+            data = parser.parse(req, self, data)
+
+        req.context[self.BODY_CONTEXT_KEY] = data
+        req.context['json'] = data
+
+        return data
+
     def get_filters(self, req, **kwargs):
         """Return queryset filters.
 
@@ -167,14 +525,247 @@ class BasicViewSet(views.View):
         return self.filters
 
     def render(self, method, req, resp, data, **kwargs):
-        for renderer in self.get_renderers(req, **kwargs):
-            if not renderer.list_only or self.is_list(req, **kwargs):
-                data = renderer.render(req, resp, self, data)
+        with profiling.phase(req, 'render'):
+            for renderer in self.get_renderers(req, **kwargs):
+                if not renderer.list_only or self.is_list(req, **kwargs):
+                    data = renderer.render(req, resp, self, data)
 
-        data = json.dumps(data)
+        with profiling.phase(req, 'json_encode'):
+            data = serialize(data)
 
         return data
 
+    def is_streamed(self, req, **kwargs):
+        """Return ``True`` if this ``list`` request should be streamed.
+
+        Streaming is used when ``self.stream_list`` is set, the list is not
+        paginated, and every renderer that applies is streamable.  Instead of
+        serializing the whole queryset at once, objects are loaded
+        ``stream_chunk_size`` at a time, and the JSON is written to
+        ``resp.stream`` as it is produced, so memory use stays bounded.
+
+        Note that once streaming has started, errors can no longer change the
+        response status.
+        """
+        if not self.stream_list or self.is_paginated(req, **kwargs):
+            return False
+
+        for renderer in self.get_renderers(req, **kwargs):
+            if not renderer.streamable:
+                return False
+
+        return True
+
+    def render_stream(self, req, resp, chunks, **kwargs):
+        """Render serialized chunks of a list into an iterator of bytes.
+
+        Args:
+            chunks (iterator): Yields lists of serialized objects.
+        """
+        stream = _stream_json_list(chunks)
+
+        for renderer in self.get_renderers(req, **kwargs):
+            stream = renderer.render_stream(req, resp, self, stream)
+
+        return (piece.encode('utf-8') for piece in stream)
+
+    def is_cached(self, req, **kwargs):
+        """Return ``True`` if the response to this request can be cached.
+
+        Only ``list`` and ``retrieve`` responses with a ``200`` status are
+        cached, and streamed lists never are.  Authentication and permission
+        checks still run for cached responses; the queryset, serialization
+        and rendering are skipped, and so is ``get_obj`` for ``retrieve``.
+        Only the body is cached, so headers set during rendering are not
+        replayed.
+
+        Responses are cached per :meth:`get_cache_user_key`, and aren't
+        cached when it returns ``None``.
+        """
+        if not self.cache_responses:
+            return False
+
+        if self.is_list(req, **kwargs) and self.is_streamed(req, **kwargs):
+            return False
+
+        return self.get_cache_user_key(req, **kwargs) is not None
+
+    def get_cache_user_key(self, req, **kwargs):
+        """Return a string identifying whose view of the data this is.
+
+        Responses are only shared between requests with the same key.  The
+        default is the authenticated user's ``uuid``, ``id`` or ``pk``
+        attribute (or the user itself, if it is a string or number), and an
+        empty string for anonymous requests.  For other users it returns
+        ``None``, and responses aren't cached.
+
+        Override this if the response depends on something else, or to share
+        responses between users, for example:
+
+        .. code-block:: python
+
+            def get_cache_user_key(self, req, **kwargs):
+                return str(req.context['user'].company_uuid)
+        """
+        user = req.context.get('user')
+        if user is None:
+            return ''
+
+        if isinstance(user, (str, int)):
+            return str(user)
+
+        for attr in ('uuid', 'id', 'pk'):
+            value = getattr(user, attr, None)
+            if value is not None:
+                return '{}:{}'.format(user.__class__.__name__, value)
+
+        return None
+
+    def get_cache_prefix(self, req, **kwargs):
+        """Return the prefix responses are cached and invalidated under."""
+        return self.cache_prefix or self.__class__.__name__
+
+    def _get_cache_generation_key(self, req, **kwargs):
+        return '{}:{}:generation'.format(
+            self.CACHE_KEY_PREFIX, self.get_cache_prefix(req, **kwargs))
+
+    def _set_cache_generation(self, req, **kwargs):
+        # generations are random rather than counted, so a generation that
+        # was evicted or expired is never reused, with its stale responses
+        generation = uuid.uuid4().hex
+        cache.set(self._get_cache_generation_key(req, **kwargs), generation,
+                  self.cache_timeout)
+        return generation
+
+    def get_cache_key(self, req, **kwargs):
+        """Build the cache key for a ``list`` or ``retrieve`` request.
+
+        The key is made from the route kwargs, the query string parameters in
+        ``cache_params``, :meth:`get_cache_user_key`, and the current
+        generation of the prefix, which is replaced by
+        :meth:`invalidate_cache`.
+        """
+        params = req.params
+        if self.cache_params is not None:
+            params = {
+                k: v for k, v in params.items() if k in self.cache_params}
+
+        generation = cache.get(self._get_cache_generation_key(req, **kwargs))
+        if generation is None:
+            generation = self._set_cache_generation(req, **kwargs)
+
+        digest = hashlib.sha1(json.dumps([
+            self.__class__.__module__,
+            self.__class__.__name__,
+            sorted((k, str(v)) for k, v in kwargs.items()),
+            sorted(params.items()),
+            self.get_cache_user_key(req, **kwargs),
+        ], sort_keys=True).encode('utf-8')).hexdigest()
+
+        return '{}:{}:{}:{}'.format(
+            self.CACHE_KEY_PREFIX, self.get_cache_prefix(req, **kwargs),
+            generation, digest)
+
+    def invalidate_cache(self, req, **kwargs):
+        """Invalidate the cached responses for this viewset's prefix.
+
+        Called after ``create``, ``update`` and ``destroy``.  Any list could
+        contain the changed object, so every response cached under the prefix
+        is invalidated, by replacing its generation.
+
+        This happens even if the viewset doesn't cache responses itself, as
+        other viewsets with the same prefix may.
+        """
+        if self.get_cache_prefix(req, **kwargs) is None:
+            return
+
+        try:
+            self._set_cache_generation(req, **kwargs)
+        except cache.exceptions.CacheNotInitializedError:
+            # nothing is cached
+            pass
+
+    def get_validators(self, req, **kwargs):
+        """Return cheap validators for a ``list`` or ``retrieve`` request.
+
+        If this returns an ``(etag, last_modified)`` tuple, it is used to
+        answer conditional requests before anything is serialized.  Either
+        item can be ``None``.  The etag must change whenever the response
+        would, so it should include the query string and anything that
+        :meth:`get_cache_user_key` depends on.
+
+        The default returns ``None``, which means the ETag is a hash of the
+        rendered body.  Rendering still happens, but the body isn't
+        transferred if the client has it already.
+        """
+        return None
+
+    def _make_etag(self, req, *values, **kwargs):
+        return '"{}"'.format(hashlib.sha1(json.dumps([
+            self.__class__.__module__,
+            self.__class__.__name__,
+            sorted((k, str(v)) for k, v in kwargs.items()),
+            sorted(req.params.items()),
+            self.get_cache_user_key(req, **kwargs),
+        ] + list(values), sort_keys=True).encode('utf-8')).hexdigest())
+
+    def is_not_modified(self, req, etag=None, last_modified=None):
+        """Check the request's conditional headers.
+
+        ``If-None-Match`` is used if it was sent, otherwise
+        ``If-Modified-Since``.
+
+        Returns:
+            bool: ``True`` if the client's copy is current.
+        """
+        if_none_match = req.if_none_match
+        if if_none_match:
+            if etag is None:
+                return False
+
+            if if_none_match.strip() == '*':
+                return True
+
+            etag = _strip_etag(etag)
+            return any(_strip_etag(e) == etag
+                       for e in if_none_match.split(','))
+
+        if last_modified is not None:
+            try:
+                if_modified_since = req.if_modified_since
+            except falcon.HTTPBadRequest:
+                return False
+
+            if if_modified_since is not None:
+                return _to_http_dt(last_modified) <= if_modified_since
+
+        return False
+
+    def check_not_modified(self, req, resp, etag=None, last_modified=None,
+                           **kwargs):
+        """Set the validator headers, and a ``304`` if the client is current.
+
+        Returns:
+            bool: ``True`` if the response was set to ``304 Not Modified``.
+        """
+        if etag is not None:
+            resp.etag = etag
+        if last_modified is not None:
+            resp.last_modified = _to_http_dt(last_modified)
+
+        if self.is_not_modified(req, etag, last_modified):
+            resp.status = falcon.HTTP_304
+            resp.body = None
+            return True
+
+        return False
+
+    def check_body_not_modified(self, req, resp, **kwargs):
+        """Like :meth:`check_not_modified`, with a hash of the body as ETag."""
+        etag = '"{}"'.format(
+            hashlib.sha1(resp.body.encode('utf-8')).hexdigest())
+        return self.check_not_modified(req, resp, etag=etag, **kwargs)
+
     def get_obj_lookup_kwargs(self, req, **kwargs):
         return {
             self.obj_lookup_kwarg: kwargs.get(self.obj_lookup_kwarg),
@@ -221,6 +812,12 @@ class BasicViewSet(views.View):
         if isinstance(self.paginate, (list, tuple)) and \
                 len(self.paginate) == 2:
             return True
+        return self.is_cursor_paginated(req, **kwargs)
+
+    def is_cursor_paginated(self, req, **kwargs):
+        if isinstance(self.cursor_paginate, (list, tuple)) and \
+                len(self.cursor_paginate) == 2:
+            return True
         return False
 
     def get_serializer(self, req, **kwargs):
@@ -237,6 +834,55 @@ class BasicViewSet(views.View):
                 'on the viewset {}'.format(self.__class__.__name__))
         return self.serializer
 
+    def get_sparse_fields(self, req, **kwargs):
+        """Return the fields requested with the ``fields`` and ``exclude``
+        query string parameters.
+
+        Both are comma separated lists of field names.
+
+        Returns:
+            tuple: ``(fields, exclude)``.  Each is ``None`` if not requested.
+        """
+        if not self.sparse_fields:
+            return None, None
+
+        def get_names(param):
+            names = req.get_param_as_list(param)
+            if names is None:
+                return None
+            return [name.strip() for name in names if name.strip()]
+
+        return get_names('fields'), get_names('exclude')
+
+    def get_response_serializer(self, req, **kwargs):
+        """Return the serializer for ``list`` and ``retrieve`` responses.
+
+        That is :meth:`get_serializer`, narrowed to the fields requested by
+        the client if ``self.sparse_fields`` is set.  Narrowed serializers are
+        cached by :meth:`frf.serializers.Serializer.subset`.
+
+        Raises:
+            :class:`frf.exceptions.ValidationError`: If unknown fields were
+                requested.
+        """
+        serializer = self.get_serializer(req, **kwargs)
+        fields, exclude = self.get_sparse_fields(req, **kwargs)
+
+        if fields is None and exclude is None:
+            return serializer
+
+        errors = {}
+        for param, names in (('fields', fields), ('exclude', exclude)):
+            unknown = sorted(set(names or ()) - set(serializer.fields))
+            if unknown:
+                errors[param] = [_('Unknown fields: {fields}').format(
+                    fields=', '.join(unknown))]
+
+        if errors:
+            raise exceptions.ValidationError(errors)
+
+        return serializer.subset(fields=fields, exclude=exclude)
+
     def get_write_serializer(self, req, **kwargs):
         """Return the write serializer.
 
@@ -279,6 +925,67 @@ class ViewSet(
     pass
 
 
+class AsyncViewSetMixin(views.AsyncViewMixin):
+    """Serve a viewset from ``async`` code (see :mod:`frf.asgi`).
+
+    The responders run :meth:`dispatch` with :func:`frf.utils.aio.run`.
+    Authentication and permissions are checked on the event loop, and may
+    be ``async``.  Actions written as ``async`` methods are awaited; the
+    others, like the model mixins' ``list`` and ``create``, use SQLAlchemy,
+    which blocks, so they run in :func:`frf.db.run_sync`'s thread pool.
+
+    Conditional GET and response caching only apply to the actions that
+    aren't ``async``.
+    """
+    async def dispatch(self, method, req, resp, **kwargs):
+        await self.authenticate(method, req, resp, **kwargs)
+
+        action = self.bound_actions.get(
+            (method, self.obj_lookup_kwarg in kwargs))
+        bound = action is not None
+
+        if not bound:
+            action = self.check_action(method, req, **kwargs)
+
+        await self.check_permissions(req, **kwargs)
+
+        if not bound:
+            action = self.get_action(action, req, **kwargs)
+
+        handler = self._bound_handlers.get(action)
+        if handler is None:
+            handler = getattr(self, action)
+        if not inspect.iscoroutinefunction(handler):
+            await db.run_sync(
+                self.perform_action, method, action, req, resp, **kwargs)
+            return
+
+        await handler(req, resp, **kwargs)
+
+        if resp.stream is None:
+            resp.body = self.render(method, req, resp, resp.body, **kwargs)
+
+    def on_get(self, req, resp, **kwargs):
+        aio.run(self.dispatch('get', req, resp, **kwargs))
+
+    def on_put(self, req, resp, **kwargs):
+        aio.run(self.dispatch('put', req, resp, **kwargs))
+
+    def on_patch(self, req, resp, **kwargs):
+        aio.run(self.dispatch('patch', req, resp, **kwargs))
+
+    def on_post(self, req, resp, **kwargs):
+        aio.run(self.dispatch('post', req, resp, **kwargs))
+
+    def on_delete(self, req, resp, **kwargs):
+        aio.run(self.dispatch('delete', req, resp, **kwargs))
+
+
+class AsyncViewSet(AsyncViewSetMixin, ViewSet):
+    """``async`` version of :class:`ViewSet`."""
+    pass
+
+
 class BasicModelViewSet(BasicViewSet):
     """A basic model based ViewSet for use on a specific model.
 
@@ -294,6 +1001,77 @@ class BasicModelViewSet(BasicViewSet):
     """
     model = None
 
+    #: Relationships to load along with the objects in ``list`` and
+    #: ``retrieve`` requests, with a JOIN.  Best for many-to-one
+    #: relationships.  Use dots for nested relationships, like
+    #: ``'author.company'``.
+    select_related = None
+    #: Relationships to load with one extra query per relationship, for all
+    #: the objects at once.  Best for collections.
+    prefetch_related = None
+    #: Set to ``True`` to also eager load the relationships used by the
+    #: serializer's ``PrimaryKeyRelatedField`` and ``SerializerField``
+    #: fields.
+    auto_eager_load = False
+    #: Set to ``True`` to build the validators of conditional requests from
+    #: the model's ``updated_at`` column (see :meth:`get_validators`)
+    #: instead of hashing the body.  Only correct if the response changes
+    #: whenever ``updated_at`` does, so not when the serializer includes
+    #: related objects that can change on their own.
+    updated_at_validators = False
+
+    def get_cache_prefix(self, req, **kwargs):
+        """Return the prefix responses are cached and invalidated under.
+
+        Defaults to the table name of ``self.model``, so that writes through
+        any viewset for the model invalidate the others.
+        """
+        if self.cache_prefix or not self.model:
+            return super().get_cache_prefix(req, **kwargs)
+
+        return self.model.__tablename__
+
+    def get_validators(self, req, **kwargs):
+        """Return validators based on ``updated_at``.
+
+        Used when ``updated_at_validators`` is set, and the model has an
+        ``updated_at`` column, like models using
+        :class:`frf.models.mixins.TimestampMixin`.  For a ``retrieve``, the
+        object's ``updated_at`` is used.  For a ``list``, a single query gets
+        ``max(updated_at)`` and the row count of the filtered queryset, so
+        that deletes are noticed too.  Because a delete doesn't change
+        ``max(updated_at)``, lists don't get a ``Last-Modified`` header.
+
+        Returns ``None`` (so the body is hashed instead) otherwise, or if a
+        filter turned the queryset into a list.
+        """
+        if not self.updated_at_validators:
+            return None
+
+        updated_at = getattr(self.model, 'updated_at', None)
+        if updated_at is None:
+            return None
+
+        if not self.is_list(req, **kwargs):
+            obj = self.get_obj(req, **kwargs)
+            # remember the object, so ``retrieve`` doesn't load it again.
+            req.context['object'] = obj
+            last_modified = obj.updated_at
+            return (self._make_etag(
+                req, str(last_modified), **kwargs), last_modified)
+
+        qs = self.get_filtered_qs(req, **kwargs)
+        if not hasattr(qs, 'with_entities'):
+            return None
+
+        last_modified, count = qs.order_by(None).enable_eagerloads(
+            False).with_entities(
+            sqlalchemy.func.max(updated_at),
+            sqlalchemy.func.count()).one()
+
+        return (self._make_etag(
+            req, str(last_modified), count, **kwargs), None)
+
     def get_obj(self, req, **kwargs):
         if 'object' in req.context:
             return req.context.get('object')
@@ -310,6 +1088,128 @@ class BasicModelViewSet(BasicViewSet):
 
         return self.model.query
 
+    def get_bulk_objs(self, req, ids, **kwargs):
+        """Load the objects for ``ids`` with a single query.
+
+        Returns:
+            list: The objects, in the same order as ``ids``.  Objects that
+                could not be found are ``None``.
+        """
+        if not ids:
+            return []
+
+        column = getattr(self.model, self.obj_lookup_kwarg)
+        qs = self.get_filtered_qs(req, **kwargs).filter(column.in_(ids))
+        found = {
+            str(getattr(obj, self.obj_lookup_kwarg)): obj for obj in qs}
+
+        return [found.get(str(i)) for i in ids]
+
+    def get_filtered_qs(self, req, **kwargs):
+        """Filter the queryset based on the `filters` list.
+
+        If the client asked for some of the fields only (see
+        :meth:`get_response_serializer`), the query of a ``GET`` loads only
+        the columns those fields need.
+        """
+        qs = super().get_filtered_qs(req, **kwargs)
+
+        if req.method != 'GET' or not hasattr(qs, 'options'):
+            return qs
+
+        if self.sparse_fields:
+            columns = self.get_sparse_columns(req, **kwargs)
+            if columns:
+                qs = qs.options(load_only(*columns))
+
+        options = self.get_eager_load_options(req, **kwargs)
+        if options:
+            qs = qs.options(*options)
+
+        return qs
+
+    def get_eager_load_paths(self, req, **kwargs):
+        """Return the relationships to eager load.
+
+        Returns:
+            dict: Maps relationship paths to the loader strategy, either
+                ``'joinedload'`` or ``'subqueryload'``.  See
+                ``select_related``, ``prefetch_related`` and
+                ``auto_eager_load``.
+        """
+        paths = {}
+
+        for path in self.select_related or ():
+            paths[path] = 'joinedload'
+
+        for path in self.prefetch_related or ():
+            paths[path] = 'subqueryload'
+
+        if self.auto_eager_load and self.model:
+            serializer = self.get_response_serializer(req, **kwargs)
+            for path, strategy in _eager_load_paths(self.model, serializer):
+                paths.setdefault(path, strategy)
+
+        return paths
+
+    def get_eager_load_options(self, req, **kwargs):
+        """Return the loader options for :meth:`get_eager_load_paths`.
+
+        Streamed lists are loaded with ``yield_per``, which SQLAlchemy can't
+        combine with eager loaded collections, so paths that go through a
+        collection are skipped for those.
+        """
+        paths = self.get_eager_load_paths(req, **kwargs)
+        streamed = self.is_list(req, **kwargs) and \
+            self.is_streamed(req, **kwargs)
+        options = []
+
+        for path in sorted(paths):
+            option = None
+            cls = self.model
+            names = path.split('.')
+
+            for i, name in enumerate(names):
+                attr = getattr(cls, name)
+                if streamed and attr.property.uselist:
+                    option = None
+                    break
+
+                strategy = paths.get('.'.join(names[:i + 1]))
+                if strategy is None:
+                    strategy = 'subqueryload' if attr.property.uselist \
+                        else 'joinedload'
+
+                if option is None:
+                    option = _EAGER_LOADERS[strategy](attr)
+                else:
+                    option = getattr(option, strategy)(attr)
+
+                cls = attr.property.mapper.class_
+
+            if option is not None:
+                options.append(option)
+
+        return options
+
+    def get_sparse_columns(self, req, **kwargs):
+        """Return the column attributes needed for the requested fields.
+
+        Returns ``None`` if all fields were requested.  Fields whose source
+        isn't a column (relationships, properties) are loaded as usual when
+        they are accessed.
+        """
+        fields, exclude = self.get_sparse_fields(req, **kwargs)
+        if (fields is None and exclude is None) or not self.model:
+            return None
+
+        serializer = self.get_response_serializer(req, **kwargs)
+        column_keys = set(
+            attr.key for attr in sqlalchemy.inspect(self.model).column_attrs)
+
+        return [field.source for field in serializer.fields.values()
+                if field.source in column_keys]
+
     def paginate_qs(self, req, qs, **kwargs):
         """Paginate the queryset.
 
@@ -323,7 +1223,13 @@ class BasicModelViewSet(BasicViewSet):
 
         Pagination is done using the ``page`` and ``per_page`` query string
         attributes.
+
+        If ``self.cursor_paginate`` is set instead, see
+        :meth:`cursor_paginate_qs`.
         """
+        if self.is_cursor_paginated(req, **kwargs):
+            return self.cursor_paginate_qs(req, qs, **kwargs)
+
         default_page_by = self.paginate[0]
         maximum_page_by = self.paginate[1]
         meta = {
@@ -345,6 +1251,41 @@ class BasicModelViewSet(BasicViewSet):
         req.context[self.PAGINATOR_CONTEXT_KEY] = paginator
         return paginator.items
 
+    def cursor_paginate_qs(self, req, qs, **kwargs):
+        """Paginate the queryset using a cursor.
+
+        Pages are selected with the ``cursor`` and ``per_page`` query string
+        attributes, ordered by ``self.cursor_ordering``.  The ``next`` and
+        ``prev`` cursors are put in the meta dictionary.  The total is only
+        counted, and put in the meta dictionary, if the ``total`` query string
+        attribute is true.
+        """
+        default_page_by = self.cursor_paginate[0]
+        maximum_page_by = self.cursor_paginate[1]
+        meta = {
+            'per_page': min([
+                req.get_param_as_int('per_page') or default_page_by,
+                maximum_page_by,
+                ]),
+            'page_limit': maximum_page_by,
+        }
+        req.context[self.META_CONTEXT_KEY] = meta
+
+        with_total = bool(req.get_param_as_bool('total'))
+        paginator = qs.paginate_keyset(
+            ordering=self.cursor_ordering,
+            per_page=meta.get('per_page'),
+            cursor=req.get_param('cursor'),
+            with_total=with_total)
+
+        meta['next'] = paginator.next_cursor
+        meta['prev'] = paginator.prev_cursor
+        if with_total:
+            meta['total'] = paginator.total
+
+        req.context[self.PAGINATOR_CONTEXT_KEY] = paginator
+        return paginator.items
+
 
 class ReadOnlyModelViewSet(
         mixins.ListMixin,
@@ -369,3 +1310,13 @@ class ModelViewSet(mixins.ListMixin,
     ``destroy`` operations.
     """
     pass
+
+
+class AsyncReadOnlyModelViewSet(AsyncViewSetMixin, ReadOnlyModelViewSet):
+    """``async`` version of :class:`ReadOnlyModelViewSet`."""
+    pass
+
+
+class AsyncModelViewSet(AsyncViewSetMixin, ModelViewSet):
+    """``async`` version of :class:`ModelViewSet`."""
+    pass
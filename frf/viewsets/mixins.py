@@ -17,11 +17,76 @@
 # code under the terms of the Apache License, Version 2.0, as described
 # above.
 
-import json
+from gettext import gettext as _
 
 import falcon
+import sqlalchemy
 
-from frf import db
+from frf import db, exceptions, profiling
+
+
+def _save_items(view, req, items, objs=None, **kwargs):
+    """Validate and save each item with the write serializer.
+
+    Nothing is committed.  If any of the items fails validation, the session
+    is rolled back and a ``ValidationError`` with the errors of each failed
+    item, keyed by its position in the list, is raised.
+    """
+    serializer = view.get_write_serializer(req, **kwargs)
+    errors = {}
+    saved = []
+
+    for i, item in enumerate(items):
+        obj = objs[i] if objs is not None else None
+        if objs is not None and obj is None:
+            errors[str(i)] = {view.obj_lookup_kwarg: [_('Not found.')]}
+            continue
+
+        try:
+            saved.append(serializer.save(obj=obj, data=item, ctx={'req': req}))
+        except exceptions.ValidationError as error:
+            errors[str(i)] = error.description
+
+    if errors:
+        db.session.rollback()
+        raise exceptions.ValidationError(errors)
+
+    return saved
+
+
+def _set_primary_key_defaults(objs):
+    """Set python side primary key defaults on new objects.
+
+    The unit of work only batches INSERTs into one ``executemany`` for rows
+    whose primary key is already known.
+    """
+    for obj in objs:
+        mapper = sqlalchemy.inspect(obj).mapper
+        for column in mapper.primary_key:
+            default = column.default
+            if default is None:
+                continue
+
+            key = mapper.get_property_by_column(column).key
+            if getattr(obj, key) is not None:
+                continue
+
+            if default.is_scalar:
+                setattr(obj, key, default.arg)
+            elif default.is_callable:
+                setattr(obj, key, default.arg(None))
+
+
+def _check_bulk_items(view, items):
+    if not isinstance(items, list):
+        raise exceptions.ValidationError(
+            {'non_field_errors': _('Data passed is not a list.')})
+
+    if view.bulk_max_items is not None and len(items) > view.bulk_max_items:
+        raise exceptions.ValidationError({
+            'non_field_errors': _(
+                'No more than {max} items can be sent at once.').format(
+                    max=view.bulk_max_items)})
 
 
 class ListMixin(object):
@@ -33,15 +98,63 @@ class ListMixin(object):
         If ``self.paginate`` is set to a list or tuple of 2 integers, the
         queryset will be paginated. The first integer in the list is the
         default page size, and the second is the maximum page size.
+
+        If ``self.stream_list`` is set, unpaginated lists are streamed.  See
+        ``BasicViewSet.is_streamed``.
         """
-        qs = self.get_filtered_qs(req, **kwargs)
+        serializer = self.get_response_serializer(req, **kwargs)
+
+        with profiling.phase(req, 'get_filtered_qs'):
+            qs = self.get_filtered_qs(req, **kwargs)
+
         if self.is_paginated(req, **kwargs):
-            qs = self.paginate_qs(req, qs, **kwargs)
+            with profiling.phase(req, 'paginate'):
+                qs = self.paginate_qs(req, qs, **kwargs)
+        else:
+            with profiling.phase(req, 'count'):
+                req.context[self.META_CONTEXT_KEY] = {
+                    'total': self.get_qs_len(req, qs, **kwargs)}
+
+        if self.is_streamed(req, **kwargs):
+            resp.stream = self.render_stream(
+                req, resp, self.iter_serialized(req, qs, serializer, **kwargs),
+                **kwargs)
+            return
+
+        with profiling.phase(req, 'serialize'):
+            resp.body = serializer.serialize(qs, many=True)
+
+    def iter_serialized(self, req, qs, serializer, **kwargs):
+        """Serialize ``qs`` in chunks of ``self.stream_chunk_size``.
+
+        SQLAlchemy queries are loaded with ``yield_per``, so only one chunk
+        of objects is in memory at a time.
+        """
+        chunk_size = self.stream_chunk_size
+
+        if hasattr(qs, 'yield_per'):
+            objs = qs.yield_per(chunk_size)
         else:
-            req.context[self.META_CONTEXT_KEY] = {
-                'total': self.get_qs_len(req, qs, **kwargs)}
+            objs = qs
 
-        resp.body = self.get_serializer(req, **kwargs).serialize(qs, many=True)
+        try:
+            # streaming happens after ``dispatch`` has returned.
+            with db.replica(self.use_replica):
+                chunk = []
+                for obj in objs:
+                    chunk.append(obj)
+                    if len(chunk) >= chunk_size:
+                        yield serializer.serialize(chunk, many=True)
+                        chunk = []
+
+                if chunk:
+                    yield serializer.serialize(chunk, many=True)
+        finally:
+            # the response is streamed after the middleware has run, so the
+            # session that was used for the query has to be closed here.
+            session = getattr(qs, 'session', None)
+            if session is not None:
+                session.close()
 
 
 class RetrieveMixin(object):
@@ -49,8 +162,13 @@ class RetrieveMixin(object):
 
     def retrieve(self, req, resp, **kwargs):
         """Retrieve and return target object."""
-        obj = self.get_obj(req, **kwargs)
-        resp.body = self.get_serializer(req, **kwargs).serialize(obj)
+        serializer = self.get_response_serializer(req, **kwargs)
+
+        with profiling.phase(req, 'get_obj'):
+            obj = self.get_obj(req, **kwargs)
+
+        with profiling.phase(req, 'serialize'):
+            resp.body = serializer.serialize(obj)
 
 
 class CreateMixin(object):
@@ -72,12 +190,10 @@ class CreateMixin(object):
                 subclasses, set this to ``False`` if you would like to commit
                 yourself.
         """
-        data = json.loads(req.stream.read().decode('utf-8'))
+        data = self.parse_body(req, **kwargs)
 
-        for parser in self.parsers:
-            data = parser.parse(req, self, data)
-
-        req.context['json'] = data
+        if isinstance(data, list) and 'create' in self.bulk_actions:
+            return self.bulk_create(req, resp, data, **kwargs)
 
         # obtain the write serializer
         serializer = self.get_write_serializer(req, **kwargs)
@@ -87,6 +203,7 @@ class CreateMixin(object):
         self.create_save_obj(req, obj, **kwargs)
 
         req.context['object'] = obj
+        self.invalidate_cache(req, **kwargs)
 
         # obtain the read serializer
         serializer = self.get_serializer(req, **kwargs)
@@ -119,18 +236,14 @@ class UpdateMixin(object):
                 ``False`` if you would like to commit yourself.
         """
         obj = self.get_obj(req, **kwargs)
-        data = json.loads(req.stream.read().decode('utf-8'))
-
-        for parser in self.get_parsers(req, **kwargs):
-            data = parser.parse(req, self, data)
-
-        req.context['json'] = data
+        data = self.parse_body(req, **kwargs)
 
         serializer = self.get_write_serializer(req, **kwargs)
         serializer.save(obj=obj, data=data, ctx={'req': req})
 
         self.update_pre_save(req, obj, **kwargs)
         self.update_save_obj(req, obj, **kwargs)
+        self.invalidate_cache(req, **kwargs)
 
         resp.status = falcon.HTTP_204
 
@@ -156,6 +269,7 @@ class DestroyMixin(object):
         """
         obj = self.get_obj(req, **kwargs)
         self.destroy_remove_obj(req, obj, **kwargs)
+        self.invalidate_cache(req, **kwargs)
         resp.status = falcon.HTTP_204
 
 
@@ -167,7 +281,42 @@ class CreateModelMixin(CreateMixin):
 
         try:
             db.session.commit()
-        except:
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def bulk_create(self, req, resp, items, **kwargs):
+        """Create several instances at once.
+
+        Called for a POST of a list, if ``'create'`` is in
+        ``self.bulk_actions``.  Every item is validated with the write
+        serializer, and if they are all valid, they are inserted in a single
+        transaction.  Otherwise nothing is inserted, and the errors of each
+        item are returned, keyed by position.
+        """
+        _check_bulk_items(self, items)
+
+        objs = _save_items(self, req, items, **kwargs)
+
+        for obj in objs:
+            self.create_pre_save(req, obj, **kwargs)
+
+        self.bulk_create_save_objs(req, objs, **kwargs)
+        self.invalidate_cache(req, **kwargs)
+
+        req.context['objects'] = objs
+
+        serializer = self.get_serializer(req, **kwargs)
+        resp.body = serializer.serialize(objs, many=True)
+        resp.status = falcon.HTTP_201
+
+    def bulk_create_save_objs(self, req, objs, **kwargs):
+        _set_primary_key_defaults(objs)
+        db.session.add_all(objs)
+
+        try:
+            db.session.commit()
+        except Exception:
             db.session.rollback()
             raise
 
@@ -178,7 +327,55 @@ class UpdateModelMixin(UpdateMixin):
     def update_save_obj(self, req, obj, **kwargs):
         try:
             db.session.commit()
-        except:
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def bulk_update(self, req, resp, **kwargs):
+        """Update several instances at once.
+
+        Called for a PATCH of a list to the list url, if ``'update'`` is in
+        ``self.bulk_actions``.  Each item must contain the
+        ``obj_lookup_kwarg`` key of the object it updates.  The objects are
+        loaded with one query, and if every item is valid, they are saved in
+        a single transaction.  Otherwise nothing is saved, and the errors of
+        each item are returned, keyed by position.
+        """
+        items = self.parse_body(req, **kwargs)
+        _check_bulk_items(self, items)
+
+        ids = []
+        errors = {}
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or \
+                    self.obj_lookup_kwarg not in item:
+                errors[str(i)] = {
+                    self.obj_lookup_kwarg: [_('Field is required.')]}
+            else:
+                ids.append(item[self.obj_lookup_kwarg])
+
+        if errors:
+            raise exceptions.ValidationError(errors)
+
+        objs = self.get_bulk_objs(req, ids, **kwargs)
+        items = [
+            {k: v for k, v in item.items() if k != self.obj_lookup_kwarg}
+            for item in items]
+
+        _save_items(self, req, items, objs=objs, **kwargs)
+
+        for obj in objs:
+            self.update_pre_save(req, obj, **kwargs)
+
+        self.bulk_update_save_objs(req, objs, **kwargs)
+        self.invalidate_cache(req, **kwargs)
+
+        resp.status = falcon.HTTP_204
+
+    def bulk_update_save_objs(self, req, objs, **kwargs):
+        try:
+            db.session.commit()
+        except Exception:
             db.session.rollback()
             raise
 
@@ -186,11 +383,62 @@ class UpdateModelMixin(UpdateMixin):
 class DestroyModelMixin(DestroyMixin):
     """Delete/Remove a model instance."""
 
-    def destroy_remove_obj(self, req, obj, **kwargs):
+    #: Set to ``True`` to have bulk destroys call :meth:`destroy_remove_obj`
+    #: for each object, for instance when it is overridden to soft delete.
+    #: See :meth:`bulk_destroy_remove_objs`.
+    bulk_destroy_each = False
+
+    def destroy_remove_obj(self, req, obj, commit=True, **kwargs):
         db.session.delete(obj)
 
+        if not commit:
+            return
+
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def bulk_destroy(self, req, resp, **kwargs):
+        """Remove several instances at once.
+
+        Called for a DELETE to the list url with a list of ids in the body,
+        if ``'destroy'`` is in ``self.bulk_actions``.  If any of the objects
+        can't be found, nothing is removed, and a ``ValidationError`` lists
+        the missing ids by position.
+        """
+        ids = self.parse_body(req, **kwargs)
+        _check_bulk_items(self, ids)
+
+        objs = self.get_bulk_objs(req, ids, **kwargs)
+
+        errors = {
+            str(i): {self.obj_lookup_kwarg: [_('Not found.')]}
+            for i, obj in enumerate(objs) if obj is None}
+        if errors:
+            raise exceptions.ValidationError(errors)
+
+        self.bulk_destroy_remove_objs(req, objs, **kwargs)
+        self.invalidate_cache(req, **kwargs)
+        resp.status = falcon.HTTP_204
+
+    def bulk_destroy_remove_objs(self, req, objs, **kwargs):
+        """Remove the objects of a bulk destroy, in a single transaction.
+
+        The objects are deleted from the session, and committed once, so the
+        deletes are sent together.  If ``bulk_destroy_each`` is set,
+        :meth:`destroy_remove_obj` is called for each object instead, with
+        ``commit=False``, and must leave committing to this method.
+        """
         try:
+            for obj in objs:
+                if self.bulk_destroy_each:
+                    self.destroy_remove_obj(req, obj, commit=False, **kwargs)
+                else:
+                    db.session.delete(obj)
+
             db.session.commit()
-        except:
+        except Exception:
             db.session.rollback()
             raise
@@ -57,6 +57,7 @@ setup(name='frf',
                    'sphinxcontrib-napoleon'],
           'Pretty': ['colorama', 'pyfiglet'],
           'Cache': ['redis'],
+          'Encryption': ['cryptography'],
           'Testing': [
               'flake8',
               'flake8-import-order',